@@ -1,33 +1,70 @@
 from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from datetime import timedelta
+from config import engine_options, get_config
 from .extensions import db, migrate
+from .json_provider import FastJSONProvider
+from .compression import init_compression
+from .services.cache import init_cache
+from .services.jobs import init_jobs
+from .services.report_jobs import init_report_jobs
+from .commands import register_commands
+from .utils.sql import configure_sqlite
+from .utils.db_routing import REPLICA_BIND, init_routing
+from .services.snapshots import register_snapshot_events
 from .routes.auth import auth
 from .routes.api import api
 from .routes.reports import reports
+from .routes.analytics import analytics
+from .routes.jobs import jobs
 
-def create_app():
+def create_app(config_name=None, overrides=None):
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     
-    # Use SQLite instead of PostgreSQL for now
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///esg.db'
-    app.config['JWT_SECRET_KEY'] = 'your-secret-key'  # Change this in production!
-    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
+    # Profile comes from ESG_ENV (development, testing, production) and the
+    # database from DATABASE_URL; ``overrides`` (e.g. from tests) win over both
+    app.config.from_object(get_config(config_name))
+    app.config.update(overrides or {})
+    if not app.config['SQLALCHEMY_DATABASE_URI']:
+        raise RuntimeError('DATABASE_URL must be set for this profile')
+    app.config.setdefault(
+        'SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI'], app.config)
+    )
+    replica_url = app.config['REPLICA_DATABASE_URL']
+    if replica_url:
+        app.config.setdefault('SQLALCHEMY_BINDS', {})[REPLICA_BIND] = {
+            'url': replica_url, **engine_options(replica_url, app.config)
+        }
     
     # Initialize extensions
     CORS(app)
     db.init_app(app)
     migrate.init_app(app, db)
     jwt = JWTManager(app)
+    register_snapshot_events()
+    register_commands(app)
+    init_compression(app)
+    init_cache(app)
+    init_jobs(app)
+    init_report_jobs(app)
+    init_routing(app)
     
     # Register blueprints
     app.register_blueprint(auth)
     app.register_blueprint(api)
     app.register_blueprint(reports)
+    app.register_blueprint(analytics)
+    app.register_blueprint(jobs)
     
     # Create database tables
     with app.app_context():
-        db.create_all()
+        configure_sqlite(db.engine, app.config['SQLITE_PRAGMAS'])
+        if REPLICA_BIND in db.engines:
+            # query_only makes a stray write to a local replica file fail loudly
+            configure_sqlite(db.engines[REPLICA_BIND], {**app.config['SQLITE_PRAGMAS'], 'query_only': 'ON'})
+        # Primary only: the replica gets its schema by replication, and a
+        # replica bind registered by another app must not be required here
+        db.create_all(bind_key=None)
     
     return app
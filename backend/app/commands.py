@@ -0,0 +1,108 @@
+import click
+import sqlite3
+from datetime import datetime, timedelta
+from flask import Flask
+from app.extensions import db
+from app.services.snapshots import refresh_latest_snapshots
+from app.services.rollups import rebuild_rollups
+from app.services.archive import ARCHIVE_BATCH_SIZE, archivable_years, archive_year
+from app.utils.db_routing import REPLICA_BIND
+from app.services.jobs import interrupted_job_ids, run_ingest_job
+from app.services.ingest import DEFAULT_CHUNK_SIZE, ingest_records, parse_xlsx
+from app.services.report_jobs import prune_report_jobs
+from app.services.history_export import write_history_workbook
+
+
+def register_commands(app: Flask):
+    @app.cli.command('rebuild-snapshots')
+    def rebuild_snapshots():
+        """Rebuild the latest_esg_snapshot table from esg_data."""
+        with db.engine.begin() as connection:
+            refresh_latest_snapshots(connection)
+        click.echo('Latest ESG snapshots rebuilt.')
+
+    @app.cli.command('rebuild-rollups')
+    def rebuild_rollups_command():
+        """Backfill the esg_rollup table from esg_data."""
+        with db.engine.begin() as connection:
+            rebuild_rollups(connection)
+        click.echo('ESG rollups rebuilt.')
+
+    @app.cli.command('resume-jobs')
+    def resume_jobs():
+        """Finish ingest jobs left queued or running by a stopped server."""
+        for job_id in interrupted_job_ids():
+            job = run_ingest_job(job_id, resume_running=True)
+            if job is not None:
+                click.echo(f'{job.id}: {job.status}, {job.inserted} inserted, {job.failed} failed')
+
+    @app.cli.command('import-xlsx')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--sheet', default=None, help='Worksheet name; defaults to the active sheet.')
+    @click.option('--chunk-size', default=DEFAULT_CHUNK_SIZE, show_default=True, type=click.IntRange(min=1))
+    @click.option('--upsert', is_flag=True, help='Update existing (company_id, date) rows in place.')
+    def import_xlsx(path, sheet, chunk_size, upsert):
+        """Stream ESG rows from a workbook into esg_data, committing per chunk."""
+        report = ingest_records(db.session, parse_xlsx(path, sheet), chunk_size, upsert=upsert)
+        result = report.to_dict()
+        click.echo(
+            f"{result['inserted']} inserted, {result['updated']} updated, "
+            f"{result['unchanged']} unchanged, {result['failed']} failed in {result['chunks']} chunks"
+        )
+        for error in result['errors'][:20]:
+            click.echo(f"  row {error['line']}: {error['error']}", err=True)
+
+    @app.cli.command('archive-esg-data')
+    @click.option('--before-year', type=int, default=None,
+                  help='Archive rows dated before this year; defaults to keeping ESG_HOT_YEARS years hot.')
+    @click.option('--batch-size', default=ARCHIVE_BATCH_SIZE, show_default=True, type=click.IntRange(min=1))
+    def archive_esg_data(before_year, batch_size):
+        """Move closed years of esg_data into the esg_data_archive table, one transaction per year."""
+        if before_year is None:
+            before_year = datetime.utcnow().year - app.config['ESG_HOT_YEARS'] + 1
+        with db.engine.connect() as connection:
+            years = archivable_years(connection, before_year)
+        if not years:
+            click.echo(f'Nothing to archive before {before_year}.')
+            return
+        for year in years:
+            with db.engine.begin() as connection:
+                moved = archive_year(connection, year, batch_size)
+            if moved:
+                click.echo(f'{year}: {moved} rows archived')
+
+    @app.cli.command('prune-report-jobs')
+    @click.option('--older-than-hours', default=24, show_default=True, type=click.IntRange(min=0))
+    def prune_report_jobs_command(older_than_hours):
+        """Delete background report jobs and their files after they have been collected."""
+        pruned = prune_report_jobs(timedelta(hours=older_than_hours))
+        click.echo(f'{len(pruned)} report jobs pruned.')
+
+    @app.cli.command('export-esg-history')
+    @click.argument('output', type=click.Path(dir_okay=False, writable=True))
+    @click.option('--company-id', 'company_ids', multiple=True, required=True, type=int)
+    @click.option('--start', type=click.DateTime(), default=None)
+    @click.option('--end', type=click.DateTime(), default=None)
+    def export_esg_history(output, company_ids, start, end):
+        """Write the full ESG history of the given companies to an XLSX workbook."""
+        count = write_history_workbook(output, company_ids, start, end)
+        click.echo(f'{count} ESG rows written to {output}.')
+
+    @app.cli.command('copy-replica')
+    def copy_replica():
+        """Copy the primary SQLite database onto the replica file, for local testing."""
+        replica = db.engines.get(REPLICA_BIND)
+        if replica is None:
+            raise click.ClickException('REPLICA_DATABASE_URL is not set.')
+        if db.engine.dialect.name != 'sqlite' or replica.dialect.name != 'sqlite':
+            raise click.ClickException('copy-replica only copies between SQLite files; use real replication otherwise.')
+        # Dispose first so no pooled replica connection holds the file open
+        replica.dispose()
+        source = sqlite3.connect(db.engine.url.database)
+        target = sqlite3.connect(replica.url.database)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        click.echo(f'Copied {db.engine.url.database} to {replica.url.database}.')
@@ -0,0 +1,90 @@
+from flask import Flask, request
+import gzip
+import zlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'text/csv',
+    'text/plain',
+    'text/html',
+}
+
+
+def choose_encoding(accept_encodings):
+    """Pick the best encoding the client accepts, preferring zstd."""
+    candidates = ['zstd', 'gzip'] if zstandard is not None else ['gzip']
+    best, best_quality = None, 0
+    for encoding in candidates:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data: bytes, encoding: str, config) -> bytes:
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=config['COMPRESSION_ZSTD_LEVEL']).compress(data)
+    return gzip.compress(data, compresslevel=config['COMPRESSION_GZIP_LEVEL'], mtime=0)
+
+
+def compress_stream(chunks, encoding: str, config):
+    if encoding == 'zstd':
+        compressor = zstandard.ZstdCompressor(level=config['COMPRESSION_ZSTD_LEVEL']).compressobj()
+    else:
+        compressor = zlib.compressobj(config['COMPRESSION_GZIP_LEVEL'], zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def init_compression(app: Flask):
+    app.config.setdefault('COMPRESSION_ENABLED', True)
+    app.config.setdefault('COMPRESSION_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESSION_GZIP_LEVEL', 6)
+    app.config.setdefault('COMPRESSION_ZSTD_LEVEL', 3)
+    if zstandard is None:
+        logger.info("zstandard is not installed; responses are compressed with gzip only")
+
+    @app.after_request
+    def compress_response(response):
+        config = app.config
+        if (not config['COMPRESSION_ENABLED']
+                or response.status_code != 200
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding, config)
+        else:
+            data = response.get_data()
+            if len(data) < config['COMPRESSION_MIN_SIZE']:
+                return response
+            response.set_data(compress(data, encoding, config))
+
+        response.headers['Content-Encoding'] = encoding
+        # The compressed bytes differ from the identity representation, so
+        # only a weak validator still holds for both
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,54 @@
+from datetime import date, datetime
+from typing import Any, Union
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    # Datetimes are emitted as ISO 8601, matching orjson's native output
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider using orjson when installed.
+
+    Datetimes serialize natively to ISO 8601 on both the orjson and the
+    stdlib path, so models can hand raw datetime values to jsonify().
+    """
+    default = staticmethod(_default)
+
+    def _orjson_options(self) -> int:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_options()).decode('utf-8')
+
+    def dumpb(self, obj: Any) -> bytes:
+        """Serialize straight to UTF-8 bytes, skipping the str round trip."""
+        if orjson is None:
+            return super().dumps(obj, separators=(',', ':')).encode('utf-8')
+        return orjson.dumps(obj, default=self.default, option=self._orjson_options())
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        if orjson is None or self._app.debug or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            self.dumpb(obj) + b'\n', mimetype=self.mimetype
+        )
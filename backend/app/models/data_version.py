@@ -0,0 +1,17 @@
+from app.extensions import db
+from datetime import datetime
+
+class DataVersion(db.Model):
+    """Change counter for a cached collection, e.g. 'companies' or 'esg_data:company:3'."""
+    __tablename__ = 'data_version'
+
+    key = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'key': self.key,
+            'version': self.version,
+            'updated_at': self.updated_at
+        }
@@ -1,7 +1,33 @@
 from app.extensions import db
 from datetime import datetime
 
+# Metric columns grouped by pillar, in the order used by to_dict()
+ESG_PILLARS = {
+    'environmental': (
+        'co2_emissions', 'energy_consumption', 'water_usage',
+        'waste_generated', 'renewable_energy_percent'
+    ),
+    'social': (
+        'employee_count', 'diversity_ratio', 'safety_incidents',
+        'training_hours', 'community_investment'
+    ),
+    'governance': (
+        'board_independence', 'board_diversity', 'ethics_violations',
+        'data_breaches'
+    ),
+}
+ESG_METRICS = tuple(metric for metrics in ESG_PILLARS.values() for metric in metrics)
+
 class ESGData(db.Model):
+    __table_args__ = (
+        # One row per company and reporting date; also serves company/date lookups
+        db.UniqueConstraint('company_id', 'date', name='uq_esg_data_company_id_date'),
+        db.Index('ix_esg_data_date_id', 'date', 'id'),
+        # Never reuse the id of a deleted row: archived rows keep their ids,
+        # and history reads rely on ids being unique across both tables
+        {'sqlite_autoincrement': True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=False)
     date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -30,7 +56,7 @@ class ESGData(db.Model):
         return {
             'id': self.id,
             'company_id': self.company_id,
-            'date': self.date.isoformat(),
+            'date': self.date,
             'environmental': {
                 'co2_emissions': self.co2_emissions,
                 'energy_consumption': self.energy_consumption,
@@ -0,0 +1,39 @@
+from app.extensions import db
+from app.models.esg_data import ESGData, ESG_METRICS
+from sqlalchemy import DDL, event, select, union_all
+
+esg_table = ESGData.__table__
+
+# Cold storage for closed years, moved out of esg_data by
+# `flask archive-esg-data` so the hot table and its indexes stay small.
+# Same columns and ids as esg_data. On PostgreSQL the table is range
+# partitioned by date, one partition per archived year; elsewhere it is
+# a single plain table, with no per-year shards. esg_data itself is not
+# partitioned on any backend.
+esg_data_archive = db.Table(
+    'esg_data_archive',
+    db.Column('id', db.Integer, primary_key=True, autoincrement=False),
+    db.Column('company_id', db.Integer, db.ForeignKey('company.id'), nullable=False),
+    # Part of the key because PostgreSQL requires the partition column in it
+    db.Column('date', db.DateTime, primary_key=True),
+    *[db.Column(metric, esg_table.c[metric].type) for metric in ESG_METRICS],
+    db.UniqueConstraint('company_id', 'date', name='uq_esg_data_archive_company_id_date'),
+    db.Index('ix_esg_data_archive_date', 'date'),
+    postgresql_partition_by='RANGE (date)',
+)
+
+# Rows outside every yearly partition land here rather than failing
+event.listen(
+    esg_data_archive, 'after_create',
+    DDL('CREATE TABLE IF NOT EXISTS esg_data_archive_default PARTITION OF esg_data_archive DEFAULT')
+    .execute_if(dialect='postgresql')
+)
+
+
+def esg_history():
+    """Hot and archived ESG rows as one subquery with the esg_data columns."""
+    columns = [column.name for column in esg_table.c]
+    return union_all(
+        select(*[esg_table.c[name] for name in columns]),
+        select(*[esg_data_archive.c[name] for name in columns]),
+    ).subquery('esg_history')
@@ -0,0 +1,40 @@
+from app.extensions import db
+from app.models.esg_data import ESG_METRICS, ESG_PILLARS
+
+ROLLUP_DIMENSIONS = ('company', 'industry', 'country')
+
+# Sums and non-null counts are stored rather than averages so that new
+# rows can be folded in incrementally
+esg_rollup = db.Table(
+    'esg_rollup',
+    db.Column('dimension', db.String(20), primary_key=True),
+    db.Column('dimension_key', db.String(100), primary_key=True),
+    db.Column('year', db.Integer, primary_key=True),
+    db.Column('row_count', db.Integer, nullable=False, default=0),
+    *[db.Column(f'{metric}_sum', db.Float, nullable=False, default=0) for metric in ESG_METRICS],
+    *[db.Column(f'{metric}_count', db.Integer, nullable=False, default=0) for metric in ESG_METRICS],
+)
+
+class ESGRollup(db.Model):
+    """Per-year ESG aggregates by company, industry or country."""
+    __table__ = esg_rollup
+
+    def to_dict(self):
+        entry = {
+            'dimension': self.dimension,
+            'key': self.dimension_key or None,
+            'year': self.year,
+            'record_count': self.row_count
+        }
+        for pillar, metrics in ESG_PILLARS.items():
+            entry[pillar] = {}
+            for metric in metrics:
+                count = getattr(self, f'{metric}_count')
+                total = getattr(self, f'{metric}_sum')
+                # count lets clients merge rollups: sum of sums / sum of counts
+                entry[pillar][metric] = {
+                    'avg': total / count if count else None,
+                    'sum': total if count else None,
+                    'count': count
+                }
+        return entry
@@ -0,0 +1,57 @@
+from app.extensions import db
+from datetime import datetime
+
+class IngestJob(db.Model):
+    """A background ingestion of a spooled upload.
+
+    ``committed_line`` is the last input line whose chunk was committed;
+    a resumed job skips everything up to it.
+    """
+    __tablename__ = 'ingest_job'
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    id = db.Column(db.String(32), primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default=QUEUED, index=True)
+    format = db.Column(db.String(20), nullable=False)
+    mode = db.Column(db.String(20), nullable=False, default='insert')
+    chunk_size = db.Column(db.Integer, nullable=False)
+    source_path = db.Column(db.String(500), nullable=False)
+    total_lines = db.Column(db.Integer, nullable=False, default=0)
+    committed_line = db.Column(db.Integer, nullable=False, default=0)
+    inserted = db.Column(db.Integer, nullable=False, default=0)
+    updated = db.Column(db.Integer, nullable=False, default=0)
+    unchanged = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    chunks = db.Column(db.Integer, nullable=False, default=0)
+    errors = db.Column(db.JSON, nullable=False, default=list)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'format': self.format,
+            'mode': self.mode,
+            'chunk_size': self.chunk_size,
+            'total_lines': self.total_lines,
+            'committed_line': self.committed_line,
+            'progress': min(self.committed_line / self.total_lines, 1.0) if self.total_lines else 0.0,
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'failed': self.failed,
+            'chunks': self.chunks,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
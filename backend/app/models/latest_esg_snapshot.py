@@ -0,0 +1,21 @@
+from app.extensions import db
+
+class LatestESGSnapshot(db.Model):
+    """Pointer to the most recent ESGData row of each company.
+
+    Maintained by app.services.snapshots whenever ESG data is written.
+    """
+    __tablename__ = 'latest_esg_snapshot'
+
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id', ondelete='CASCADE'), primary_key=True)
+    esg_data_id = db.Column(db.Integer, db.ForeignKey('esg_data.id', ondelete='CASCADE'), nullable=False)
+    date = db.Column(db.DateTime, nullable=False)
+
+    esg_data = db.relationship('ESGData', lazy='joined')
+
+    def to_dict(self):
+        return {
+            'company_id': self.company_id,
+            'esg_data_id': self.esg_data_id,
+            'date': self.date
+        }
@@ -0,0 +1,41 @@
+from app.extensions import db
+from datetime import datetime
+
+class ReportJob(db.Model):
+    """A report rendered in the background on the report process pool.
+
+    The rendered file stays in ``file_path`` until pruned.
+    """
+    __tablename__ = 'report_job'
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    id = db.Column(db.String(32), primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default=QUEUED, index=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id', ondelete='CASCADE'), nullable=False)
+    format = db.Column(db.String(20), nullable=False)
+    sections = db.Column(db.JSON, nullable=False, default=dict)
+    file_path = db.Column(db.String(500), nullable=False)
+    download_name = db.Column(db.String(200), nullable=False)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'company_id': self.company_id,
+            'format': self.format,
+            'sections': self.sections,
+            'download_name': self.download_name,
+            'file_url': f'/reports/jobs/{self.id}/file' if self.status == self.SUCCEEDED else None,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
@@ -0,0 +1,71 @@
+from flask import Blueprint, jsonify, request
+from app.services.analytics import industry_averages, rollup_rows
+from app.models.esg_rollup import ROLLUP_DIMENSIONS
+from app.services.scoring import score_esg_data
+from app.services.versioning import COMPANIES, ESG_DATA, conditional
+from app.utils.params import parse_date, parse_flag
+from app.utils.db_routing import read_replica
+
+analytics = Blueprint('analytics', __name__)
+
+
+def parse_date_arg(name):
+    return parse_date(request.args.get(name))
+
+
+@analytics.route('/api/analytics/industries', methods=['GET'])
+@read_replica
+@conditional(ESG_DATA, COMPANIES)
+def get_industry_averages():
+    try:
+        start = parse_date_arg('start')
+        end = parse_date_arg('end')
+    except ValueError as e:
+        return jsonify({'error': f'Invalid date: {e}'}), 400
+
+    latest_only = parse_flag(request.args.get('latest'))
+    return jsonify(industry_averages(start, end, latest_only))
+
+
+@analytics.route('/api/scores', methods=['GET', 'POST'])
+@read_replica
+@conditional(ESG_DATA)
+def get_scores():
+    # POST accepts the same options as a JSON body, for long company lists
+    if request.method == 'POST':
+        params = request.get_json() or {}
+        company_ids = params.get('company_ids')
+    else:
+        params = request.args
+        company_ids = request.args.get('company_ids')
+        if company_ids:
+            company_ids = company_ids.split(',')
+
+    try:
+        if company_ids is not None:
+            company_ids = [int(company_id) for company_id in company_ids]
+        start = parse_date(params.get('start'))
+        end = parse_date(params.get('end'))
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': f'Invalid parameter: {e}'}), 400
+
+    latest_only = parse_flag(params.get('latest'))
+    return jsonify(score_esg_data(company_ids, start, end, latest_only))
+
+
+@analytics.route('/api/analytics/rollups/<dimension>', methods=['GET'])
+@read_replica
+@conditional(ESG_DATA, COMPANIES)
+def get_rollups(dimension):
+    if dimension not in ROLLUP_DIMENSIONS:
+        return jsonify({'error': f'Unknown dimension: {dimension}'}), 404
+    try:
+        years = {name: request.args.get(name) for name in ('year', 'start_year', 'end_year')}
+        years = {name: int(value) for name, value in years.items() if value is not None}
+    except ValueError as e:
+        return jsonify({'error': f'Invalid year: {e}'}), 400
+
+    start_year = years.get('year', years.get('start_year'))
+    end_year = years.get('year', years.get('end_year'))
+    rollups = rollup_rows(dimension, request.args.get('key'), start_year, end_year)
+    return jsonify([rollup.to_dict() for rollup in rollups])
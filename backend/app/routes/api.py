@@ -1,32 +1,176 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, Response, stream_with_context, current_app, abort
 from app.models.company import Company
-from app.models.esg_data import ESGData
+from app.models.esg_data import ESGData, ESG_PILLARS
 from app import db
-from datetime import datetime
-from sqlalchemy.exc import OperationalError
-import time
+from app.utils.pagination import (
+    STREAM_BATCH_SIZE, keyset_page, parse_limit, iter_json_array, iter_ndjson
+)
+from app.utils.fieldsets import parse_fieldset, fieldset_columns, fieldset_serializer
+from app.services.timeseries import (
+    AGGREGATES, BUCKETS, bucketed_series, raw_series, downsample
+)
+from app.utils.params import parse_date, parse_flag
+from app.utils.db_routing import primary, read_replica
+from app.utils.validation import validate_entries
+from app.services.ingest import (
+    existing_company_ids, row_to_dict, bulk_insert, bulk_upsert, parse_chunk_size,
+    ArchivedRowsError, BINARY_FORMATS, INGEST_PARSERS, ingest_records, text_stream
+)
+from app.services.archive import esg_source
+from app.services.cache import company_cache, report_cache
+from app.services.jobs import create_ingest_job, job_queue
+from app.services.versioning import (
+    COMPANIES, ESG_DATA, company_key, company_esg_key, bump_versions, conditional, versioned_key
+)
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+import io
+import shutil
+import tempfile
 
 api = Blueprint('api', __name__)
 
 @api.route('/api/companies', methods=['GET'])
+@read_replica
+@conditional(COMPANIES)
 def get_companies():
-    companies = Company.query.all()
-    return jsonify([company.to_dict() for company in companies])
+    # Cache fills read the primary: a lagging replica read right after a
+    # write would otherwise be cached under the new version
+    def load():
+        with primary():
+            companies = Company.query.all()
+        return current_app.json.dumpb([company.to_dict() for company in companies])
+
+    payload = company_cache().get_or_load(versioned_key(COMPANIES), load)
+    return current_app.response_class(payload, mimetype='application/json')
 
 @api.route('/api/companies/<int:company_id>', methods=['GET'])
+@read_replica
+@conditional(company_key)
 def get_company(company_id):
-    company = Company.query.get_or_404(company_id)
-    return jsonify(company.to_dict())
+    def load():
+        with primary():
+            company = db.session.get(Company, company_id)
+        return current_app.json.dumpb(company.to_dict()) if company else None
+
+    payload = company_cache().get_or_load(versioned_key(company_key(company_id)), load)
+    if payload is None:
+        abort(404)
+    return current_app.response_class(payload, mimetype='application/json')
+
+@api.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify({'companies': company_cache().stats(), 'reports': report_cache().stats()})
+
+def esg_data_query(source=ESGData):
+    """Query and serializer for ESG data honouring ``fields=`` / ``pillars=``.
+
+    Sparse requests select only the needed columns as plain row tuples,
+    skipping ORM entity construction altogether. So do full requests over
+    the history alias, whose rows must not be merged by id.
+    """
+    selected = parse_fieldset(request.args.get('fields'), request.args.get('pillars'))
+    if selected is None:
+        if source is ESGData:
+            return db.session.query(source), ESGData.to_dict
+        selected = ESG_PILLARS
+    return db.session.query(*fieldset_columns(selected, source)), fieldset_serializer(selected)
 
 @api.route('/api/esg-data/company/<int:company_id>', methods=['GET'])
+@read_replica
+@conditional(company_esg_key)
 def get_company_esg_data(company_id):
-    esg_data = ESGData.query.filter_by(company_id=company_id).all()
-    return jsonify([data.to_dict() for data in esg_data])
+    source = esg_source()
+    try:
+        query, serialize = esg_data_query(source)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    esg_data = query.filter(source.company_id == company_id).all()
+    return jsonify([serialize(data) for data in esg_data])
+
+@api.route('/api/esg-data/company/<int:company_id>/series', methods=['GET'])
+@read_replica
+@conditional(company_esg_key)
+def get_company_esg_series(company_id):
+    bucket = request.args.get('bucket')
+    agg = request.args.get('agg', 'avg')
+    points = request.args.get('points')
+    try:
+        selected = parse_fieldset(request.args.get('fields'), request.args.get('pillars')) or ESG_PILLARS
+        start = parse_date(request.args.get('start'))
+        end = parse_date(request.args.get('end'))
+        if bucket and bucket not in BUCKETS:
+            raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+        if agg not in AGGREGATES:
+            raise ValueError(f"agg must be one of {', '.join(AGGREGATES)}")
+        if points is not None:
+            points = int(points)
+            if points < 3:
+                raise ValueError("points must be at least 3")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if bucket:
+        series = bucketed_series(company_id, selected, bucket, agg, start, end)
+    else:
+        series = raw_series(company_id, selected, start, end)
+
+    if points is None:
+        return jsonify(series)
+
+    # Point-budget mode: each metric is downsampled independently, so the
+    # result is keyed by metric rather than by row
+    return jsonify({
+        'company_id': company_id,
+        'bucket': bucket,
+        'points': points,
+        'series': downsample(series, selected, points)
+    })
+
+STREAM_FORMATS = {
+    'json': (iter_json_array, 'application/json'),
+    'ndjson': (iter_ndjson, 'application/x-ndjson'),
+}
 
 @api.route('/api/esg-data', methods=['GET'])
+@read_replica
+@conditional(ESG_DATA)
 def get_all_esg_data():
-    esg_data = ESGData.query.all()
-    return jsonify([data.to_dict() for data in esg_data])
+    source = esg_source()
+    try:
+        query, serialize = esg_data_query(source)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    stream = request.args.get('stream')
+    if stream:
+        if stream not in STREAM_FORMATS:
+            return jsonify({'error': f'Unsupported stream format: {stream}'}), 400
+        encoder, mimetype = STREAM_FORMATS[stream]
+        # yield_per keeps a server-side cursor open and only materializes
+        # one batch of rows at a time
+        rows = query.order_by(source.date, source.id).yield_per(STREAM_BATCH_SIZE)
+        return Response(
+            stream_with_context(encoder(rows, serialize)),
+            mimetype=mimetype
+        )
+
+    if 'limit' in request.args or 'cursor' in request.args:
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            rows, next_cursor = keyset_page(
+                query, source.date, source.id,
+                request.args.get('cursor'), limit
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({
+            'data': [serialize(data) for data in rows],
+            'next_cursor': next_cursor
+        })
+
+    esg_data = query.all()
+    return jsonify([serialize(data) for data in esg_data])
 
 @api.route('/api/companies', methods=['POST'])
 def create_company():
@@ -45,81 +189,185 @@ def create_company():
     )
     
     db.session.add(company)
+    db.session.flush()
+    bump_versions([COMPANIES, company_key(company.id)])
     db.session.commit()
     
     return jsonify(company.to_dict()), 201
 
+BATCH_RETURN_MODES = ('rows', 'ids', 'count')
+WRITE_MODES = ('insert', 'upsert')
+
 @api.route('/api/esg-data/batch', methods=['POST'])
 def add_esg_data_batch():
     data = request.json
-    results = []
+    # rows (default) echoes the inserted records, ids and count skip that work
+    return_mode = request.args.get('return', 'rows')
+    if return_mode not in BATCH_RETURN_MODES:
+        return jsonify({'error': f'return must be one of {", ".join(BATCH_RETURN_MODES)}'}), 400
+    # upsert updates existing (company_id, date) rows in place and only
+    # reports inserted/updated/unchanged counts
+    mode = request.args.get('mode', 'insert')
+    if mode not in WRITE_MODES:
+        return jsonify({'error': f'mode must be one of {", ".join(WRITE_MODES)}'}), 400
+    if not isinstance(data, dict) or 'esg_data' not in data:
+        return jsonify({'error': 'Body must be an object with an esg_data list'}), 400
+
+    # The whole batch is checked before anything is written, so one bad
+    # row no longer costs the rest; every problem is reported at once
+    rows, errors = validate_entries(data['esg_data'])
+    if not errors:
+        known = existing_company_ids(db.session.connection(), [row['company_id'] for row in rows])
+        errors = [
+            {'index': index, 'field': 'company_id', 'error': f"unknown company {row['company_id']}"}
+            for index, row in enumerate(rows) if row['company_id'] not in known
+        ]
+    if errors:
+        db.session.rollback()
+        return jsonify({
+            'error': f'{len({error["index"] for error in errors})} invalid entries',
+            'errors': errors
+        }), 400
     
     try:
-        for entry in data['esg_data']:
-            esg_data = ESGData(
-                company_id=entry['company_id'],
-                date=datetime.fromisoformat(entry['date']),
-                # Environmental metrics
-                co2_emissions=entry['environmental']['co2_emissions'],
-                energy_consumption=entry['environmental']['energy_consumption'],
-                water_usage=entry['environmental']['water_usage'],
-                waste_generated=entry['environmental']['waste_generated'],
-                renewable_energy_percent=entry['environmental']['renewable_energy_percent'],
-                # Social metrics
-                employee_count=entry['social']['employee_count'],
-                diversity_ratio=entry['social']['diversity_ratio'],
-                safety_incidents=entry['social']['safety_incidents'],
-                training_hours=entry['social']['training_hours'],
-                community_investment=entry['social']['community_investment'],
-                # Governance metrics
-                board_independence=entry['governance']['board_independence'],
-                board_diversity=entry['governance']['board_diversity'],
-                ethics_violations=entry['governance']['ethics_violations'],
-                data_breaches=entry['governance']['data_breaches']
-            )
-            db.session.add(esg_data)
-            results.append(esg_data)
-        
+        chunk_size = parse_chunk_size(
+            request.args.get('chunk_size'), current_app.config['ESG_INSERT_CHUNK_SIZE']
+        )
+        if parse_flag(request.args.get('background')):
+            # Queued as NDJSON; the response is the job, not the rows
+            lines = b''.join(current_app.json.dumpb(entry) + b'\n' for entry in data['esg_data'])
+            job = create_ingest_job(io.BytesIO(lines), 'ndjson', mode, chunk_size)
+            job_queue().submit(job.id)
+            return jsonify(job.to_dict()), 202, {'Location': f'/api/jobs/{job.id}'}
+        if mode == 'upsert':
+            counts = bulk_upsert(db.session.connection(), rows, chunk_size)
+            db.session.commit()
+            return jsonify(counts), 200
+        result = bulk_insert(
+            db.session.connection(), rows, chunk_size,
+            return_ids=return_mode != 'count'
+        )
         db.session.commit()
-        return jsonify([data.to_dict() for data in results]), 201
         
+    except IntegrityError as e:
+        db.session.rollback()
+        # e.orig only: str(e) would echo the statement and every bound value
+        return jsonify({'error': f'Duplicate or conflicting ESG rows: {e.orig}'}), 409
+    except ArchivedRowsError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 409
     except Exception as e:
         db.session.rollback()
+        return jsonify({'error': str(getattr(e, 'orig', None) or e)}), 400
+
+    if return_mode == 'count':
+        return jsonify({'inserted': result['inserted']}), 201
+    if return_mode == 'ids':
+        return jsonify(result), 201
+    ids = result['ids'] or [None] * len(rows)
+    return jsonify([row_to_dict(row, row_id) for row, row_id in zip(rows, ids)]), 201
+
+INGEST_MIMETYPES = {
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'text/csv': 'csv',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': 'xlsx',
+}
+
+@api.route('/api/esg-data/ingest', methods=['POST'])
+def ingest_esg_data():
+    # Text bodies are read line by line from the WSGI stream and never fully
+    # buffered, so upload size is not bounded by worker memory. Workbooks
+    # need random access and are spooled to a temporary file first.
+    fmt = request.args.get('format') or INGEST_MIMETYPES.get(request.mimetype)
+    if fmt not in INGEST_PARSERS:
+        return jsonify({
+            'error': 'Send NDJSON (application/x-ndjson), CSV (text/csv) or XLSX, '
+                     'or pass format=ndjson|csv|xlsx'
+        }), 415
+    mode = request.args.get('mode', 'insert')
+    if mode not in WRITE_MODES:
+        return jsonify({'error': f'mode must be one of {", ".join(WRITE_MODES)}'}), 400
+    try:
+        chunk_size = parse_chunk_size(
+            request.args.get('chunk_size'), current_app.config['ESG_INSERT_CHUNK_SIZE']
+        )
+    except ValueError as e:
         return jsonify({'error': str(e)}), 400
 
+    if parse_flag(request.args.get('background')):
+        # Spool to disk and return at once; progress is polled at /api/jobs/<id>
+        job = create_ingest_job(request.stream, fmt, mode, chunk_size)
+        job_queue().submit(job.id)
+        return jsonify(job.to_dict()), 202, {'Location': f'/api/jobs/{job.id}'}
+
+    upsert = mode == 'upsert'
+    if fmt in BINARY_FORMATS:
+        with tempfile.TemporaryFile() as spool:
+            shutil.copyfileobj(request.stream, spool)
+            spool.seek(0)
+            report = ingest_records(db.session, INGEST_PARSERS[fmt](spool), chunk_size, upsert=upsert)
+    else:
+        text = text_stream(io.BufferedReader(request.stream))
+        report = ingest_records(db.session, INGEST_PARSERS[fmt](text), chunk_size, upsert=upsert)
+    status = 201 if report.accepted else 400
+    return jsonify(report.to_dict()), status
+
+COMPANY_UPDATE_FIELDS = (
+    'description', 'environmental_highlight', 'social_highlight', 'governance_highlight'
+)
+
 @api.route('/api/companies/batch-update', methods=['PUT'])
 def update_companies_batch():
     data = request.json
-    results = []
-    max_retries = 3
-    retry_delay = 0.5  # seconds
-    
+
     try:
-        for update in data['updates']:
-            retries = 0
-            while retries < max_retries:
-                try:
-                    company = Company.query.get(update['id'])
-                    if company:
-                        company.description = update.get('description', company.description)
-                        company.environmental_highlight = update.get('environmental_highlight', company.environmental_highlight)
-                        company.social_highlight = update.get('social_highlight', company.social_highlight)
-                        company.governance_highlight = update.get('governance_highlight', company.governance_highlight)
-                        results.append(company)
-                        db.session.commit()
-                        break
-                except OperationalError as e:
-                    if "database is locked" in str(e):
-                        retries += 1
-                        if retries == max_retries:
-                            db.session.rollback()
-                            return jsonify({'error': 'Database is locked. Please try again.'}), 503
-                        time.sleep(retry_delay)
-                    else:
-                        raise
-        
-        return jsonify([company.to_dict() for company in results]), 200
-        
+        updates = []
+        for update_entry in data['updates']:
+            values = {'id': int(update_entry['id'])}
+            for field in COMPANY_UPDATE_FIELDS:
+                if field in update_entry:
+                    values[field] = update_entry[field]
+            updates.append(values)
+
+        ids = [values['id'] for values in updates]
+        current = {
+            row.id: dict(row._mapping)
+            for row in db.session.execute(
+                select(Company.id, *[getattr(Company, field) for field in COMPANY_UPDATE_FIELDS])
+                .where(Company.id.in_(list(set(ids))))
+                .with_for_update()
+            )
+        }
+        # Unknown ids are skipped, as before, and so are updates that would
+        # not change anything, so their cached payloads stay valid. The rest
+        # go out as one executemany per distinct set of fields, all in one
+        # transaction.
+        changed = []
+        for values in updates:
+            stored = current.get(values['id'])
+            if stored is None or all(stored[field] == value for field, value in values.items()):
+                continue
+            stored.update(values)
+            changed.append(values)
+        if changed:
+            db.session.execute(update(Company), changed)
+            changed_ids = {values['id'] for values in changed}
+            bump_versions([COMPANIES] + [company_key(company_id) for company_id in changed_ids])
+        db.session.commit()
+
+        companies = {
+            company.id: company
+            for company in Company.query.filter(Company.id.in_(list(current)))
+        }
+        return jsonify([companies[company_id].to_dict() for company_id in ids if company_id in companies]), 200
+
+    except OperationalError as e:
+        db.session.rollback()
+        if "database is locked" in str(e):
+            # busy_timeout already waited in the driver; let the client retry
+            return jsonify({'error': 'Database is locked. Please try again.'}), 503
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
@@ -0,0 +1,25 @@
+from flask import Blueprint, jsonify
+from app import db
+from app.models.ingest_job import IngestJob
+from app.services.jobs import job_queue
+
+jobs = Blueprint('jobs', __name__)
+
+
+@jobs.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = db.session.get(IngestJob, job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+
+@jobs.route('/api/jobs/<job_id>/resume', methods=['POST'])
+def resume_job(job_id):
+    job = db.session.get(IngestJob, job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status not in (IngestJob.QUEUED, IngestJob.FAILED):
+        return jsonify({'error': f'Job is {job.status}'}), 409
+    job_queue().submit(job.id)
+    return jsonify(job.to_dict()), 202, {'Location': f'/api/jobs/{job.id}'}
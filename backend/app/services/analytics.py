@@ -0,0 +1,95 @@
+from app.extensions import db
+from app.models.company import Company
+from app.models.esg_data import ESGData, ESG_PILLARS, ESG_METRICS
+from app.models.latest_esg_snapshot import LatestESGSnapshot
+from app.models.esg_rollup import ESGRollup
+from app.services.archive import esg_source
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func
+
+
+def latest_dates_subquery(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                          source=ESGData):
+    """Most recent ESGData date per company within the optional date range."""
+    query = db.session.query(
+        source.company_id.label('company_id'),
+        func.max(source.date).label('latest_date')
+    )
+    if start:
+        query = query.filter(source.date >= start)
+    if end:
+        query = query.filter(source.date <= end)
+    return query.group_by(source.company_id).subquery()
+
+
+def join_latest(query, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                source=ESGData):
+    """Restrict an ESGData query or select() to each company's latest row.
+
+    ``source`` is ESGData or the history alias from esg_source(); latest
+    rows are never archived, so the snapshot join works for both.
+    """
+    if start is None and end is None:
+        return query.join(LatestESGSnapshot, LatestESGSnapshot.esg_data_id == source.id)
+    latest = latest_dates_subquery(start, end, source)
+    return query.join(latest, db.and_(
+        latest.c.company_id == source.company_id,
+        latest.c.latest_date == source.date
+    ))
+
+
+def history_source(start: Optional[datetime], end: Optional[datetime], latest_only: bool):
+    """ESGData when the snapshot answers the query, else the rows ``start`` can reach."""
+    if latest_only and start is None and end is None:
+        return ESGData
+    return esg_source(start)
+
+
+def industry_averages(start: Optional[datetime] = None,
+                      end: Optional[datetime] = None,
+                      latest_only: bool = False) -> List[Dict[str, Any]]:
+    source = history_source(start, end, latest_only)
+    averages = [func.avg(getattr(source, metric)).label(metric) for metric in ESG_METRICS]
+    query = db.session.query(
+        Company.industry,
+        func.count(func.distinct(source.company_id)).label('company_count'),
+        func.count(source.id).label('record_count'),
+        *averages
+    ).select_from(source).join(Company, Company.id == source.company_id)
+
+    if latest_only:
+        query = join_latest(query, start, end, source)
+    else:
+        if start:
+            query = query.filter(source.date >= start)
+        if end:
+            query = query.filter(source.date <= end)
+
+    rows = query.group_by(Company.industry).order_by(Company.industry).all()
+
+    results = []
+    for row in rows:
+        entry = {
+            'industry': row.industry,
+            'company_count': row.company_count,
+            'record_count': row.record_count,
+        }
+        for pillar, metrics in ESG_PILLARS.items():
+            entry[pillar] = {metric: getattr(row, metric) for metric in metrics}
+        results.append(entry)
+    return results
+
+
+def rollup_rows(dimension: str, key: Optional[str] = None,
+                start_year: Optional[int] = None,
+                end_year: Optional[int] = None) -> List[ESGRollup]:
+    """Read precomputed yearly rollups; cost is independent of raw row count."""
+    query = ESGRollup.query.filter(ESGRollup.dimension == dimension)
+    if key is not None:
+        query = query.filter(ESGRollup.dimension_key == key)
+    if start_year is not None:
+        query = query.filter(ESGRollup.year >= start_year)
+    if end_year is not None:
+        query = query.filter(ESGRollup.year <= end_year)
+    return query.order_by(ESGRollup.dimension_key, ESGRollup.year).all()
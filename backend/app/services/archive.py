@@ -0,0 +1,112 @@
+from app.extensions import db
+from app.models.esg_data import ESGData
+from app.models.esg_data_archive import esg_data_archive, esg_history
+from app.models.latest_esg_snapshot import LatestESGSnapshot
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, insert, select, text, tuple_
+from sqlalchemy.orm import aliased
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rows moved per statement; bounds memory and keeps bound parameters under SQLite's limit
+ARCHIVE_BATCH_SIZE = 5000
+
+esg_table = ESGData.__table__
+
+
+def archived_through(connection=None) -> Optional[datetime]:
+    """Date of the newest archived row, or None while nothing is archived."""
+    connection = connection or db.session.connection()
+    return connection.execute(select(func.max(esg_data_archive.c.date))).scalar()
+
+
+def esg_source(start: Optional[datetime] = None):
+    """ESGData-shaped entity to query for rows dated ``start`` or later.
+
+    Returns ESGData itself when no archived row can match, so hot-path
+    queries keep using the esg_data indexes; otherwise an alias over hot
+    and archived rows that queries like ESGData. Select columns from the
+    alias, not the entity: entities are merged by id in the identity map.
+    """
+    watermark = archived_through(db.session.connection())
+    if watermark is None or (start is not None and start > watermark):
+        return ESGData
+    return aliased(ESGData, esg_history(), adapt_on_names=True)
+
+
+def archived_rows(connection, keys: Iterable[Tuple[int, datetime]]) -> Dict[Tuple[int, datetime], Dict[str, Any]]:
+    """Archived rows for the given (company_id, date) keys."""
+    keys = list(set(keys))
+    if not keys:
+        return {}
+    watermark = archived_through(connection)
+    keys = [key for key in keys if watermark is not None and key[1] <= watermark]
+    if not keys:
+        return {}
+    result = connection.execute(
+        select(esg_data_archive)
+        .where(tuple_(esg_data_archive.c.company_id, esg_data_archive.c.date).in_(keys))
+    )
+    return {(row['company_id'], row['date']): dict(row) for row in result.mappings()}
+
+
+def unarchive(connection, keys: Iterable[Tuple[int, datetime]]):
+    """Delete the archived rows for the given (company_id, date) keys.
+
+    Matched on the key rather than the id: a database archived before ids
+    stopped being reused can hold the same id twice.
+    """
+    keys = list(set(keys))
+    if keys:
+        connection.execute(
+            delete(esg_data_archive)
+            .where(tuple_(esg_data_archive.c.company_id, esg_data_archive.c.date).in_(keys))
+        )
+
+
+def ensure_year_partition(connection, year: int):
+    """Create the archive partition for ``year`` on PostgreSQL; a no-op elsewhere."""
+    if connection.dialect.name != 'postgresql':
+        return
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS esg_data_archive_{year:d} PARTITION OF esg_data_archive "
+        f"FOR VALUES FROM ('{year:d}-01-01') TO ('{year + 1:d}-01-01')"
+    ))
+
+
+def archive_year(connection, year: int, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Move one year of esg_data rows into the archive, in batches.
+
+    Rows that are a company's latest snapshot stay hot, so snapshot reads
+    never touch the archive. Rollups count hot and archived rows alike, and
+    reads see the same rows either side of the move, so neither rollups
+    nor data versions change.
+    """
+    ensure_year_partition(connection, year)
+    candidates = (
+        (esg_table.c.date >= datetime(year, 1, 1))
+        & (esg_table.c.date < datetime(year + 1, 1, 1))
+        & esg_table.c.id.not_in(select(LatestESGSnapshot.esg_data_id))
+    )
+    moved = 0
+    while True:
+        rows = connection.execute(
+            select(esg_table).where(candidates).order_by(esg_table.c.id).limit(batch_size)
+        ).mappings().all()
+        if not rows:
+            return moved
+        connection.execute(delete(esg_table).where(esg_table.c.id.in_([row['id'] for row in rows])))
+        connection.execute(insert(esg_data_archive), [dict(row) for row in rows])
+        moved += len(rows)
+
+
+def archivable_years(connection, before_year: int) -> List[int]:
+    """Years before ``before_year`` that still have rows in esg_data, oldest first."""
+    oldest = connection.execute(
+        select(func.min(esg_table.c.date)).where(esg_table.c.date < datetime(before_year, 1, 1))
+    ).scalar()
+    if oldest is None:
+        return []
+    return list(range(oldest.year, before_year))
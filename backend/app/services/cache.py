@@ -0,0 +1,233 @@
+from app.services.report_render import REPORT_TEMPLATE_VERSION
+from app.services.versioning import company_esg_key, company_key, current_versions
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Optional
+from flask import Flask, current_app
+import hashlib
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries expire after ``ttl`` seconds.
+
+    With ``max_bytes`` the least recently used entries are also evicted
+    once the cached values add up to more than that many bytes.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.size = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes):
+        if self.max_bytes is not None and len(value) > self.max_bytes:
+            return
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self.size += len(value)
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.size > self.max_bytes
+            ):
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _pop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class LocalBackend:
+    """In-process stand-in for a shared cache server, for development and tests."""
+
+    def __init__(self, ttl: float = 300):
+        self._cache = TTLCache(max_entries=100000, ttl=ttl)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: bytes):
+        self._cache.set(key, value)
+
+
+class RedisBackend:
+    """Shared cache in Redis, so every worker sees the same entries."""
+
+    def __init__(self, url: str, ttl: float = 300, prefix: str = 'esg:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(
+                "CACHE_BACKEND 'redis' needs the redis package: pip install -r requirements-optional.txt"
+            ) from None
+        self._client = redis.Redis.from_url(url)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes):
+        self._client.set(self.prefix + key, value, ex=self.ttl)
+
+
+class ReadThroughCache:
+    """Two-tier read-through cache of serialized payloads.
+
+    Lookups try the local LRU, then the optional shared backend, and only
+    then call the loader. Loader results of None are not cached.
+    """
+
+    def __init__(self, local: TTLCache, shared=None):
+        self.local = local
+        self.shared = shared
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def _count(self, counter: str):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached value from either tier, or None (counted as a miss)."""
+        value = self.local.get(key)
+        if value is not None:
+            self._count('hits')
+            return value
+
+        if self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except Exception as e:
+                logger.warning(f"Shared cache get failed for {key}: {e}")
+            if value is not None:
+                self._count('shared_hits')
+                self.local.set(key, value)
+                return value
+
+        self._count('misses')
+        return None
+
+    def set(self, key: str, value: bytes):
+        self.local.set(key, value)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value)
+            except Exception as e:
+                logger.warning(f"Shared cache set failed for {key}: {e}")
+
+    def get_or_load(self, key: str, loader: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            'hits': self.hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+            'entries': len(self.local),
+            'bytes': self.local.size,
+            'evictions': self.local.evictions,
+            'backend': type(self.shared).__name__ if self.shared is not None else None
+        }
+
+
+def create_shared_backend(app: Flask):
+    backend = app.config['CACHE_BACKEND']
+    ttl = app.config['CACHE_TTL']
+    if backend == 'local':
+        return LocalBackend(ttl=ttl)
+    if backend == 'redis':
+        return RedisBackend(app.config['CACHE_REDIS_URL'], ttl=ttl)
+    return None
+
+
+def init_cache(app: Flask):
+    app.config.setdefault('CACHE_TTL', 300)
+    app.config.setdefault('CACHE_MAX_ENTRIES', 1024)
+    # None keeps everything in process; 'local' or 'redis' add a shared tier.
+    # Callers key entries with versioned_key(), so writes need no invalidation
+    app.config.setdefault('CACHE_BACKEND', None)
+    app.config.setdefault('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+
+    app.extensions['company_cache'] = ReadThroughCache(
+        TTLCache(app.config['CACHE_MAX_ENTRIES'], app.config['CACHE_TTL']),
+        create_shared_backend(app)
+    )
+
+    # Rendered reports; content-addressed, so entries never need invalidating
+    # and the byte budget decides what stays
+    app.config.setdefault('REPORT_CACHE_MAX_ENTRIES', 512)
+    app.config.setdefault('REPORT_CACHE_MAX_BYTES', 64 * 1024 * 1024)
+    app.config.setdefault('REPORT_CACHE_TTL', 24 * 3600)
+    app.extensions['report_cache'] = ReadThroughCache(TTLCache(
+        app.config['REPORT_CACHE_MAX_ENTRIES'], app.config['REPORT_CACHE_TTL'],
+        max_bytes=app.config['REPORT_CACHE_MAX_BYTES']
+    ))
+
+
+def company_cache() -> ReadThroughCache:
+    return current_app.extensions['company_cache']
+
+
+def report_cache() -> ReadThroughCache:
+    return current_app.extensions['report_cache']
+
+
+def report_cache_key(company, esg_data, sections: Dict[str, Any], fmt: str,
+                     versions: Optional[Dict[str, Any]] = None, report_date: Optional[date] = None) -> str:
+    """Content address of a rendered report.
+
+    Covers everything the output depends on: the company and ESG data
+    versions, the latest row, the enabled sections, the format, the
+    template, and the report date, the only date render_report() writes
+    (default today; pass the same one to both). New data or company edits
+    change the key, so stale entries are never served and simply age out.
+    Pass ``versions`` from current_versions() to key many reports with a
+    single lookup.
+    """
+    keys = [company_key(company.id), company_esg_key(company.id)]
+    if versions is None:
+        versions = current_versions(keys)
+    parts = [f'{key}:{versions[key].version if key in versions else 0}' for key in keys]
+    parts += [
+        f'esg:{esg_data.id}:{esg_data.date.isoformat()}',
+        'sections:' + ','.join(sorted(name for name, enabled in (sections or {}).items() if enabled)),
+        f'format:{fmt}',
+        f'template:{REPORT_TEMPLATE_VERSION}',
+        f'day:{(report_date or date.today()).isoformat()}',
+    ]
+    return 'report:' + hashlib.sha256('|'.join(parts).encode()).hexdigest()
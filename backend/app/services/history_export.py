@@ -0,0 +1,96 @@
+from app.extensions import db
+from app.models.company import Company
+from app.models.esg_data import ESG_PILLARS, ESG_METRICS
+from app.services.archive import esg_source
+from app.utils.pagination import STREAM_BATCH_SIZE
+from datetime import datetime
+from typing import BinaryIO, Iterable, Optional, Union
+from sqlalchemy import select
+import xlsxwriter
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Excel's hard limit, header row included; longer pillars continue on another sheet
+MAX_SHEET_ROWS = 1048576
+BASE_HEADERS = ('Company ID', 'Company', 'Date')
+
+
+class _PillarSheets:
+    """Row cursor over one pillar's worksheet(s)."""
+
+    def __init__(self, workbook, pillar: str, metrics, header_format, date_format):
+        self.workbook = workbook
+        self.title = pillar.capitalize()
+        self.headers = BASE_HEADERS + tuple(metrics)
+        self.header_format = header_format
+        self.date_format = date_format
+        self.sheets = 0
+        self._new_sheet()
+
+    def _new_sheet(self):
+        self.sheets += 1
+        name = self.title if self.sheets == 1 else f'{self.title} ({self.sheets})'
+        self.worksheet = self.workbook.add_worksheet(name)
+        self.worksheet.write_row(0, 0, self.headers, self.header_format)
+        self.worksheet.set_column(1, 1, 30)
+        self.worksheet.set_column(2, 2, 12)
+        self.worksheet.freeze_panes(1, 0)
+        self.row = 1
+
+    def append(self, company_id: int, company_name: str, date: datetime, values):
+        if self.row == MAX_SHEET_ROWS:
+            self._new_sheet()
+        worksheet = self.worksheet
+        worksheet.write_number(self.row, 0, company_id)
+        worksheet.write_string(self.row, 1, company_name or '')
+        worksheet.write_datetime(self.row, 2, date, self.date_format)
+        worksheet.write_row(self.row, 3, values)
+        self.row += 1
+
+
+def write_history_workbook(output: Union[str, BinaryIO], company_ids: Iterable[int],
+                           start: Optional[datetime] = None, end: Optional[datetime] = None) -> int:
+    """Write the full ESG history of ``company_ids`` to an XLSX workbook, one sheet per pillar.
+
+    Rows are read with a server-side cursor in STREAM_BATCH_SIZE batches
+    and written by xlsxwriter in constant_memory mode, which flushes each
+    row to disk as soon as the next one starts, so memory stays flat
+    however long the history is. Archived years are included. Returns
+    the number of ESG rows written.
+    """
+    company_ids = list(company_ids)
+    source = esg_source(start)
+    query = (
+        select(source.company_id, Company.name, source.date, *[getattr(source, metric) for metric in ESG_METRICS])
+        .join(Company, Company.id == source.company_id)
+        .where(source.company_id.in_(company_ids))
+        .order_by(source.company_id, source.date, source.id)
+    )
+    if start:
+        query = query.where(source.date >= start)
+    if end:
+        query = query.where(source.date <= end)
+
+    # constant_memory is ignored with in_memory, so the workbook needs a real file
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    try:
+        header_format = workbook.add_format({'bold': True})
+        date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+        sheets = []
+        offset = 3
+        for pillar, metrics in ESG_PILLARS.items():
+            sheets.append((_PillarSheets(workbook, pillar, metrics, header_format, date_format),
+                           slice(offset, offset + len(metrics))))
+            offset += len(metrics)
+
+        count = 0
+        rows = db.session.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        for row in rows:
+            for pillar_sheets, columns in sheets:
+                pillar_sheets.append(row[0], row[1], row[2], row[columns])
+            count += 1
+    finally:
+        workbook.close()
+    logger.info(f"Exported {count} ESG rows for {len(set(company_ids))} companies")
+    return count
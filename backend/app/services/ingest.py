@@ -0,0 +1,534 @@
+from app.models.company import Company
+from app.models.esg_data import ESGData, ESG_PILLARS, ESG_METRICS
+from app.services.archive import archived_rows, unarchive
+from app.services.rollups import apply_rollup_deltas
+from app.utils.sql import dialect_insert
+from app.utils.validation import ENTRY_SCHEMA
+from app.services.snapshots import refresh_latest_snapshots
+from app.services.versioning import ESG_DATA, company_esg_key, bump_versions
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, TextIO, Tuple, Union
+from sqlalchemy import bindparam, insert, or_, select, tuple_, update
+import csv
+import io
+import json
+import logging
+import openpyxl
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 10000
+# Only the first errors are echoed back; the rest are just counted
+MAX_REPORTED_ERRORS = 1000
+ESG_COLUMNS = ('company_id', 'date') + ESG_METRICS
+UPSERT_KEY = ('company_id', 'date')
+
+esg_table = ESGData.__table__
+
+
+class ArchivedRowsError(ValueError):
+    """Insert-mode rows whose (company_id, date) key is already archived."""
+
+
+def entry_to_row(entry: Mapping[str, Any]) -> Dict[str, Any]:
+    """Flatten one nested API payload entry into an esg_data row.
+
+    Raises ValueError listing every problem with the entry.
+    """
+    row, errors = ENTRY_SCHEMA.validate(entry)
+    if errors:
+        raise ValueError('; '.join(f'{field}: {message}' if field else message for field, message in errors))
+    return row
+
+
+def _cell_value(value):
+    """A CSV or spreadsheet cell as the JSON value the entry schema checks.
+
+    Blank cells are null and numeric text becomes a number; anything else
+    is passed on for the schema to reject with the field's name.
+    """
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if not isinstance(value, str):
+        return value
+    value = value.strip()
+    if not value:
+        return None
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def record_to_entry(record: Mapping[str, Any]) -> Dict[str, Any]:
+    """Nest one flat record (CSV row, spreadsheet row) in the API entry shape.
+
+    Columns missing from the record stay missing, so the schema reports them.
+    """
+    entry = {name: _cell_value(record[name]) for name in ('company_id', 'date') if name in record}
+    for pillar, metrics in ESG_PILLARS.items():
+        entry[pillar] = {metric: _cell_value(record[metric]) for metric in metrics if metric in record}
+    return entry
+
+
+def record_to_row(record: Mapping[str, Any]) -> Dict[str, Any]:
+    """Convert one flat record into an esg_data row through ENTRY_SCHEMA.
+
+    Raises ValueError naming every field that failed, as entry_to_row does.
+    """
+    return entry_to_row(record_to_entry(record))
+
+
+def row_to_dict(row: Mapping[str, Any], row_id: int) -> Dict[str, Any]:
+    """Same shape as ESGData.to_dict(), built without loading the entity."""
+    payload = {'id': row_id, 'company_id': row['company_id'], 'date': row['date']}
+    for pillar, metrics in ESG_PILLARS.items():
+        payload[pillar] = {metric: row.get(metric) for metric in metrics}
+    return payload
+
+
+def chunked(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_chunk_size(value: Optional[str], default: int = DEFAULT_CHUNK_SIZE) -> int:
+    if value is None:
+        return default
+    size = int(value)
+    if size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+    return min(size, MAX_CHUNK_SIZE)
+
+
+def after_rows_written(connection, rows: List[Mapping[str, Any]]):
+    """Keep snapshots, rollups and version counters in step with new rows.
+
+    Core inserts bypass the ORM flush hooks, so bulk paths call this for
+    every chunk inside the same transaction.
+    """
+    company_ids = {row['company_id'] for row in rows}
+    refresh_latest_snapshots(connection, company_ids)
+    apply_rollup_deltas(connection, rows)
+    bump_versions([ESG_DATA] + [company_esg_key(company_id) for company_id in company_ids], connection)
+
+
+def insert_chunk(connection, rows: List[Dict[str, Any]], return_ids: bool = True) -> Optional[List[int]]:
+    """Insert one chunk with a single executemany.
+
+    Returns the new ids in input order when the backend supports
+    RETURNING for executemany, otherwise None.
+    """
+    if not rows:
+        return []
+    archived = archived_rows(connection, [_key(row) for row in rows])
+    if archived:
+        company_id, date = min(archived)
+        raise ArchivedRowsError(
+            f"{len(archived)} rows already exist in the archive, e.g. company {company_id} "
+            f"on {date.isoformat()}; use upsert mode to update them"
+        )
+    ids = None
+    if return_ids and connection.dialect.insert_executemany_returning_sort_by_parameter_order:
+        result = connection.execute(
+            insert(esg_table).returning(esg_table.c.id, sort_by_parameter_order=True),
+            rows
+        )
+        ids = list(result.scalars())
+    else:
+        connection.execute(insert(esg_table), rows)
+    after_rows_written(connection, rows)
+    return ids
+
+
+def bulk_insert(connection, rows: Iterable[Dict[str, Any]],
+                chunk_size: int = DEFAULT_CHUNK_SIZE,
+                return_ids: bool = True) -> Dict[str, Any]:
+    """Insert ``rows`` in chunks of ``chunk_size`` within the caller's transaction."""
+    inserted = 0
+    ids = [] if return_ids else None
+    for chunk in chunked(rows, chunk_size):
+        chunk_ids = insert_chunk(connection, chunk, return_ids)
+        inserted += len(chunk)
+        if ids is not None:
+            if chunk_ids is None:
+                ids = None
+            else:
+                ids.extend(chunk_ids)
+    logger.debug(f"Bulk inserted {inserted} ESG rows in chunks of {chunk_size}")
+    return {'inserted': inserted, 'ids': ids}
+
+
+def _key(row: Mapping[str, Any]) -> Tuple[int, datetime]:
+    return row['company_id'], row['date']
+
+
+def existing_rows(connection, keys: Iterable[Tuple[int, datetime]]) -> Dict[Tuple[int, datetime], Dict[str, Any]]:
+    """Current esg_data rows for the given (company_id, date) keys."""
+    keys = list(set(keys))
+    if not keys:
+        return {}
+    result = connection.execute(
+        select(esg_table.c.id, *[esg_table.c[column] for column in ESG_COLUMNS])
+        .where(tuple_(esg_table.c.company_id, esg_table.c.date).in_(keys))
+    )
+    return {_key(row): dict(row) for row in result.mappings()}
+
+
+def _write_upserts(connection, rows: List[Dict[str, Any]], current: Mapping[Tuple[int, datetime], Dict[str, Any]]):
+    upsert = dialect_insert(connection, esg_table)
+    if upsert is not None:
+        # Rows that are already identical are skipped by the WHERE clause,
+        # which also covers concurrent writers that got there first
+        connection.execute(upsert.on_conflict_do_update(
+            index_elements=list(UPSERT_KEY),
+            set_={metric: upsert.excluded[metric] for metric in ESG_METRICS},
+            where=or_(*[esg_table.c[metric].is_distinct_from(upsert.excluded[metric]) for metric in ESG_METRICS])
+        ), rows)
+        return
+
+    new_rows = [row for row in rows if _key(row) not in current]
+    changed = [dict(row, row_id=current[_key(row)]['id']) for row in rows if _key(row) in current]
+    if new_rows:
+        connection.execute(insert(esg_table), new_rows)
+    if changed:
+        connection.execute(
+            update(esg_table)
+            .where(esg_table.c.id == bindparam('row_id'))
+            .values({metric: bindparam(metric) for metric in ESG_METRICS}),
+            changed
+        )
+
+
+def upsert_chunk(connection, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Insert new (company_id, date) keys and update changed ones in place.
+
+    Rows are compared with what is stored so the counts are exact and
+    rollups can swap the old values for the new ones. A key repeated in
+    the chunk is applied in order, the last occurrence winning.
+    """
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    if not rows:
+        return counts
+    stored = existing_rows(connection, [_key(row) for row in rows])
+    # A changed archived row moves back to esg_data (under a new id)
+    archived = archived_rows(connection, [_key(row) for row in rows if _key(row) not in stored])
+    previous_rows = {**archived, **stored}
+    current = dict(previous_rows)
+    pending = {}
+    for row in rows:
+        key = _key(row)
+        previous = current.get(key)
+        if previous is None:
+            counts['inserted'] += 1
+        elif all(previous.get(metric) == row.get(metric) for metric in ESG_METRICS):
+            counts['unchanged'] += 1
+            continue
+        else:
+            counts['updated'] += 1
+        current[key] = row
+        pending[key] = row
+
+    written = list(pending.values())
+    if written:
+        unarchive(connection, [key for key in pending if key in archived])
+        _write_upserts(connection, written, stored)
+        apply_rollup_deltas(connection, [previous_rows[key] for key in pending if key in previous_rows], sign=-1)
+        after_rows_written(connection, written)
+    return counts
+
+
+def bulk_upsert(connection, rows: Iterable[Dict[str, Any]],
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, int]:
+    """Upsert ``rows`` in chunks of ``chunk_size`` within the caller's transaction."""
+    totals = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    for chunk in chunked(rows, chunk_size):
+        for name, count in upsert_chunk(connection, chunk).items():
+            totals[name] += count
+    logger.debug(f"Bulk upserted ESG rows in chunks of {chunk_size}: {totals}")
+    return totals
+
+
+ParsedRecord = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def text_stream(stream: BinaryIO) -> TextIO:
+    """Decode an upload as UTF-8 for the line parsers.
+
+    Bytes that are not valid UTF-8 become lone surrogates instead of
+    failing the whole stream, so the parsers can reject just the lines
+    holding them.
+    """
+    return io.TextIOWrapper(stream, encoding='utf-8', errors='surrogateescape', newline='')
+
+
+def _check_utf8(value: str, what: str):
+    try:
+        value.encode('utf-8')
+    except UnicodeEncodeError as e:
+        # surrogateescape maps byte 0xNN to U+DCNN
+        byte = ord(value[e.start]) - 0xdc00
+        raise ValueError(f"{what} is not valid UTF-8 (byte 0x{byte:02x} at character {e.start + 1})")
+
+
+def _decode_failed(line_no: int) -> ParsedRecord:
+    # Only streams opened without text_stream() raise; they cannot be read further
+    return line_no, None, "Input is not valid UTF-8; the rest of the upload was not read"
+
+
+def parse_ndjson(stream: TextIO) -> Iterator[ParsedRecord]:
+    """Yield (line number, row, error) for each non-blank NDJSON line.
+
+    Lines use the same nested shape as the batch endpoint entries.
+    """
+    line_no = 0
+    try:
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                _check_utf8(line, 'line')
+                yield line_no, entry_to_row(json.loads(line)), None
+            except ValueError as e:
+                yield line_no, None, str(e)
+    except UnicodeDecodeError:
+        yield _decode_failed(line_no + 1)
+
+
+def parse_csv(stream: TextIO) -> Iterator[ParsedRecord]:
+    """Yield (line number, row, error) for each CSV record after the header.
+
+    The header must name company_id, date and every metric column; cells
+    may be blank. Records are checked by the same ENTRY_SCHEMA as the
+    batch endpoint.
+    """
+    reader = csv.DictReader(stream)
+    try:
+        fieldnames = reader.fieldnames or ()
+        for name in fieldnames:
+            _check_utf8(name, 'CSV header')
+    except UnicodeDecodeError:
+        yield _decode_failed(1)
+        return
+    except ValueError as e:
+        yield 1, None, str(e)
+        return
+    missing = set(ESG_COLUMNS) - set(fieldnames)
+    if missing:
+        yield 1, None, f"Missing CSV columns: {', '.join(sorted(missing))}"
+        return
+    unknown = set(fieldnames) - set(ESG_COLUMNS)
+    if unknown:
+        yield 1, None, f"Unknown CSV columns: {', '.join(sorted(unknown))}"
+        return
+    try:
+        for record in reader:
+            try:
+                for name, value in record.items():
+                    if isinstance(value, str):
+                        _check_utf8(value, name)
+                yield reader.line_num, record_to_row(record), None
+            except (KeyError, ValueError, TypeError) as e:
+                yield reader.line_num, None, str(e)
+    except UnicodeDecodeError:
+        yield _decode_failed(reader.line_num + 1)
+
+
+def _header_name(value) -> Optional[str]:
+    if value is None:
+        return None
+    return str(value).strip().lower().replace(' ', '_')
+
+
+def parse_xlsx(source: Union[str, BinaryIO], sheet: Optional[str] = None) -> Iterator[ParsedRecord]:
+    """Yield (row number, row, error) for each worksheet row after the header.
+
+    The workbook is opened in openpyxl's read-only mode, which streams rows
+    from the file instead of building the whole sheet. Headers follow the
+    CSV rules; case and spaces are ignored ("CO2 Emissions" maps to
+    co2_emissions). Blank rows are skipped.
+    """
+    try:
+        workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    except Exception as e:
+        yield 1, None, f"Unreadable workbook: {e}"
+        return
+    try:
+        if sheet and sheet not in workbook.sheetnames:
+            yield 1, None, f"Unknown sheet {sheet}"
+            return
+        worksheet = workbook[sheet] if sheet else workbook.active
+        rows = worksheet.iter_rows(values_only=True)
+        columns = [_header_name(value) for value in next(rows, ())]
+        named = {column for column in columns if column}
+        missing = set(ESG_COLUMNS) - named
+        if missing:
+            yield 1, None, f"Missing spreadsheet columns: {', '.join(sorted(missing))}"
+            return
+        unknown = named - set(ESG_COLUMNS)
+        if unknown:
+            yield 1, None, f"Unknown spreadsheet columns: {', '.join(sorted(unknown))}"
+            return
+        for row_no, values in enumerate(rows, start=2):
+            if all(value is None for value in values):
+                continue
+            record = {column: value for column, value in zip(columns, values) if column}
+            try:
+                yield row_no, record_to_row(record), None
+            except (KeyError, ValueError, TypeError) as e:
+                yield row_no, None, str(e)
+    finally:
+        workbook.close()
+
+
+INGEST_PARSERS = {
+    'ndjson': parse_ndjson,
+    'csv': parse_csv,
+    'xlsx': parse_xlsx,
+}
+# Parsers that take a binary file (or path) rather than a text stream
+BINARY_FORMATS = {'xlsx'}
+
+
+def open_source(path: str, fmt: str):
+    if fmt in BINARY_FORMATS:
+        return open(path, 'rb')
+    return open(path, encoding='utf-8', errors='surrogateescape', newline='')
+
+
+def count_records(path: str, fmt: str) -> Optional[int]:
+    """Number of input lines (or worksheet rows) in a spooled upload, if known."""
+    if fmt == 'xlsx':
+        try:
+            workbook = openpyxl.load_workbook(path, read_only=True)
+        except Exception:
+            # The parser reports unreadable workbooks when the job runs
+            return 0
+        try:
+            # Read from the sheet's dimension tag, not by scanning rows
+            return workbook.active.max_row or 0
+        finally:
+            workbook.close()
+    return None
+
+
+class IngestReport:
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.chunks = 0
+        self.errors = []
+
+    @property
+    def accepted(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+    def add_counts(self, counts: Mapping[str, int], sign: int = 1):
+        self.inserted += sign * counts.get('inserted', 0)
+        self.updated += sign * counts.get('updated', 0)
+        self.unchanged += sign * counts.get('unchanged', 0)
+
+    def add_error(self, line: Optional[int], message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def to_dict(self):
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'failed': self.failed,
+            'chunks': self.chunks,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors)
+        }
+
+
+def existing_company_ids(connection, company_ids: Iterable[int]) -> set:
+    company_table = Company.__table__
+    return set(connection.execute(
+        select(company_table.c.id).where(company_table.c.id.in_(list(set(company_ids))))
+    ).scalars())
+
+
+def ingest_records(session, records: Iterable[ParsedRecord],
+                   chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   report: Optional[IngestReport] = None,
+                   upsert: bool = False,
+                   on_chunk: Optional[Callable[[IngestReport, int], None]] = None) -> IngestReport:
+    """Insert parsed records chunk by chunk, committing after each chunk.
+
+    Only one chunk is held in memory at a time. Bad lines are reported and
+    skipped; a chunk the database rejects is rolled back and reported
+    without stopping the rest of the stream. With ``upsert`` existing
+    (company_id, date) rows are updated in place instead of rejected.
+
+    ``on_chunk(report, last_line)`` runs inside each chunk's transaction,
+    with the report already counting that chunk, so callers can persist
+    progress atomically with the rows.
+    """
+    report = report or IngestReport()
+    pending = []
+
+    def flush():
+        if not pending:
+            return
+        last_line = pending[-1][0]
+        connection = session.connection()
+        known = existing_company_ids(connection, [row['company_id'] for _, row in pending])
+        accepted = []
+        for line_no, row in pending:
+            if row['company_id'] in known:
+                accepted.append((line_no, row))
+            else:
+                report.add_error(line_no, f"Unknown company_id {row['company_id']}")
+        pending.clear()
+        report.chunks += 1
+
+        counts = None
+        try:
+            rows = [row for _, row in accepted]
+            if upsert:
+                counts = upsert_chunk(connection, rows)
+            else:
+                insert_chunk(connection, rows, return_ids=False)
+                counts = {'inserted': len(rows)}
+            report.add_counts(counts)
+            if on_chunk is not None:
+                on_chunk(report, last_line)
+            session.commit()
+            return
+        except Exception as e:
+            session.rollback()
+            if counts is not None:
+                report.add_counts(counts, sign=-1)
+            # DBAPI errors would otherwise echo the whole statement and its parameters
+            reason = getattr(e, 'orig', None) or e
+            logger.error(f"Ingest chunk ending at line {last_line} failed: {reason}")
+            for line_no, _ in accepted:
+                report.add_error(line_no, f"Chunk rejected by database: {reason}")
+
+        if on_chunk is not None:
+            on_chunk(report, last_line)
+            session.commit()
+
+    for line_no, row, error in records:
+        if error is not None:
+            report.add_error(line_no, error)
+            continue
+        pending.append((line_no, row))
+        if len(pending) >= chunk_size:
+            flush()
+    flush()
+    return report
@@ -0,0 +1,180 @@
+from app.extensions import db
+from app.models.ingest_job import IngestJob
+from app.services.ingest import (
+    INGEST_PARSERS, IngestReport, MAX_REPORTED_ERRORS, count_records, ingest_records, open_source
+)
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import BinaryIO, Iterable, Optional
+from flask import Flask, current_app
+from sqlalchemy import select, update
+import os
+import threading
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+SPOOL_BLOCK_SIZE = 64 * 1024
+
+
+def spool_upload(stream: BinaryIO, path: str) -> int:
+    """Copy an upload to ``path`` block by block; returns its line count."""
+    lines = 0
+    last = b'\n'
+    with open(path, 'wb') as spool:
+        while True:
+            block = stream.read(SPOOL_BLOCK_SIZE)
+            if not block:
+                break
+            spool.write(block)
+            lines += block.count(b'\n')
+            last = block[-1:]
+    # A final line without a trailing newline still counts
+    return lines + (last != b'\n')
+
+
+def create_ingest_job(stream: BinaryIO, fmt: str, mode: str, chunk_size: int) -> IngestJob:
+    """Spool the upload to disk and record a queued job for it."""
+    job_id = uuid.uuid4().hex
+    job_dir = current_app.config['INGEST_JOB_DIR']
+    os.makedirs(job_dir, exist_ok=True)
+    path = os.path.join(job_dir, f'{job_id}.{fmt}')
+    total_lines = spool_upload(stream, path)
+    records = count_records(path, fmt)
+    if records is not None:
+        total_lines = records
+
+    job = IngestJob(
+        id=job_id, format=fmt, mode=mode, chunk_size=chunk_size,
+        source_path=path, total_lines=total_lines
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def _claim(job_id: str, statuses: Iterable[str]) -> bool:
+    # Conditional UPDATE so only one runner can move a job to running
+    result = db.session.execute(
+        update(IngestJob)
+        .where(IngestJob.id == job_id, IngestJob.status.in_(list(statuses)))
+        .values(status=IngestJob.RUNNING, started_at=datetime.utcnow(), error=None)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def _report_from(job: IngestJob) -> IngestReport:
+    report = IngestReport()
+    report.add_counts({'inserted': job.inserted, 'updated': job.updated, 'unchanged': job.unchanged})
+    report.failed = job.failed
+    report.chunks = job.chunks
+    report.errors = list(job.errors or [])
+    return report
+
+
+def _save_progress(job: IngestJob, report: IngestReport, last_line: Optional[int] = None):
+    if last_line is not None:
+        job.committed_line = last_line
+    job.inserted = report.inserted
+    job.updated = report.updated
+    job.unchanged = report.unchanged
+    job.failed = report.failed
+    job.chunks = report.chunks
+    job.errors = list(report.errors[:MAX_REPORTED_ERRORS])
+
+
+def run_ingest_job(job_id: str, resume_running: bool = False) -> Optional[IngestJob]:
+    """Run a job to completion, resuming after its last committed chunk.
+
+    Returns None when the job is missing or another runner has claimed it.
+    ``resume_running`` also takes over jobs left running by a process that
+    died.
+    """
+    statuses = [IngestJob.QUEUED, IngestJob.FAILED]
+    if resume_running:
+        statuses.append(IngestJob.RUNNING)
+    if not _claim(job_id, statuses):
+        return None
+
+    job = db.session.get(IngestJob, job_id)
+    skip_through = job.committed_line
+    if skip_through:
+        logger.info(f"Resuming ingest job {job_id} after line {skip_through}")
+    report = _report_from(job)
+
+    try:
+        with open_source(job.source_path, job.format) as source:
+            records = (
+                record for record in INGEST_PARSERS[job.format](source)
+                if record[0] > skip_through
+            )
+            ingest_records(
+                db.session, records, job.chunk_size, report,
+                upsert=job.mode == 'upsert',
+                on_chunk=lambda report, last_line: _save_progress(job, report, last_line)
+            )
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Ingest job {job_id} failed: {e}")
+        job.status = IngestJob.FAILED
+        job.error = str(e)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        return job
+
+    _save_progress(job, report, job.total_lines)
+    job.status = IngestJob.SUCCEEDED
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    try:
+        os.remove(job.source_path)
+    except OSError as e:
+        logger.warning(f"Could not remove spool file {job.source_path}: {e}")
+    return job
+
+
+def interrupted_job_ids():
+    return list(db.session.execute(
+        select(IngestJob.id)
+        .where(IngestJob.status.in_([IngestJob.QUEUED, IngestJob.RUNNING]))
+        .order_by(IngestJob.created_at)
+    ).scalars())
+
+
+class JobQueue:
+    """In-process queue running ingest jobs on a small thread pool.
+
+    Workers only hold job ids; all state lives in the ingest_job table.
+    """
+
+    def __init__(self, app: Flask, max_workers: int):
+        self.app = app
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, job_id: str, resume_running: bool = False):
+        with self._lock:
+            if self._executor is None:
+                # Created on first use so CLI commands don't start threads
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ingest-job')
+        return self._executor.submit(self._run, job_id, resume_running)
+
+    def _run(self, job_id: str, resume_running: bool):
+        with self.app.app_context():
+            try:
+                run_ingest_job(job_id, resume_running)
+            except Exception:
+                logger.exception(f"Ingest job {job_id} crashed")
+
+
+def init_jobs(app: Flask):
+    app.config.setdefault('INGEST_JOB_WORKERS', 2)
+    app.config.setdefault('INGEST_JOB_DIR', os.path.join(app.instance_path, 'ingest_jobs'))
+    app.extensions['job_queue'] = JobQueue(app, app.config['INGEST_JOB_WORKERS'])
+
+
+def job_queue() -> JobQueue:
+    return current_app.extensions['job_queue']
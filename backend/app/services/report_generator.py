@@ -1,10 +1,10 @@
 from app.models.company import Company
-from app.models.esg_data import ESGData
 from app import db
+from app.services.snapshots import get_latest_esg_data
 from fpdf import FPDF
 import pandas as pd
 from datetime import datetime
-import os
+import io
 from typing import Dict, Any
 import logging
 
@@ -24,12 +24,9 @@ class ReportGenerator:
         if not self.company:
             raise ValueError(f"No company found with id {company_id}")
             
-        self.esg_data = ESGData.query.filter_by(company_id=self.company.id).order_by(ESGData.date.desc()).first()
+        self.esg_data = get_latest_esg_data(self.company.id)
         if not self.esg_data:
             raise ValueError(f"No ESG data found for company {self.company.name}")
-            
-        self.temp_dir = os.path.join(os.getcwd(), 'temp')
-        os.makedirs(self.temp_dir, exist_ok=True)
 
     def generate_pdf_report(self) -> bytes:
         try:
@@ -93,12 +90,11 @@ class ReportGenerator:
                 })
                 
             df = pd.DataFrame([data])
-            excel_buffer = pd.ExcelWriter(os.path.join(self.temp_dir, 'temp.xlsx'), engine='xlsxwriter')
-            df.to_excel(excel_buffer, index=False)
-            excel_buffer.save()
-            
-            with open(os.path.join(self.temp_dir, 'temp.xlsx'), 'rb') as f:
-                return f.read()
+            # Rendered in memory: no shared temp file for concurrent requests to race on
+            excel_buffer = io.BytesIO()
+            with pd.ExcelWriter(excel_buffer, engine='xlsxwriter') as writer:
+                df.to_excel(writer, index=False)
+            return excel_buffer.getvalue()
                 
         except Exception as e:
             logger.error(f"Error generating Excel report: {str(e)}")
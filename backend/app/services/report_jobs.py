@@ -0,0 +1,260 @@
+from app.extensions import db
+from app.models.esg_data import ESG_METRICS
+from app.models.report_job import ReportJob
+from app.services.cache import report_cache, report_cache_key
+from app.services.report_render import COMPANY_FIELDS, REPORT_FORMATS, render_report, report_download_name, snapshot
+from app.services.versioning import company_esg_key, company_key, current_versions
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from flask import Flask, current_app
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.pool import NullPool
+import json
+import multiprocessing
+import os
+import re
+import threading
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+ESG_FIELDS = ('id', 'company_id', 'date') + ESG_METRICS
+
+
+# Worker-process engines by database URL, created on a worker's first job
+_worker_engines: Dict[str, Any] = {}
+
+
+def mark_running(database_url: str, job_id: str):
+    """Move a queued job to running, from the worker process.
+
+    Workers have no app, so this is one Core UPDATE on a plain engine. A
+    failure only costs the status; the render still goes ahead.
+    """
+    try:
+        engine = _worker_engines.get(database_url)
+        if engine is None:
+            engine = _worker_engines[database_url] = create_engine(database_url, poolclass=NullPool)
+        table = ReportJob.__table__
+        with engine.begin() as connection:
+            connection.execute(
+                update(table)
+                .where(table.c.id == job_id, table.c.status == ReportJob.QUEUED)
+                .values(status=ReportJob.RUNNING, started_at=datetime.utcnow())
+            )
+    except Exception as e:
+        logger.warning(f"Could not mark report job {job_id} running: {e}")
+
+
+def render_job(job_id: str, database_url: str, company, esg_data, sections: Dict[str, Any],
+               fmt: str, path: str, logo_path: str, report_date: date):
+    """Worker-process entry point."""
+    mark_running(database_url, job_id)
+    content = render_report(company, esg_data, sections, fmt, logo_path, report_date)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+class ReportPool:
+    """Renders reports on a process pool so CPU-bound work leaves the web workers.
+
+    Workers get detached copies of the rows and write the file; the parent
+    records the outcome in the report_job table when the future completes.
+    """
+
+    def __init__(self, app: Flask, max_workers: int):
+        self.app = app
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the server process holds threads and pooled DB connections
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def submit(self, job: ReportJob, company, esg_data, report_date: date, cache_key: Optional[str] = None) -> Future:
+        job_id = job.id
+        logo_path = os.path.join(self.app.root_path, 'static', 'logo.png')
+        # The resolved URL: Flask-SQLAlchemy puts relative SQLite paths in the instance folder
+        database_url = db.engine.url.render_as_string(hide_password=False)
+        args = (
+            job_id, database_url, snapshot(company, COMPANY_FIELDS), snapshot(esg_data, ESG_FIELDS),
+            job.sections, job.format, job.file_path, logo_path, report_date
+        )
+        future = self._submit(render_job, *args)
+        future.add_done_callback(lambda done: self._finish(job_id, done, cache_key))
+        return future
+
+    def _submit(self, fn, *args) -> Future:
+        try:
+            return self._pool().submit(fn, *args)
+        except BrokenProcessPool:
+            self._reset()
+            return self._pool().submit(fn, *args)
+
+    def render_unordered(self, tasks: Iterable[Tuple[Any, tuple]]) -> Iterator[Tuple[Any, Optional[bytes], Optional[BaseException]]]:
+        """Render ``(tag, render_report args)`` tasks, yielding ``(tag, content, error)`` as each finishes.
+
+        At most two renders per worker are in flight, so finished documents
+        wait for a slow consumer without piling up in memory.
+        """
+        tasks = iter(tasks)
+        window = self.max_workers * 2
+        pending = {}
+
+        def fill():
+            for tag, args in islice(tasks, window - len(pending)):
+                pending[self._submit(render_report, *args)] = tag
+
+        try:
+            fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    tag = pending.pop(future)
+                    error = future.exception()
+                    if isinstance(error, BrokenProcessPool):
+                        self._reset()
+                    yield tag, None if error else future.result(), error
+                fill()
+        finally:
+            # The consumer went away; don't render what nobody will read
+            for future in pending:
+                future.cancel()
+
+    def _reset(self):
+        with self._lock:
+            self._executor = None
+
+    def _finish(self, job_id: str, future: Future, cache_key: Optional[str] = None):
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            # A worker died; start a fresh pool for the next submission
+            self._reset()
+        with self.app.app_context():
+            try:
+                job = db.session.get(ReportJob, job_id)
+                if error is None:
+                    job.status = ReportJob.SUCCEEDED
+                    if cache_key is not None:
+                        with open(job.file_path, 'rb') as f:
+                            report_cache().set(cache_key, f.read())
+                else:
+                    logger.error(f"Report job {job_id} failed: {error!r}")
+                    job.status = ReportJob.FAILED
+                    job.error = str(error) or type(error).__name__
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+            except Exception:
+                logger.exception(f"Could not record the outcome of report job {job_id}")
+
+
+def create_report_job(company, esg_data, sections: Dict[str, Any], fmt: str) -> ReportJob:
+    """Record a job and hand it to the process pool.
+
+    A report already in the report cache is written out straight away and
+    the job is created as succeeded.
+    """
+    job_id = uuid.uuid4().hex
+    job_dir = current_app.config['REPORT_JOB_DIR']
+    os.makedirs(job_dir, exist_ok=True)
+    job = ReportJob(
+        id=job_id, company_id=company.id, format=fmt, sections=sections,
+        file_path=os.path.join(job_dir, f'{job_id}.{fmt}'),
+        download_name=report_download_name(fmt)
+    )
+    # Fixed here, so a job that renders after midnight still matches its key
+    report_date = date.today()
+    cache_key = report_cache_key(company, esg_data, sections, fmt, report_date=report_date)
+    cached = report_cache().get(cache_key)
+    if cached is not None:
+        with open(job.file_path, 'wb') as f:
+            f.write(cached)
+        job.status = ReportJob.SUCCEEDED
+        job.started_at = job.finished_at = datetime.utcnow()
+    db.session.add(job)
+    db.session.commit()
+    if cached is None:
+        report_pool().submit(job, company, esg_data, report_date, cache_key)
+    return job
+
+
+def bundle_file_name(company, fmt: str) -> str:
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', company.name or '').strip('_') or 'company'
+    return f'{company.id}_{slug}.{REPORT_FORMATS[fmt][1]}'
+
+
+def report_bundle_entries(pairs: List[Tuple[Any, Any]], sections: Dict[str, Any], fmt: str,
+                          missing: Iterable[Dict[str, Any]] = ()) -> Iterator[Tuple[str, bytes]]:
+    """(file name, content) for each (company, latest ESG row) pair, cached reports first.
+
+    The rest render in parallel on the report pool and come out as they
+    finish. Failures, and the ``missing`` entries passed in, are listed in
+    a trailing errors.json.
+    """
+    cache = report_cache()
+    versions = current_versions([
+        key for company, _ in pairs for key in (company_key(company.id), company_esg_key(company.id))
+    ])
+    logo_path = os.path.join(current_app.root_path, 'static', 'logo.png')
+    report_date = date.today()
+    errors = list(missing)
+    tasks = []
+    for company, esg_data in pairs:
+        name = bundle_file_name(company, fmt)
+        cache_key = report_cache_key(company, esg_data, sections, fmt, versions, report_date)
+        content = cache.get(cache_key)
+        if content is not None:
+            yield name, content
+            continue
+        args = (snapshot(company, COMPANY_FIELDS), snapshot(esg_data, ESG_FIELDS), sections, fmt, logo_path, report_date)
+        tasks.append(((company.id, name, cache_key), args))
+
+    for (company_id, name, cache_key), content, error in report_pool().render_unordered(tasks):
+        if error is not None:
+            logger.error(f"Bundle report for company {company_id} failed: {error!r}")
+            errors.append({'company_id': company_id, 'error': str(error) or type(error).__name__})
+            continue
+        cache.set(cache_key, content)
+        yield name, content
+
+    if errors:
+        yield 'errors.json', json.dumps(errors, indent=2).encode('utf-8')
+
+
+def prune_report_jobs(older_than: timedelta) -> List[str]:
+    """Delete jobs created more than ``older_than`` ago, along with their files.
+
+    Jobs still queued that long were lost with the process that ran them.
+    """
+    cutoff = datetime.utcnow() - older_than
+    jobs = db.session.execute(select(ReportJob).where(ReportJob.created_at < cutoff)).scalars().all()
+    for job in jobs:
+        try:
+            os.remove(job.file_path)
+        except FileNotFoundError:
+            pass
+        db.session.delete(job)
+    db.session.commit()
+    return [job.id for job in jobs]
+
+
+def init_report_jobs(app: Flask):
+    # Per web process; see Config.REPORT_JOB_WORKERS
+    app.config.setdefault('REPORT_JOB_WORKERS', 2)
+    app.config.setdefault('REPORT_JOB_DIR', os.path.join(app.instance_path, 'report_jobs'))
+    app.config.setdefault('REPORT_BUNDLE_MAX_COMPANIES', 1000)
+    app.extensions['report_pool'] = ReportPool(app, app.config['REPORT_JOB_WORKERS'])
+
+
+def report_pool() -> ReportPool:
+    return current_app.extensions['report_pool']
@@ -0,0 +1,316 @@
+"""Report rendering, kept free of Flask and the database.
+
+Everything here works on plain attribute objects so it can run in a
+worker process; see app.services.report_jobs.
+"""
+from fpdf import FPDF
+from types import SimpleNamespace
+import pandas as pd
+import io
+import os
+import re
+from datetime import date, datetime, time
+from typing import Optional
+
+# Bump whenever a change alters rendered output, so cached reports are not reused
+REPORT_TEMPLATE_VERSION = 4
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+# format -> (mimetype, file extension)
+REPORT_FORMATS = {
+    'pdf': ('application/pdf', 'pdf'),
+    'xlsx': (XLSX_MIMETYPE, 'xlsx'),
+}
+
+CREATION_DATE = re.compile(rb'/CreationDate \(D:\d{14}\)')
+
+COMPANY_FIELDS = (
+    'id', 'name', 'industry', 'size', 'country', 'description',
+    'environmental_highlight', 'social_highlight', 'governance_highlight'
+)
+
+
+def report_format(value) -> str:
+    """Normalize the requested format; anything but Excel renders a PDF."""
+    return 'xlsx' if (value or '').lower() in ('excel', 'xlsx') else 'pdf'
+
+
+def report_download_name(fmt: str) -> str:
+    return 'ESG_Report_{}.{}'.format(datetime.now().strftime("%Y-%m-%d"), REPORT_FORMATS[fmt][1])
+
+
+def snapshot(instance, fields) -> SimpleNamespace:
+    """Detached, picklable copy of the given model attributes."""
+    return SimpleNamespace(**{field: getattr(instance, field) for field in fields})
+
+
+def pin_creation_date(pdf_bytes: bytes, report_date: date) -> bytes:
+    """Replace the render time FPDF stamps as CreationDate with the report date.
+
+    The stamp is a fixed-width D:YYYYMMDDHHMMSS string, so the xref
+    offsets FPDF wrote stay valid.
+    """
+    return CREATION_DATE.sub(
+        b'/CreationDate (D:' + report_date.strftime('%Y%m%d000000').encode('ascii') + b')',
+        pdf_bytes, count=1
+    )
+
+
+def metric_text(value, spec: str = '', suffix: str = '') -> str:
+    """A metric formatted for the PDF; metrics not reported show as N/A."""
+    if value is None:
+        return 'N/A'
+    return f"{value:{spec}}{suffix}"
+
+
+def generate_excel_report(company, esg_data, sections, output, report_date: Optional[date] = None):
+    report_date = report_date or date.today()
+    # Create a dictionary to store all data
+    data = {
+        'Company Name': [company.name],
+        'Industry': [company.industry],
+        'Size': [company.size],
+        'Country': [company.country],
+        'Report Date': [datetime.combine(report_date, time()).strftime("%Y-%m-%d %H:%M:%S")]
+    }
+    
+    if sections.get('overview', False):
+        data.update({
+            'Description': [company.description],
+            'Environmental Highlight': [company.environmental_highlight],
+            'Social Highlight': [company.social_highlight],
+            'Governance Highlight': [company.governance_highlight]
+        })
+        
+    if sections.get('environmental', False):
+        data.update({
+            'CO2 Emissions (tonnes)': [esg_data.co2_emissions],
+            'Energy Consumption (MWh)': [esg_data.energy_consumption],
+            'Renewable Energy (%)': [esg_data.renewable_energy_percent],
+            'Water Usage (m³)': [esg_data.water_usage]
+        })
+        
+    if sections.get('social', False):
+        data.update({
+            'Board Diversity (%)': [esg_data.board_diversity],
+            'Ethics Violations': [esg_data.ethics_violations]
+        })
+        
+    if sections.get('governance', False):
+        data.update({
+            'Board Diversity (%)': [esg_data.board_diversity],
+            'Ethics Violations': [esg_data.ethics_violations]
+        })
+    
+    # Create DataFrame
+    df = pd.DataFrame(data)
+    
+    # Write to Excel; ``output`` is a path or a binary file object.
+    # in_memory stops xlsxwriter staging the workbook parts in temp files,
+    # and the created property would otherwise be the render time
+    with pd.ExcelWriter(output, engine='xlsxwriter', engine_kwargs={'options': {'in_memory': True}}) as writer:
+        writer.book.set_properties({'created': datetime.combine(report_date, time())})
+        df.to_excel(writer, index=False)
+
+
+def render_pdf(company, esg_data, sections, logo_path=None, report_date: Optional[date] = None) -> bytes:
+    report_date = report_date or date.today()
+    pdf = FPDF()
+    
+    # Set up document properties
+    pdf.set_title(f'ESG Report - {company.name}')
+    pdf.set_author('Sustain.ai')
+    pdf.set_creator('Sustain.ai')
+    
+    # Cover page
+    pdf.add_page()
+    
+    # Add logo
+    if logo_path and os.path.exists(logo_path):
+        pdf.image(logo_path, x=75, y=20, w=60)
+    
+    # Title section with reduced spacing after logo
+    pdf.ln(45)  # Reduced from 70 to bring title closer to logo
+    pdf.set_font('Arial', 'B', 28)
+    pdf.cell(190, 15, 'ESG Analytics Report', ln=True, align='C')
+    pdf.ln(8)
+    pdf.set_font('Arial', 'B', 20)
+    pdf.cell(190, 15, f'Annual Assessment {report_date.year}', ln=True, align='C')
+    
+    pdf.ln(20)
+    pdf.set_font('Arial', 'B', 28)
+    pdf.cell(190, 15, company.name, ln=True, align='C')
+    
+    # Add decorative line under company name
+    pdf.ln(8)
+    pdf.set_draw_color(43, 75, 128)
+    pdf.set_line_width(0.5)
+    pdf.line(30, pdf.get_y(), 180, pdf.get_y())
+    
+    # Company details centered with more spacing
+    pdf.ln(30)
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(190, 8, f'Industry: {company.industry}', ln=True, align='C')
+    pdf.ln(5)
+    pdf.cell(190, 8, f'Location: {company.country}', ln=True, align='C')
+    pdf.ln(5)
+    pdf.cell(190, 8, f'Report Period: FY {report_date.year}', ln=True, align='C')
+    
+    # Add report details with more spacing
+    pdf.ln(30)
+    pdf.set_font('Arial', 'I', 11)
+    pdf.cell(190, 8, f'Generated on {report_date.strftime("%B %d, %Y")}', ln=True, align='C')
+    pdf.cell(190, 8, 'Powered by Sustain.ai Analytics Platform', ln=True, align='C')
+    
+    # Add confidentiality notice
+    pdf.ln(30)
+    pdf.set_fill_color(243, 243, 243)
+    pdf.rect(25, pdf.get_y(), 160, 25, 'F')
+    pdf.ln(5)
+    pdf.set_font('Arial', 'B', 10)
+    pdf.cell(190, 5, 'CONFIDENTIAL', ln=True, align='C')
+    pdf.set_font('Arial', '', 9)
+    pdf.multi_cell(190, 4,
+        'This document contains confidential information. Unauthorized disclosure or reproduction '
+        'is strictly prohibited and may result in legal action.',
+        align='C')
+    
+    # Professional footer
+    pdf.ln(20)
+    pdf.set_font('Arial', '', 10)
+    pdf.cell(63, 5, 'www.sustain.ai', align='C')
+    pdf.cell(64, 5, 'support@sustain.ai', align='C')
+    pdf.cell(63, 5, '+1 (555) 123-4567', align='C', ln=True)
+    
+    # Table of contents
+    pdf.add_page()
+    pdf.set_font('Arial', 'B', 16)
+    pdf.cell(190, 10, 'Table of Contents', ln=True)
+    pdf.ln(10)  # More space after title
+    
+    current_page = 3  # Start after cover and contents
+    
+    def add_toc_entry(number, title, page):
+        text = f"{number}. {title}"
+        dots = "." * (40 - len(text))  # Adjust number of dots
+        pdf.cell(190, 8, f"{text} {dots} {page}", ln=True)
+    
+    if sections.get('overview', False):
+        add_toc_entry(1, "Company Overview", current_page)
+        current_page += 1
+    if sections.get('environmental', False):
+        add_toc_entry(2, "Environmental Metrics", current_page)
+        current_page += 1
+    if sections.get('social', False):
+        add_toc_entry(3, "Social Metrics", current_page)
+        current_page += 1
+    if sections.get('governance', False):
+        add_toc_entry(4, "Governance Metrics", current_page)
+        current_page += 1
+    if sections.get('risks', False):
+        add_toc_entry(5, "Risk Assessment", current_page)
+    
+    # Helper function for metric tables
+    def add_metric_row(pdf, label, value, first=False):
+        if not first:
+            pdf.ln(1)
+        pdf.set_fill_color(240, 240, 240)
+        pdf.cell(95, 8, label, border=1, fill=True)
+        pdf.cell(95, 8, str(value), border=1)
+        pdf.ln()
+    
+    # Overview Section
+    if sections.get('overview', False):
+        pdf.add_page()
+        pdf.set_font('Arial', 'B', 16)
+        pdf.cell(190, 15, '1. Company Overview', ln=True)
+        pdf.ln(5)
+        
+        pdf.set_font('Arial', '', 12)
+        pdf.multi_cell(190, 8, company.description)
+        pdf.ln(10)
+        
+        # Company details table
+        add_metric_row(pdf, 'Industry', company.industry, True)
+        add_metric_row(pdf, 'Size', company.size)
+        add_metric_row(pdf, 'Country', company.country)
+    
+    # Environmental Section
+    if sections.get('environmental', False):
+        pdf.add_page()
+        pdf.set_font('Arial', 'B', 16)
+        pdf.cell(190, 15, '2. Environmental Metrics', ln=True)
+        pdf.ln(5)
+        
+        add_metric_row(pdf, 'CO2 Emissions', metric_text(esg_data.co2_emissions, suffix=' tonnes'), True)
+        add_metric_row(pdf, 'Energy Consumption', metric_text(esg_data.energy_consumption, suffix=' MWh'))
+        add_metric_row(pdf, 'Renewable Energy', metric_text(esg_data.renewable_energy_percent, suffix='%'))
+        add_metric_row(pdf, 'Water Usage', metric_text(esg_data.water_usage, suffix=' m³'))
+        
+        pdf.ln(10)
+        pdf.set_font('Arial', 'B', 12)
+        pdf.cell(190, 8, 'Environmental Highlight:', ln=True)
+        pdf.set_font('Arial', '', 12)
+        pdf.multi_cell(190, 8, company.environmental_highlight)
+    
+    if sections.get('social', False):
+        pdf.add_page()
+        pdf.set_font('Arial', 'B', 16)
+        pdf.cell(190, 15, '3. Social Metrics', ln=True)
+        pdf.ln(5)
+        
+        add_metric_row(pdf, 'Employee Count', metric_text(esg_data.employee_count, ',.0f'), True)
+        add_metric_row(pdf, 'Diversity Ratio', metric_text(esg_data.diversity_ratio, '.2f', '%'))
+        add_metric_row(pdf, 'Safety Incidents', metric_text(esg_data.safety_incidents))
+        add_metric_row(pdf, 'Training Hours', metric_text(esg_data.training_hours, ',.0f', ' hours'))
+        
+        pdf.ln(10)
+        pdf.set_font('Arial', 'B', 12)
+        pdf.cell(190, 8, 'Social Highlight:', ln=True)
+        pdf.set_font('Arial', '', 12)
+        pdf.multi_cell(190, 8, company.social_highlight)
+    
+    if sections.get('governance', False):
+        pdf.add_page()
+        pdf.set_font('Arial', 'B', 16)
+        pdf.cell(190, 15, '4. Governance Metrics', ln=True)
+        pdf.ln(5)
+        
+        add_metric_row(pdf, 'Board Independence', metric_text(getattr(esg_data, 'board_independence', None), suffix='%'), True)
+        add_metric_row(pdf, 'Ethics Policy', getattr(esg_data, 'ethics_policy', 'N/A'))
+        add_metric_row(pdf, 'Data Breaches', metric_text(getattr(esg_data, 'data_breaches', None)))
+        add_metric_row(pdf, 'Ethics Violations', metric_text(getattr(esg_data, 'ethics_violations', None)))
+        
+        pdf.ln(10)
+        pdf.set_font('Arial', 'B', 12)
+        pdf.cell(190, 8, 'Governance Highlight:', ln=True)
+        pdf.set_font('Arial', '', 12)
+        pdf.multi_cell(190, 8, company.governance_highlight)
+        
+    if sections.get('risks', False):
+        pdf.add_page()
+        pdf.set_font('Arial', 'B', 16)
+        pdf.cell(190, 15, '5. Risk Assessment', ln=True)
+        pdf.ln(5)
+        
+        add_metric_row(pdf, 'Environmental Risks', getattr(esg_data, 'environmental_risks', 'N/A'), True)
+        add_metric_row(pdf, 'Social Risks', getattr(esg_data, 'social_risks', 'N/A'))
+        add_metric_row(pdf, 'Governance Risks', getattr(esg_data, 'governance_risks', 'N/A'))
+        
+        pdf.ln(10)
+        pdf.set_font('Arial', 'B', 12)
+    
+    return pin_creation_date(pdf.output(dest='S').encode('latin-1'), report_date)
+
+
+def render_report(company, esg_data, sections, fmt, logo_path=None, report_date: Optional[date] = None) -> bytes:
+    """Render one report in memory; ``fmt`` is a REPORT_FORMATS key.
+
+    ``report_date`` (default today) is the only date the output carries,
+    so the same inputs render the same bytes all day and report_cache_key()
+    can key on it.
+    """
+    if fmt == 'xlsx':
+        buffer = io.BytesIO()
+        generate_excel_report(company, esg_data, sections, buffer, report_date)
+        return buffer.getvalue()
+    return render_pdf(company, esg_data, sections, logo_path, report_date)
@@ -0,0 +1,144 @@
+from app.models.company import Company
+from app.models.esg_data import ESG_METRICS
+from app.models.esg_data_archive import esg_history
+from app.models.esg_rollup import ROLLUP_DIMENSIONS, esg_rollup
+from app.utils.sql import dialect_insert
+from typing import Any, Dict, Iterable, Mapping, Tuple
+from sqlalchemy import Integer, String, and_, cast, delete, extract, func, insert, literal, select, tuple_, update
+import logging
+
+logger = logging.getLogger(__name__)
+
+VALUE_COLUMNS = ('row_count',) + tuple(
+    f'{metric}_{suffix}' for suffix in ('sum', 'count') for metric in ESG_METRICS
+)
+# Stand-in key for companies without an industry or country
+NO_KEY = ''
+# Rows per upsert statement, keeping bound parameters under SQLite's limit
+UPSERT_CHUNK_SIZE = 500
+
+
+def _empty_group():
+    return dict.fromkeys(VALUE_COLUMNS, 0)
+
+
+def rollup_deltas(rows: Iterable[Mapping[str, Any]],
+                  companies: Mapping[int, Tuple[str, str]],
+                  sign: int = 1) -> Dict[Tuple[str, str, int], Dict[str, float]]:
+    """Aggregate ESG rows into per-(dimension, key, year) deltas.
+
+    ``companies`` maps company id to (industry, country). Pass ``sign=-1``
+    to compute the deltas that remove previously counted rows.
+    """
+    deltas = {}
+    for row in rows:
+        industry, country = companies.get(row['company_id'], (None, None))
+        year = row['date'].year
+        for dimension, key in (
+            ('company', str(row['company_id'])),
+            ('industry', industry or NO_KEY),
+            ('country', country or NO_KEY),
+        ):
+            group = deltas.setdefault((dimension, key, year), _empty_group())
+            group['row_count'] += sign
+            for metric in ESG_METRICS:
+                value = row.get(metric)
+                if value is not None:
+                    group[f'{metric}_sum'] += sign * value
+                    group[f'{metric}_count'] += sign
+    return deltas
+
+
+def company_dimensions(connection, company_ids: Iterable[int]) -> Dict[int, Tuple[str, str]]:
+    company_table = Company.__table__
+    company_ids = sorted(set(company_ids))
+    companies = {}
+    for i in range(0, len(company_ids), UPSERT_CHUNK_SIZE):
+        rows = connection.execute(
+            select(company_table.c.id, company_table.c.industry, company_table.c.country)
+            .where(company_table.c.id.in_(company_ids[i:i + UPSERT_CHUNK_SIZE]))
+        )
+        companies.update({row.id: (row.industry, row.country) for row in rows})
+    return companies
+
+
+def apply_rollup_deltas(connection, rows: Iterable[Mapping[str, Any]], sign: int = 1):
+    """Fold ESG rows into esg_rollup inside the caller's transaction.
+
+    Each row is a mapping with company_id, date and metric values, as
+    built for inserts. Cost is proportional to the batch, not the table.
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    companies = company_dimensions(connection, [row['company_id'] for row in rows])
+    deltas = rollup_deltas(rows, companies, sign)
+    values = [
+        {'dimension': dimension, 'dimension_key': key, 'year': year, **group}
+        for (dimension, key, year), group in deltas.items()
+    ]
+
+    upsert = dialect_insert(connection, esg_rollup)
+    if upsert is not None:
+        for i in range(0, len(values), UPSERT_CHUNK_SIZE):
+            stmt = upsert.values(values[i:i + UPSERT_CHUNK_SIZE])
+            connection.execute(stmt.on_conflict_do_update(
+                index_elements=['dimension', 'dimension_key', 'year'],
+                set_={column: esg_rollup.c[column] + stmt.excluded[column] for column in VALUE_COLUMNS}
+            ))
+    else:
+        _apply_by_update(connection, values)
+    if sign < 0:
+        _delete_empty_groups(connection, list(deltas))
+
+
+def _apply_by_update(connection, values):
+    for value in values:
+        key_clause = and_(
+            esg_rollup.c.dimension == value['dimension'],
+            esg_rollup.c.dimension_key == value['dimension_key'],
+            esg_rollup.c.year == value['year']
+        )
+        result = connection.execute(update(esg_rollup).where(key_clause).values(
+            {column: esg_rollup.c[column] + value[column] for column in VALUE_COLUMNS}
+        ))
+        if result.rowcount == 0:
+            connection.execute(insert(esg_rollup).values(value))
+
+
+def _delete_empty_groups(connection, keys):
+    # Groups whose last row went away, so rollups match a rebuild
+    group_key = tuple_(esg_rollup.c.dimension, esg_rollup.c.dimension_key, esg_rollup.c.year)
+    for i in range(0, len(keys), UPSERT_CHUNK_SIZE):
+        connection.execute(delete(esg_rollup).where(
+            group_key.in_(keys[i:i + UPSERT_CHUNK_SIZE]), esg_rollup.c.row_count <= 0
+        ))
+
+
+def rebuild_rollups(connection):
+    """Recompute every rollup row from esg_data and its archive."""
+    esg_table = esg_history()
+    company_table = Company.__table__
+    year = cast(extract('year', esg_table.c.date), Integer)
+    aggregates = [func.count(esg_table.c.id)]
+    aggregates += [func.coalesce(func.sum(esg_table.c[metric]), 0) for metric in ESG_METRICS]
+    aggregates += [func.count(esg_table.c[metric]) for metric in ESG_METRICS]
+
+    connection.execute(delete(esg_rollup))
+    for dimension in ROLLUP_DIMENSIONS:
+        if dimension == 'company':
+            key = cast(esg_table.c.company_id, String)
+        else:
+            key = func.coalesce(company_table.c[dimension], NO_KEY)
+        rows = select(
+            literal(dimension),
+            key,
+            year,
+            *aggregates
+        ).select_from(
+            esg_table.outerjoin(company_table, company_table.c.id == esg_table.c.company_id)
+        ).group_by(key, year)
+        connection.execute(insert(esg_rollup).from_select(
+            ['dimension', 'dimension_key', 'year', *VALUE_COLUMNS], rows
+        ))
+        logger.info(f"Rebuilt {dimension} rollups")
@@ -0,0 +1,78 @@
+from app.extensions import db
+from app.services.analytics import history_source, join_latest
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import select
+import numpy as np
+
+# Metrics feeding the E/S/G scores, in the column order of the input matrix
+SCORE_INPUTS = (
+    'renewable_energy_percent', 'co2_emissions',
+    'diversity_ratio', 'safety_incidents',
+    'board_diversity', 'ethics_violations',
+)
+
+
+def compute_scores(values: np.ndarray) -> Dict[str, np.ndarray]:
+    """Score every row of an (n, len(SCORE_INPUTS)) matrix in one pass.
+
+    Missing metrics count as 0, matching the formula the dashboards used.
+    """
+    values = np.nan_to_num(values, nan=0.0)
+    renewable, co2, diversity, incidents, board_diversity, violations = values.T
+
+    environmental = renewable * 0.4 + (100 - co2 / 20) * 0.6
+    social = diversity * 0.5 + (100 - incidents * 10) * 0.5
+    governance = board_diversity * 0.4 + (100 - violations * 20) * 0.6
+
+    return {
+        'environmental': environmental,
+        'social': social,
+        'governance': governance,
+        'total': (environmental + social + governance) / 3,
+    }
+
+
+def score_esg_data(company_ids: Optional[Iterable[int]] = None,
+                   start: Optional[datetime] = None,
+                   end: Optional[datetime] = None,
+                   latest_only: bool = False) -> List[Dict[str, Any]]:
+    source = history_source(start, end, latest_only)
+    query = select(
+        source.id, source.company_id, source.date,
+        *[getattr(source, column) for column in SCORE_INPUTS]
+    )
+    if company_ids is not None:
+        query = query.where(source.company_id.in_(list(company_ids)))
+    if latest_only:
+        query = join_latest(query, start, end, source)
+    else:
+        if start:
+            query = query.where(source.date >= start)
+        if end:
+            query = query.where(source.date <= end)
+    query = query.order_by(source.company_id, source.date)
+
+    rows = db.session.execute(query).all()
+    if not rows:
+        return []
+
+    # None becomes NaN when the rows are cast to a float matrix
+    values = np.array([row[3:] for row in rows], dtype=float)
+    scores = {name: array.tolist() for name, array in compute_scores(values).items()}
+
+    return [
+        {
+            'esg_data_id': row.id,
+            'company_id': row.company_id,
+            'date': row.date,
+            'environmental': environmental,
+            'social': social,
+            'governance': governance,
+            'total': total,
+        }
+        for row, environmental, social, governance, total in zip(
+            rows, scores['environmental'], scores['social'],
+            scores['governance'], scores['total']
+        )
+    ]
@@ -0,0 +1,139 @@
+from app.extensions import db
+from app.models.company import Company
+from app.models.esg_data import ESGData, ESG_METRICS
+from app.models.latest_esg_snapshot import LatestESGSnapshot
+from app.services.rollups import apply_rollup_deltas
+from app.services.versioning import ESG_DATA, company_esg_key, bump_versions
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.orm import Session
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Keep IN (...) lists well below SQLite's bound parameter limit
+REFRESH_CHUNK_SIZE = 500
+
+esg_table = ESGData.__table__
+snapshot_table = LatestESGSnapshot.__table__
+
+
+def refresh_latest_snapshots(connection, company_ids: Optional[Iterable[int]] = None):
+    """Recompute the latest snapshot rows for the given companies.
+
+    Passing no company ids rebuilds the whole table. Runs on ``connection``
+    so it joins whatever transaction the caller has open.
+    """
+    if company_ids is None:
+        connection.execute(delete(snapshot_table))
+        connection.execute(_snapshot_insert(None))
+        return
+
+    company_ids = sorted(set(company_ids))
+    for i in range(0, len(company_ids), REFRESH_CHUNK_SIZE):
+        chunk = company_ids[i:i + REFRESH_CHUNK_SIZE]
+        connection.execute(delete(snapshot_table).where(snapshot_table.c.company_id.in_(chunk)))
+        connection.execute(_snapshot_insert(chunk))
+
+
+def _snapshot_insert(company_ids):
+    company_table = Company.__table__
+    candidate = esg_table.alias('candidate')
+    # Top-1 per company walks the (company_id, date) index backwards instead
+    # of aggregating over all of the company's rows; ties go to the highest id
+    latest_id = select(candidate.c.id).where(
+        candidate.c.company_id == company_table.c.id
+    ).order_by(candidate.c.date.desc(), candidate.c.id.desc()).limit(1).scalar_subquery()
+
+    rows = select(
+        esg_table.c.company_id,
+        esg_table.c.id,
+        esg_table.c.date
+    ).select_from(company_table.join(esg_table, esg_table.c.id == latest_id))
+    if company_ids is not None:
+        rows = rows.where(company_table.c.id.in_(company_ids))
+
+    return insert(snapshot_table).from_select(['company_id', 'esg_data_id', 'date'], rows)
+
+
+def get_latest_esg_data(company_id: int) -> Optional[ESGData]:
+    esg_data = ESGData.query.join(
+        LatestESGSnapshot, LatestESGSnapshot.esg_data_id == ESGData.id
+    ).filter(LatestESGSnapshot.company_id == company_id).first()
+    if esg_data is None:
+        # Snapshot not backfilled yet; the (company_id, date) index keeps this cheap
+        esg_data = ESGData.query.filter_by(company_id=company_id).order_by(
+            ESGData.date.desc(), ESGData.id.desc()
+        ).first()
+    return esg_data
+
+
+def latest_esg_data_for(company_ids: Optional[Iterable[int]] = None,
+                        industry: Optional[str] = None,
+                        country: Optional[str] = None) -> List[Tuple[Company, ESGData]]:
+    """(company, latest ESG row) pairs in one query, filtered by ids and/or dimensions.
+
+    Companies without ESG data are left out.
+    """
+    query = db.session.query(Company, ESGData).join(
+        LatestESGSnapshot, LatestESGSnapshot.company_id == Company.id
+    ).join(ESGData, ESGData.id == LatestESGSnapshot.esg_data_id)
+    if company_ids is not None:
+        query = query.filter(Company.id.in_(list(company_ids)))
+    if industry is not None:
+        query = query.filter(Company.industry == industry)
+    if country is not None:
+        query = query.filter(Company.country == country)
+    return [tuple(row) for row in query.order_by(Company.id)]
+
+
+def _stored_rows(connection, ids: Iterable[int]) -> List[dict]:
+    """esg_data rows by id as rollup rows (company_id, date and metrics)."""
+    ids = sorted(set(ids))
+    rows = []
+    for i in range(0, len(ids), REFRESH_CHUNK_SIZE):
+        rows.extend(dict(row) for row in connection.execute(
+            select(esg_table.c.company_id, esg_table.c.date, *[esg_table.c[metric] for metric in ESG_METRICS])
+            .where(esg_table.c.id.in_(ids[i:i + REFRESH_CHUNK_SIZE]))
+        ).mappings())
+    return rows
+
+
+def _modified_ids(objects, session) -> List[int]:
+    return [
+        obj.id for obj in objects
+        if isinstance(obj, ESGData) and obj.id is not None and session.is_modified(obj)
+    ]
+
+
+def _capture_before_flush(session, flush_context, instances):
+    # Old values come from the database rather than attribute history,
+    # which lacks them for attributes that were expired when changed
+    updated = _modified_ids(session.dirty, session)
+    replaced = updated + [obj.id for obj in session.deleted if isinstance(obj, ESGData)]
+    session.info['esg_ids_updated'] = updated
+    session.info['esg_rows_replaced'] = _stored_rows(session.connection(), replaced) if replaced else []
+
+
+def _refresh_after_flush(session, flush_context):
+    # ORM writes get the upkeep ingest.after_rows_written gives the bulk
+    # Core paths: snapshots, rollups and version counters
+    removed = session.info.pop('esg_rows_replaced', [])
+    ids = session.info.pop('esg_ids_updated', []) + [obj.id for obj in session.new if isinstance(obj, ESGData)]
+    if not ids and not removed:
+        return
+    connection = session.connection()
+    added = _stored_rows(connection, ids) if ids else []
+    company_ids = {row['company_id'] for row in removed + added}
+    logger.debug(f"Refreshing latest ESG snapshots and rollups for companies {sorted(company_ids)}")
+    refresh_latest_snapshots(connection, company_ids)
+    apply_rollup_deltas(connection, removed, sign=-1)
+    apply_rollup_deltas(connection, added)
+    bump_versions([ESG_DATA] + [company_esg_key(company_id) for company_id in company_ids], connection)
+
+
+def register_snapshot_events():
+    if not event.contains(Session, 'before_flush', _capture_before_flush):
+        event.listen(Session, 'before_flush', _capture_before_flush)
+    if not event.contains(Session, 'after_flush', _refresh_after_flush):
+        event.listen(Session, 'after_flush', _refresh_after_flush)
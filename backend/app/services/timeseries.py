@@ -0,0 +1,138 @@
+from app.extensions import db
+from app.models.esg_data import ESGData
+from app.services.archive import esg_source
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import Integer, cast, func, select
+import numpy as np
+
+BUCKETS = ('month', 'quarter', 'year')
+AGGREGATES = {
+    'avg': func.avg,
+    'min': func.min,
+    'max': func.max,
+    'sum': func.sum,
+}
+
+
+def bucket_expression(bucket: str, dialect: str, date=ESGData.date):
+    """SQL expression truncating ``date`` to the start of its bucket."""
+    if dialect == 'postgresql':
+        return func.date_trunc(bucket, date)
+
+    # SQLite has no date_trunc; build an ISO date string instead
+    if bucket == 'month':
+        return func.strftime('%Y-%m-01', date)
+    if bucket == 'year':
+        return func.strftime('%Y-01-01', date)
+    quarter_month = (cast(func.strftime('%m', date), Integer) - 1) // 3 * 3 + 1
+    return func.printf('%s-%02d-01', func.strftime('%Y', date), quarter_month)
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def bucketed_series(company_id: int, selected: Dict[str, Tuple[str, ...]],
+                    bucket: str, agg: str,
+                    start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    source = esg_source(start)
+    period = bucket_expression(bucket, db.session.get_bind().dialect.name, source.date).label('period')
+    aggregate = AGGREGATES[agg]
+    metrics = [metric for pillar_metrics in selected.values() for metric in pillar_metrics]
+
+    query = select(
+        period,
+        func.count(source.id).label('count'),
+        *[aggregate(getattr(source, metric)).label(metric) for metric in metrics]
+    ).where(source.company_id == company_id)
+    if start:
+        query = query.where(source.date >= start)
+    if end:
+        query = query.where(source.date <= end)
+    query = query.group_by(period).order_by(period)
+
+    series = []
+    for row in db.session.execute(query):
+        entry = {'date': _as_datetime(row.period), 'count': row.count}
+        for pillar, pillar_metrics in selected.items():
+            entry[pillar] = {metric: getattr(row, metric) for metric in pillar_metrics}
+        series.append(entry)
+    return series
+
+
+def raw_series(company_id: int, selected: Dict[str, Tuple[str, ...]],
+               start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    metrics = [metric for pillar_metrics in selected.values() for metric in pillar_metrics]
+    source = esg_source(start)
+    query = select(source.date, *[getattr(source, metric) for metric in metrics]).where(
+        source.company_id == company_id
+    )
+    if start:
+        query = query.where(source.date >= start)
+    if end:
+        query = query.where(source.date <= end)
+    query = query.order_by(source.date, source.id)
+
+    series = []
+    for row in db.session.execute(query):
+        entry = {'date': row.date}
+        for pillar, pillar_metrics in selected.items():
+            entry[pillar] = {metric: row._mapping[metric] for metric in pillar_metrics}
+        series.append(entry)
+    return series
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the indices of at most ``threshold`` points that best preserve
+    the visual shape of the series. First and last points are always kept.
+    """
+    if threshold < 3:
+        raise ValueError("LTTB needs a threshold of at least 3 points")
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    # Interior points are split into threshold - 2 buckets of near-equal size
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < threshold - 1:
+            next_lo, next_hi = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+            avg_x = x[next_lo:next_hi].mean()
+            avg_y = y[next_lo:next_hi].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(series: Sequence[Dict[str, Any]], selected: Dict[str, Tuple[str, ...]],
+               points: int) -> Dict[str, List[Tuple[datetime, float]]]:
+    """Reduce each metric of ``series`` to at most ``points`` (date, value) pairs."""
+    result = {}
+    for pillar, pillar_metrics in selected.items():
+        for metric in pillar_metrics:
+            pairs = [(entry['date'], entry[pillar][metric]) for entry in series
+                     if entry[pillar][metric] is not None]
+            if not pairs:
+                result[metric] = []
+                continue
+            x = np.array([date.timestamp() for date, _ in pairs], dtype=float)
+            y = np.array([value for _, value in pairs], dtype=float)
+            result[metric] = [pairs[i] for i in lttb(x, y, points)]
+    return result
@@ -0,0 +1,142 @@
+from app.extensions import db
+from app.models.data_version import DataVersion
+from app.utils.sql import dialect_insert
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Iterable, Union
+from flask import current_app, g, make_response, request
+from sqlalchemy import select, update
+import hashlib
+
+version_table = DataVersion.__table__
+
+COMPANIES = 'companies'
+ESG_DATA = 'esg_data'
+
+
+def company_key(company_id: int) -> str:
+    return f'company:{company_id}'
+
+
+def company_esg_key(company_id: int) -> str:
+    return f'esg_data:company:{company_id}'
+
+
+def versioned_key(key: str) -> str:
+    """``key`` tagged with its current version, for caching what it covers.
+
+    A write bumps the version, so every worker misses its old entry at
+    once, not only the worker that wrote; old entries just age out. A load
+    that started before the write is stored under the old key, where no
+    later reader looks. Reuses the versions @conditional looked up.
+    """
+    versions = g.get('data_versions') or {}
+    if key not in versions:
+        versions = current_versions([key])
+    row = versions.get(key)
+    return f'{key}@{row.version if row is not None else 0}'
+
+
+def bump_versions(keys: Iterable[str], connection=None):
+    """Increment the version of each key in the caller's transaction."""
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    connection = connection or db.session.connection()
+    now = datetime.utcnow()
+
+    stmt = dialect_insert(connection, version_table)
+    if stmt is not None:
+        stmt = stmt.values([{'key': key, 'version': 1, 'updated_at': now} for key in keys])
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=['key'],
+            set_={'version': version_table.c.version + 1, 'updated_at': now}
+        ))
+        return
+
+    result = connection.execute(
+        update(version_table).where(version_table.c.key.in_(keys)).values(
+            version=version_table.c.version + 1, updated_at=now
+        )
+    )
+    if result.rowcount != len(keys):
+        existing = set(connection.execute(
+            select(version_table.c.key).where(version_table.c.key.in_(keys))
+        ).scalars())
+        missing = [key for key in keys if key not in existing]
+        connection.execute(version_table.insert(), [
+            {'key': key, 'version': 1, 'updated_at': now} for key in missing
+        ])
+
+
+def bump_all_versions(connection=None):
+    """Invalidate every tracked key, e.g. after bulk deletes or reseeding."""
+    connection = connection or db.session.connection()
+    connection.execute(update(version_table).values(
+        version=version_table.c.version + 1, updated_at=datetime.utcnow()
+    ))
+    bump_versions([COMPANIES, ESG_DATA], connection)
+
+
+def current_versions(keys):
+    rows = db.session.execute(
+        select(version_table.c.key, version_table.c.version, version_table.c.updated_at)
+        .where(version_table.c.key.in_(keys))
+    ).all()
+    return {row.key: row for row in rows}
+
+
+def conditional(*keys: Union[str, Callable[..., str]]):
+    """Answer GETs with ETag/Last-Modified and short-circuit to 304.
+
+    ``keys`` are version keys, or callables receiving the view's keyword
+    arguments and returning one. The ETag also covers the query string, so
+    every sparse/paged representation gets its own tag.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+
+            resolved = [key(**kwargs) if callable(key) else key for key in keys]
+            versions = current_versions(resolved)
+            g.data_versions = versions
+
+            digest = hashlib.sha1(request.query_string)
+            last_modified = None
+            for key in resolved:
+                row = versions.get(key)
+                if row is None:
+                    digest.update(f'|{key}:0'.encode())
+                    continue
+                digest.update(f'|{key}:{row.version}:{row.updated_at.isoformat()}'.encode())
+                if last_modified is None or row.updated_at > last_modified:
+                    last_modified = row.updated_at
+            etag = digest.hexdigest()[:32]
+            if last_modified is not None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = (
+                    last_modified is not None
+                    and request.if_modified_since is not None
+                    and last_modified.replace(microsecond=0) <= request.if_modified_since
+                )
+
+            if not_modified:
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            # Compression turns a strong tag weak on 200s (see compression.py);
+            # tag every response weak up front so 200 and 304 agree
+            response.set_etag(etag, weak=current_app.config.get('COMPRESSION_ENABLED', False))
+            if last_modified is not None:
+                response.last_modified = last_modified
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,92 @@
+from flask import Flask, current_app, g, has_app_context, request
+from flask_sqlalchemy.session import Session
+from contextlib import contextmanager
+from functools import wraps
+from app.utils.params import parse_flag
+import sqlalchemy as sa
+import time
+
+REPLICA_BIND = 'replica'
+READ_YOUR_WRITES_HEADER = 'X-Read-Your-Writes'
+READ_YOUR_WRITES_COOKIE = 'esg_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica bind inside replica-routed requests.
+
+    Writes, flushes and anything after the first write in the session stay
+    on the primary; ``info['wrote']`` records that the session wrote. Outside a request marked with ``read_replica`` (CLI
+    commands, background jobs, write endpoints) it behaves like the
+    default Flask-SQLAlchemy session.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and REPLICA_BIND in self._db.engines:
+            if self._flushing or isinstance(clause, sa.UpdateBase):
+                self.info['wrote'] = True
+            elif not self.info.get('wrote') and has_app_context() and g.get('use_replica'):
+                return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@sa.event.listens_for(RoutingSession, 'after_begin')
+def _watch_writes(session, transaction, connection):
+    # Flushes and Core DML on the session's connection both pass through
+    # here; reads never do, so read-only POSTs leave the flag unset
+    def note_write(conn, clauseelement, multiparams, params, execution_options):
+        if isinstance(clauseelement, sa.UpdateBase):
+            session.info['wrote'] = True
+
+    sa.event.listen(connection, 'before_execute', note_write)
+
+
+def wants_primary() -> bool:
+    # Explicit per-request override, or the window after this client wrote
+    if parse_flag(request.headers.get(READ_YOUR_WRITES_HEADER)):
+        return True
+    until = request.cookies.get(READ_YOUR_WRITES_COOKIE)
+    try:
+        return until is not None and float(until) > time.time()
+    except ValueError:
+        return False
+
+
+def read_replica(view):
+    """Serve the view's queries from the replica unless the client asked for its own writes."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.use_replica = not wants_primary()
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def primary():
+    """Read from the primary for the duration of the block, even in a replica-routed request."""
+    previous = g.get('use_replica', False)
+    g.use_replica = False
+    try:
+        yield
+    finally:
+        g.use_replica = previous
+
+
+def init_routing(app: Flask):
+    # Seconds after a successful write during which that client reads the primary
+    app.config.setdefault('READ_YOUR_WRITES_WINDOW', 5)
+
+    @app.after_request
+    def route_headers(response):
+        if REPLICA_BIND not in app.config.get('SQLALCHEMY_BINDS', {}):
+            return response
+        # Only requests that wrote pin the client to the primary, not every POST
+        wrote = app.extensions['sqlalchemy'].session.info.get('wrote')
+        if request.method not in SAFE_METHODS and response.status_code < 400 and wrote:
+            window = current_app.config['READ_YOUR_WRITES_WINDOW']
+            response.set_cookie(
+                READ_YOUR_WRITES_COOKIE, f'{time.time() + window:.3f}',
+                max_age=window, httponly=True, samesite='Lax'
+            )
+        response.headers['X-DB-Route'] = REPLICA_BIND if g.get('use_replica') else 'primary'
+        return response
@@ -0,0 +1,66 @@
+from app.models.esg_data import ESGData, ESG_PILLARS
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+METRIC_PILLARS = {metric: pillar for pillar, metrics in ESG_PILLARS.items() for metric in metrics}
+BASE_COLUMNS = ('id', 'company_id', 'date')
+
+
+def _split(value: Optional[str]):
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+def parse_fieldset(fields: Optional[str] = None,
+                   pillars: Optional[str] = None) -> Optional[Dict[str, Tuple[str, ...]]]:
+    """Resolve ``fields=`` / ``pillars=`` query values to {pillar: metrics}.
+
+    Returns None when neither is given, meaning the full payload.
+    """
+    fields, pillars = _split(fields), _split(pillars)
+    if not fields and not pillars:
+        return None
+
+    requested = set()
+    for pillar in pillars:
+        if pillar not in ESG_PILLARS:
+            raise ValueError(f"Unknown pillar: {pillar}")
+        requested.update(ESG_PILLARS[pillar])
+    for field in fields:
+        if field not in METRIC_PILLARS:
+            raise ValueError(f"Unknown field: {field}")
+        requested.add(field)
+
+    # Keep the pillar and metric order of the full payload
+    selected = {}
+    for pillar, metrics in ESG_PILLARS.items():
+        chosen = tuple(metric for metric in metrics if metric in requested)
+        if chosen:
+            selected[pillar] = chosen
+    return selected
+
+
+def fieldset_columns(selected: Dict[str, Tuple[str, ...]], source=ESGData) -> Sequence[Any]:
+    columns = [getattr(source, column) for column in BASE_COLUMNS]
+    for metrics in selected.values():
+        columns.extend(getattr(source, metric) for metric in metrics)
+    return columns
+
+
+def fieldset_serializer(selected: Dict[str, Tuple[str, ...]]) -> Callable[[Sequence[Any]], dict]:
+    """Build a serializer for row tuples selected with fieldset_columns()."""
+    layout = []
+    index = len(BASE_COLUMNS)
+    for pillar, metrics in selected.items():
+        layout.append((pillar, tuple(enumerate(metrics, start=index))))
+        index += len(metrics)
+
+    def serialize(row):
+        payload = {
+            'id': row[0],
+            'company_id': row[1],
+            'date': row[2],
+        }
+        for pillar, metrics in layout:
+            payload[pillar] = {metric: row[i] for i, metric in metrics}
+        return payload
+
+    return serialize
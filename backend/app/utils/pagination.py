@@ -0,0 +1,87 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import and_, or_
+
+from app.utils.params import utc_naive
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+STREAM_BATCH_SIZE = 1000
+
+
+def encode_cursor(date: datetime, row_id: int) -> str:
+    raw = json.dumps([date.isoformat(), row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        date, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return utc_naive(datetime.fromisoformat(date)), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def parse_limit(value: Optional[str]) -> int:
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    limit = int(value)
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def keyset_page(query, date_col, id_col, cursor: Optional[str], limit: int):
+    """Fetch one page ordered by (date, id), starting after ``cursor``.
+
+    Returns the rows of the page and the cursor for the next one, or None
+    when the last page has been reached.
+    """
+    if cursor:
+        after_date, after_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            date_col > after_date,
+            and_(date_col == after_date, id_col > after_id)
+        ))
+
+    rows = query.order_by(date_col, id_col).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.date, last.id)
+    return rows, next_cursor
+
+
+def iter_json_array(rows: Iterable[Any], serialize: Callable[[Any], dict],
+                    batch_size: int = STREAM_BATCH_SIZE) -> Iterator[str]:
+    dumps = current_app.json.dumps
+    yield '['
+    first = True
+    batch = []
+    for row in rows:
+        batch.append(dumps(serialize(row)))
+        if len(batch) >= batch_size:
+            yield ('' if first else ',') + ','.join(batch)
+            first = False
+            batch = []
+    if batch:
+        yield ('' if first else ',') + ','.join(batch)
+    yield ']'
+
+
+def iter_ndjson(rows: Iterable[Any], serialize: Callable[[Any], dict],
+                batch_size: int = STREAM_BATCH_SIZE) -> Iterator[str]:
+    dumps = current_app.json.dumps
+    batch = []
+    for row in rows:
+        batch.append(dumps(serialize(row)))
+        if len(batch) >= batch_size:
+            yield '\n'.join(batch) + '\n'
+            batch = []
+    if batch:
+        yield '\n'.join(batch) + '\n'
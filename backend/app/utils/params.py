@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+
+
+def utc_naive(value: datetime) -> datetime:
+    """``value`` as naive UTC, the form dates are stored and compared in."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def parse_date(value):
+    if not value:
+        return None
+    return utc_naive(datetime.fromisoformat(value))
+
+
+def parse_flag(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or '').lower() in ('1', 'true', 'yes')
@@ -0,0 +1,38 @@
+from typing import Any, Mapping
+from sqlalchemy import event
+
+
+def dialect_insert(bind, table):
+    """INSERT construct supporting ON CONFLICT where the backend has it.
+
+    Returns None on backends without a native upsert so callers can fall
+    back to a portable path.
+    """
+    dialect = bind.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(table)
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(table)
+    return None
+
+
+def configure_sqlite(engine, pragmas: Mapping[str, Any]):
+    """Apply ``pragmas`` to every new SQLite connection of ``engine``.
+
+    WAL lets readers proceed while a writer holds the lock, and
+    ``busy_timeout`` (milliseconds) makes a blocked writer wait inside the
+    driver instead of failing straight away with "database is locked".
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
@@ -0,0 +1,129 @@
+from app.models.esg_data import ESGData, ESG_PILLARS
+from app.utils.params import utc_naive
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+esg_table = ESGData.__table__
+
+FieldError = Tuple[str, str]
+# Value types stored as-is; anything else goes through the column's check
+FLOAT_TYPES = frozenset((float, int, type(None)))
+INT_TYPES = frozenset((int, type(None)))
+
+
+def _check_float(value):
+    if value is None or type(value) is float or type(value) is int:
+        return value
+    raise ValueError(f"expected a number, got {type(value).__name__}")
+
+
+def _check_int(value):
+    if value is None or type(value) is int:
+        return value
+    if type(value) is float and value.is_integer():
+        return int(value)
+    raise ValueError(f"expected an integer, got {value!r}")
+
+
+class EntrySchema:
+    """Validator for the nested ESG entry payload used by the batch endpoints.
+
+    Field checks are resolved from the ESGData columns once, when the
+    schema is built, so validating an entry is a flat loop over
+    precomputed (field, accepted types, check) entries. Every pillar and
+    metric must be present, though metrics may be null. Every problem in
+    an entry is collected rather than stopping at the first.
+    """
+
+    def __init__(self, pillars: Sequence[Tuple[str, Tuple[Tuple[str, str, frozenset, Callable], ...], frozenset]]):
+        self.pillars = pillars
+        # id is accepted (and ignored) so payloads read from the API can be resent
+        self.top_level = frozenset(('id', 'company_id', 'date', *(pillar for pillar, _, _ in pillars)))
+
+    def validate(self, entry: Any) -> Tuple[Optional[Dict[str, Any]], List[FieldError]]:
+        if type(entry) is not dict:
+            return None, [('', 'expected an object')]
+        errors = []
+        row = {}
+
+        company_id = entry.get('company_id')
+        if type(company_id) is int:
+            row['company_id'] = company_id
+        else:
+            errors.append(('company_id', 'required integer'))
+
+        date = entry.get('date')
+        if type(date) is str:
+            try:
+                # Stored naive; an offset is converted, not dropped
+                row['date'] = utc_naive(datetime.fromisoformat(date))
+            except ValueError:
+                errors.append(('date', f"invalid ISO date {date!r}"))
+        else:
+            errors.append(('date', 'required ISO date string'))
+
+        for pillar, checks, known in self.pillars:
+            values = entry.get(pillar)
+            if type(values) is not dict:
+                errors.append((pillar, 'required object' if values is None else 'expected an object'))
+                continue
+            for field, metric, accepted, check in checks:
+                if metric not in values:
+                    # Every metric is named, if only as null, so a dropped
+                    # key is not mistaken for a missing measurement
+                    errors.append((field, 'required, may be null'))
+                    continue
+                value = values[metric]
+                # Common case inline; the check only runs to coerce or explain
+                if type(value) in accepted:
+                    row[metric] = value
+                    continue
+                try:
+                    row[metric] = check(value)
+                except ValueError as e:
+                    errors.append((field, str(e)))
+            if not known.issuperset(values):
+                for name in sorted(set(values) - known):
+                    errors.append((f'{pillar}.{name}', 'unknown field'))
+
+        if not self.top_level.issuperset(entry):
+            for name in sorted(set(entry) - self.top_level):
+                errors.append((name, 'unknown field'))
+
+        return (None if errors else row), errors
+
+
+def compile_entry_schema() -> EntrySchema:
+    pillars = []
+    for pillar, metrics in ESG_PILLARS.items():
+        checks = []
+        for metric in metrics:
+            if esg_table.c[metric].type.python_type is int:
+                checks.append((f'{pillar}.{metric}', metric, INT_TYPES, _check_int))
+            else:
+                checks.append((f'{pillar}.{metric}', metric, FLOAT_TYPES, _check_float))
+        pillars.append((pillar, tuple(checks), frozenset(metrics)))
+    return EntrySchema(tuple(pillars))
+
+
+ENTRY_SCHEMA = compile_entry_schema()
+
+
+def validate_entries(entries: Any, schema: EntrySchema = ENTRY_SCHEMA) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Validate a whole batch in one pass.
+
+    Returns the rows and a list of {index, field, error} for every
+    problem found; rows are only meaningful when there are no errors.
+    """
+    if type(entries) is not list:
+        return [], [{'index': None, 'field': '', 'error': 'expected a list of entries'}]
+    rows = []
+    errors = []
+    validate = schema.validate
+    for index, entry in enumerate(entries):
+        row, entry_errors = validate(entry)
+        if entry_errors:
+            errors.extend({'index': index, 'field': field, 'error': message} for field, message in entry_errors)
+        else:
+            rows.append(row)
+    return rows, errors
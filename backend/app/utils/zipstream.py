@@ -0,0 +1,41 @@
+from typing import Iterable, Iterator, Tuple
+import zipfile
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object that hands out what was written.
+
+    zipfile detects that it cannot seek and writes data descriptors after
+    each member instead of patching headers, so nothing is rewritten later.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(entries: Iterable[Tuple[str, bytes]],
+             compression: int = zipfile.ZIP_STORED) -> Iterator[bytes]:
+    """Stream a ZIP archive of (name, content) entries as they arrive.
+
+    Only the member being written is held in memory. The default stores
+    members as-is; PDF and XLSX content is already compressed.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode='w', compression=compression) as archive:
+        for name, content in entries:
+            archive.writestr(name, content)
+            yield sink.drain()
+    # Central directory, written on close
+    yield sink.drain()
@@ -1,5 +1,102 @@
+import os
+from datetime import timedelta
+from dotenv import load_dotenv
+
+# Config reads the environment as this module is imported, so backend/.env
+# has to be loaded here rather than by whichever entry point runs first.
+# Variables already set in the environment win.
+load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env'))
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def database_url(default, name='DATABASE_URL'):
+    url = os.environ.get(name, default)
+    if url is None:
+        return None
+    # Accept the old postgres:// scheme some hosts hand out, and pin the
+    # driver we ship (SQLAlchemy 2.1 otherwise picks psycopg 3)
+    for scheme in ('postgres://', 'postgresql://'):
+        if url.startswith(scheme):
+            return 'postgresql+psycopg2://' + url[len(scheme):]
+    return url
+
+
 class Config:
-    SECRET_KEY = 'dev'
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///esg.db'
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'dev')
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key')  # Change this in production!
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+    SQLALCHEMY_DATABASE_URI = database_url('sqlite:///esg.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    JWT_SECRET_KEY = 'dev'
+    # Optional read replica for read-only endpoints; two SQLite files work locally
+    REPLICA_DATABASE_URL = database_url(None, 'REPLICA_DATABASE_URL')
+    ESG_INSERT_CHUNK_SIZE = 1000
+    # Years of ESG data kept in the hot table, the current year included;
+    # older years are moved to the archive by `flask archive-esg-data`
+    ESG_HOT_YEARS = env_int('ESG_HOT_YEARS', 2)
+    # Report render processes per web worker process, not per host: every
+    # Gunicorn/WSGI worker starts its own pool on first use
+    REPORT_JOB_WORKERS = env_int('REPORT_JOB_WORKERS', 2)
+
+    # Pool settings, applied to server databases only (see engine_options)
+    DB_POOL_SIZE = env_int('DB_POOL_SIZE', 5)
+    DB_MAX_OVERFLOW = env_int('DB_MAX_OVERFLOW', 10)
+    DB_POOL_TIMEOUT = env_int('DB_POOL_TIMEOUT', 30)  # seconds to wait for a free connection
+    DB_POOL_RECYCLE = env_int('DB_POOL_RECYCLE', 1800)  # seconds, below typical server idle timeouts
+
+    # Applied to every new SQLite connection
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': env_int('SQLITE_BUSY_TIMEOUT', 5000),  # milliseconds
+        'cache_size': -64000,  # negative means KiB, so 64 MB
+        'mmap_size': 256 * 1024 * 1024,
+    }
+
+
+class DevelopmentConfig(Config):
+    pass
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = database_url('sqlite://')
+
+
+class ProductionConfig(Config):
+    # No fallback: production must say which database it uses
+    SQLALCHEMY_DATABASE_URI = database_url(None)
+    DB_POOL_SIZE = env_int('DB_POOL_SIZE', 10)
+    DB_MAX_OVERFLOW = env_int('DB_MAX_OVERFLOW', 20)
+
+
+config_by_name = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+}
+
+
+def get_config(name=None):
+    """Config class for ``name``, defaulting to the ESG_ENV environment variable."""
+    name = name or os.environ.get('ESG_ENV', 'development')
+    if name not in config_by_name:
+        raise ValueError(f"Unknown ESG_ENV {name!r}; expected one of {', '.join(config_by_name)}")
+    return config_by_name[name]
+
+
+def engine_options(url, config):
+    """Engine options for a database URL under ``config``."""
+    if url.startswith('sqlite'):
+        # One file, one writer: a large pool only adds lock contention
+        return {}
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': True,
+    }
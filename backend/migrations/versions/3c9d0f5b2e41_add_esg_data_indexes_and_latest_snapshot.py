@@ -0,0 +1,59 @@
+"""Add esg_data indexes and latest_esg_snapshot table
+
+Revision ID: 3c9d0f5b2e41
+Revises: 7a346116388a
+Create Date: 2026-10-17 09:12:44.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9d0f5b2e41'
+down_revision = '7a346116388a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    existing_indexes = {index['name'] for index in inspector.get_indexes('esg_data')}
+
+    with op.batch_alter_table('esg_data', schema=None) as batch_op:
+        if 'ix_esg_data_company_id_date' not in existing_indexes:
+            batch_op.create_index('ix_esg_data_company_id_date', ['company_id', 'date'], unique=False)
+        if 'ix_esg_data_date_id' not in existing_indexes:
+            batch_op.create_index('ix_esg_data_date_id', ['date', 'id'], unique=False)
+
+    # create_app() runs db.create_all(), so the table may already exist
+    if not inspector.has_table('latest_esg_snapshot'):
+        op.create_table('latest_esg_snapshot',
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('esg_data_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['company_id'], ['company.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['esg_data_id'], ['esg_data.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('company_id')
+        )
+
+    # Backfill from existing rows, tie-breaking equal dates on the highest id
+    op.execute("DELETE FROM latest_esg_snapshot")
+    op.execute("""
+        INSERT INTO latest_esg_snapshot (company_id, esg_data_id, date)
+        SELECT e.company_id, MAX(e.id), e.date
+        FROM esg_data e
+        JOIN (
+            SELECT company_id, MAX(date) AS latest_date
+            FROM esg_data
+            GROUP BY company_id
+        ) latest ON latest.company_id = e.company_id AND latest.latest_date = e.date
+        GROUP BY e.company_id, e.date
+    """)
+
+
+def downgrade():
+    op.drop_table('latest_esg_snapshot')
+    with op.batch_alter_table('esg_data', schema=None) as batch_op:
+        batch_op.drop_index('ix_esg_data_date_id')
+        batch_op.drop_index('ix_esg_data_company_id_date')
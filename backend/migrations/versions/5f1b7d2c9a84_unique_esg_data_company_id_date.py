@@ -0,0 +1,62 @@
+"""Make (company_id, date) unique on esg_data
+
+The upgrade refuses to run while duplicate rows exist and lists them,
+rather than choosing which rows to drop. Remove the extra rows, run
+`flask rebuild-snapshots` and `flask rebuild-rollups` if they were deleted
+with plain SQL, then run the upgrade again.
+
+Revision ID: 5f1b7d2c9a84
+Revises: c41f7a9e0b68
+Create Date: 2026-10-17 15:31:37.582913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f1b7d2c9a84'
+down_revision = 'c41f7a9e0b68'
+branch_labels = None
+depends_on = None
+
+MAX_LISTED_DUPLICATES = 20
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    existing_indexes = {index['name'] for index in inspector.get_indexes('esg_data')}
+    existing_constraints = {constraint['name'] for constraint in inspector.get_unique_constraints('esg_data')}
+
+    duplicates = op.get_bind().execute(sa.text("""
+        SELECT company_id, date, COUNT(*) AS row_count, MIN(id) AS first_id, MAX(id) AS last_id
+        FROM esg_data
+        GROUP BY company_id, date
+        HAVING COUNT(*) > 1
+        ORDER BY company_id, date
+    """)).all()
+    if duplicates:
+        shown = '\n'.join(
+            f'  company {row.company_id} on {row.date}: {row.row_count} rows (ids {row.first_id}..{row.last_id})'
+            for row in duplicates[:MAX_LISTED_DUPLICATES]
+        )
+        more = len(duplicates) - MAX_LISTED_DUPLICATES
+        if more > 0:
+            shown += f'\n  ... and {more} more'
+        raise RuntimeError(
+            f'esg_data has {len(duplicates)} duplicate (company_id, date) keys; '
+            f'remove the extra rows and run the upgrade again:\n{shown}'
+        )
+
+    # create_app() runs db.create_all(), so the constraint may already exist
+    with op.batch_alter_table('esg_data', schema=None) as batch_op:
+        if 'ix_esg_data_company_id_date' in existing_indexes:
+            batch_op.drop_index('ix_esg_data_company_id_date')
+        if 'uq_esg_data_company_id_date' not in existing_constraints:
+            batch_op.create_unique_constraint('uq_esg_data_company_id_date', ['company_id', 'date'])
+
+
+def downgrade():
+    with op.batch_alter_table('esg_data', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_esg_data_company_id_date', type_='unique')
+        batch_op.create_index('ix_esg_data_company_id_date', ['company_id', 'date'], unique=False)
@@ -0,0 +1,32 @@
+"""Add data_version table
+
+Revision ID: 8e2a6c41d7f3
+Revises: 3c9d0f5b2e41
+Create Date: 2026-10-17 11:03:27.904512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e2a6c41d7f3'
+down_revision = '3c9d0f5b2e41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() runs db.create_all(), so the table may already exist
+    if sa.inspect(op.get_bind()).has_table('data_version'):
+        return
+    op.create_table('data_version',
+    sa.Column('key', sa.String(length=100), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('data_version')
@@ -0,0 +1,51 @@
+"""Add ingest_job table
+
+Revision ID: a7d3e9f1c2b5
+Revises: 5f1b7d2c9a84
+Create Date: 2026-10-17 15:33:09.640118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e9f1c2b5'
+down_revision = '5f1b7d2c9a84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() runs db.create_all(), so the table may already exist
+    if sa.inspect(op.get_bind()).has_table('ingest_job'):
+        return
+    op.create_table('ingest_job',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('format', sa.String(length=20), nullable=False),
+    sa.Column('mode', sa.String(length=20), nullable=False),
+    sa.Column('chunk_size', sa.Integer(), nullable=False),
+    sa.Column('source_path', sa.String(length=500), nullable=False),
+    sa.Column('total_lines', sa.Integer(), nullable=False),
+    sa.Column('committed_line', sa.Integer(), nullable=False),
+    sa.Column('inserted', sa.Integer(), nullable=False),
+    sa.Column('updated', sa.Integer(), nullable=False),
+    sa.Column('unchanged', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('chunks', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.JSON(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('ingest_job', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_ingest_job_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ingest_job', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ingest_job_status'))
+    op.drop_table('ingest_job')
@@ -0,0 +1,44 @@
+"""Add esg_rollup table
+
+Populate it afterwards with `flask rebuild-rollups`.
+
+Revision ID: c41f7a9e0b68
+Revises: 8e2a6c41d7f3
+Create Date: 2026-10-17 13:40:18.227361
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f7a9e0b68'
+down_revision = '8e2a6c41d7f3'
+branch_labels = None
+depends_on = None
+
+METRICS = (
+    'co2_emissions', 'energy_consumption', 'water_usage', 'waste_generated',
+    'renewable_energy_percent', 'employee_count', 'diversity_ratio',
+    'safety_incidents', 'training_hours', 'community_investment',
+    'board_independence', 'board_diversity', 'ethics_violations', 'data_breaches',
+)
+
+
+def upgrade():
+    # create_app() runs db.create_all(), so the table may already exist
+    if sa.inspect(op.get_bind()).has_table('esg_rollup'):
+        return
+    op.create_table('esg_rollup',
+    sa.Column('dimension', sa.String(length=20), nullable=False),
+    sa.Column('dimension_key', sa.String(length=100), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    *[sa.Column(f'{metric}_sum', sa.Float(), nullable=False) for metric in METRICS],
+    *[sa.Column(f'{metric}_count', sa.Integer(), nullable=False) for metric in METRICS],
+    sa.PrimaryKeyConstraint('dimension', 'dimension_key', 'year')
+    )
+
+
+def downgrade():
+    op.drop_table('esg_rollup')
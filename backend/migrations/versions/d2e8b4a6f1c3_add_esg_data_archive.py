@@ -0,0 +1,59 @@
+"""Add esg_data_archive table
+
+Revision ID: d2e8b4a6f1c3
+Revises: a7d3e9f1c2b5
+Create Date: 2026-10-17 15:44:51.218377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2e8b4a6f1c3'
+down_revision = 'a7d3e9f1c2b5'
+branch_labels = None
+depends_on = None
+
+METRIC_COLUMNS = (
+    ('co2_emissions', sa.Float), ('energy_consumption', sa.Float), ('water_usage', sa.Float),
+    ('waste_generated', sa.Float), ('renewable_energy_percent', sa.Float),
+    ('employee_count', sa.Integer), ('diversity_ratio', sa.Float), ('safety_incidents', sa.Integer),
+    ('training_hours', sa.Float), ('community_investment', sa.Float),
+    ('board_independence', sa.Float), ('board_diversity', sa.Float),
+    ('ethics_violations', sa.Integer), ('data_breaches', sa.Integer),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    # create_app() runs db.create_all(), so the table may already exist
+    if sa.inspect(bind).has_table('esg_data_archive'):
+        return
+    op.create_table('esg_data_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.DateTime(), nullable=False),
+    *[sa.Column(name, type_(), nullable=True) for name, type_ in METRIC_COLUMNS],
+    sa.ForeignKeyConstraint(['company_id'], ['company.id'], ),
+    sa.PrimaryKeyConstraint('id', 'date'),
+    sa.UniqueConstraint('company_id', 'date', name='uq_esg_data_archive_company_id_date'),
+    postgresql_partition_by='RANGE (date)'
+    )
+    if bind.dialect.name == 'postgresql':
+        op.execute('CREATE TABLE IF NOT EXISTS esg_data_archive_default PARTITION OF esg_data_archive DEFAULT')
+    with op.batch_alter_table('esg_data_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_esg_data_archive_date', ['date'], unique=False)
+
+
+def downgrade():
+    # Move archived rows back first so downgrading loses no data
+    op.execute(
+        'INSERT INTO esg_data (id, company_id, date, {columns}) '
+        'SELECT id, company_id, date, {columns} FROM esg_data_archive'.format(
+            columns=', '.join(name for name, _ in METRIC_COLUMNS)
+        )
+    )
+    with op.batch_alter_table('esg_data_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_esg_data_archive_date')
+    op.drop_table('esg_data_archive')
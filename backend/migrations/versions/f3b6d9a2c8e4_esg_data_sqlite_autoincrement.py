@@ -0,0 +1,74 @@
+"""Stop SQLite reusing esg_data ids
+
+Without AUTOINCREMENT SQLite hands a new row the id of the highest row
+deleted, so an id moved to esg_data_archive could be given out again.
+The table is rebuilt with AUTOINCREMENT, archived rows whose id clashes
+with another row are renumbered, and the id sequence starts above every
+id in either table. PostgreSQL sequences never reuse ids; nothing to do.
+
+Revision ID: f3b6d9a2c8e4
+Revises: e5a1c7f3b9d2
+Create Date: 2026-10-17 16:04:15.603118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b6d9a2c8e4'
+down_revision = 'e5a1c7f3b9d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+
+    # create_app() runs db.create_all(), so a new database already has it
+    table_sql = bind.execute(sa.text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'esg_data'"
+    )).scalar()
+    if 'AUTOINCREMENT' not in table_sql.upper():
+        with op.batch_alter_table(
+            'esg_data', recreate='always', table_kwargs={'sqlite_autoincrement': True}
+        ):
+            pass
+
+    # Archived ids that are also in esg_data, or twice in the archive, get
+    # fresh ids above everything in use; the highest date keeps the old id
+    top = bind.execute(sa.text(
+        "SELECT MAX(id) FROM (SELECT id FROM esg_data UNION ALL SELECT id FROM esg_data_archive)"
+    )).scalar() or 0
+    clashing = bind.execute(sa.text("""
+        SELECT a.company_id, a.date FROM esg_data_archive a
+        WHERE a.id IN (SELECT id FROM esg_data)
+           OR EXISTS (
+               SELECT 1 FROM esg_data_archive b
+               WHERE b.id = a.id AND b.date > a.date
+           )
+        ORDER BY a.date, a.company_id
+    """)).all()
+    for offset, (company_id, date) in enumerate(clashing, start=1):
+        bind.execute(
+            sa.text("UPDATE esg_data_archive SET id = :id WHERE company_id = :company_id AND date = :date"),
+            {'id': top + offset, 'company_id': company_id, 'date': date}
+        )
+
+    bind.execute(sa.text("DELETE FROM sqlite_sequence WHERE name = 'esg_data'"))
+    bind.execute(
+        sa.text("INSERT INTO sqlite_sequence (name, seq) VALUES ('esg_data', :seq)"),
+        {'seq': top + len(clashing)}
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table(
+        'esg_data', recreate='always', table_kwargs={'sqlite_autoincrement': False}
+    ):
+        pass
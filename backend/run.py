@@ -15,7 +15,6 @@ logging.basicConfig(
 )
 
 logger = logging.getLogger(__name__)
-app = create_app()
 
 def add_test_data():
     try:
@@ -49,7 +48,11 @@ def add_test_data():
         logger.error(f"Error adding test data: {str(e)}")
         raise
 
+# No app at import time: report workers are spawned processes that
+# re-import this module, and each would otherwise build a whole app.
+# `flask --app run` finds create_app() itself.
 if __name__ == '__main__':
+    app = create_app()
     with app.app_context():
         try:
             db.create_all()
@@ -0,0 +1,91 @@
+"""Measure full-history XLSX export time and peak Python memory.
+
+Exports growing histories with the streaming constant_memory writer, and
+the smallest one through a pandas DataFrame for comparison. Peak memory
+is tracked with tracemalloc, which also slows both paths down.
+
+Usage: python scripts/bench_history_export.py [rows ...]
+"""
+import sys
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORK_DIR = tempfile.mkdtemp(prefix='bench_history_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORK_DIR, 'bench.db')}"
+
+from sqlalchemy import insert, select
+from app import create_app
+from app.extensions import db
+from app.models.company import Company
+from app.models.esg_data import ESGData, ESG_PILLARS, ESG_METRICS
+from app.services.history_export import write_history_workbook
+import pandas as pd
+
+COMPANIES = 50
+
+
+def seed(count, already):
+    esg_table = ESGData.__table__
+    start = datetime(1990, 1, 1)
+    rows = []
+    for i in range(already, count):
+        row = {'company_id': i % COMPANIES + 1, 'date': start + timedelta(days=i // COMPANIES)}
+        for metric in ESG_METRICS:
+            row[metric] = i % 5000 if esg_table.c[metric].type.python_type is int else (i * 7 % 1000) / 10
+        rows.append(row)
+        if len(rows) == 10000:
+            db.session.execute(insert(esg_table), rows)
+            rows = []
+    if rows:
+        db.session.execute(insert(esg_table), rows)
+    db.session.commit()
+
+
+def pandas_export(path, company_ids):
+    # The DataFrame approach: the whole history in memory before writing
+    columns = [ESGData.company_id, Company.name, ESGData.date] + [getattr(ESGData, metric) for metric in ESG_METRICS]
+    query = select(*columns).join(Company, Company.id == ESGData.company_id).where(ESGData.company_id.in_(company_ids))
+    df = pd.DataFrame(db.session.execute(query).all(), columns=['company_id', 'name', 'date', *ESG_METRICS])
+    with pd.ExcelWriter(path, engine='xlsxwriter') as writer:
+        for pillar, metrics in ESG_PILLARS.items():
+            df[['company_id', 'name', 'date', *metrics]].to_excel(writer, sheet_name=pillar.capitalize(), index=False)
+
+
+def measure(label, func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<40} {elapsed:8.1f} s   peak {peak / 1024 / 1024:8.1f} MB")
+
+
+def main():
+    sizes = sorted(int(arg) for arg in sys.argv[1:]) or [50000, 200000]
+    app = create_app()
+    with app.app_context():
+        db.session.add_all([Company(name=f'Company {i}', industry='Tech', country='US') for i in range(COMPANIES)])
+        db.session.commit()
+        company_ids = list(range(1, COMPANIES + 1))
+        seeded = 0
+        for count in sizes:
+            seed(count, seeded)
+            seeded = count
+            path = os.path.join(WORK_DIR, f'history_{count}.xlsx')
+            measure(f'constant_memory export, {count} rows', lambda: write_history_workbook(path, company_ids))
+            print(f"{'':<40} {os.path.getsize(path) / 1024 / 1024:8.1f} MB on disk")
+            if count == sizes[0]:
+                measure(f'pandas DataFrame export, {count} rows',
+                        lambda: pandas_export(os.path.join(WORK_DIR, 'pandas.xlsx'), company_ids))
+    print(f"\nFiles left in {WORK_DIR}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Compare the stdlib JSON path with FastJSONProvider and response compression.
+
+Usage: python scripts/bench_serialization.py [rows]
+"""
+import sys
+import os
+import gzip
+import json
+import time
+from datetime import datetime, timedelta
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.json_provider import FastJSONProvider
+from app.models.esg_data import ESG_PILLARS
+from app import compression
+
+
+def make_rows(count):
+    start = datetime(2015, 1, 1)
+    rows = []
+    for i in range(count):
+        row = {'id': i, 'company_id': i % 1000, 'date': start + timedelta(days=i % 3650)}
+        for pillar, metrics in ESG_PILLARS.items():
+            row[pillar] = {metric: (i * 7 % 1000) / 10 for metric in metrics}
+        rows.append(row)
+    return rows
+
+
+def timed(label, func, repeat=3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<40} {best * 1000:9.1f} ms")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rows = make_rows(count)
+    print(f"{count} ESG rows\n")
+
+    app = Flask(__name__)
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    # The current path converts datetimes with isoformat() inside to_dict()
+    iso_rows = [dict(row, date=row['date'].isoformat()) for row in rows]
+
+    with app.app_context():
+        body = timed('stdlib json (current jsonify)', lambda: stdlib.response(iso_rows).get_data())
+        timed('FastJSONProvider', lambda: fast.response(rows).get_data())
+    print(f"\nuncompressed payload: {len(body) / 1024:9.1f} KiB")
+    print(f"json roundtrip equal: {json.loads(body) == json.loads(fast.dumps(rows))}\n")
+
+    config = {'COMPRESSION_GZIP_LEVEL': 6, 'COMPRESSION_ZSTD_LEVEL': 3}
+    gz = timed('gzip level 6', lambda: compression.compress(body, 'gzip', config))
+    print(f"{'':<40} {len(gz) / 1024:9.1f} KiB")
+    if compression.zstandard is not None:
+        zs = timed('zstd level 3', lambda: compression.compress(body, 'zstd', config))
+        print(f"{'':<40} {len(zs) / 1024:9.1f} KiB")
+    else:
+        print('zstd: zstandard not installed, skipped')
+    assert gzip.decompress(gz) == body
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Measure batch payload validation cost per 10k ESG entries.
+
+Compares the schema validator with the previous direct-indexing
+conversion, on clean batches and on batches with malformed rows.
+
+Usage: python scripts/bench_validation.py [rows]
+"""
+import sys
+import os
+import time
+import random
+from datetime import datetime, timedelta
+
+# Add the parent directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.esg_data import ESGData, ESG_METRICS, ESG_PILLARS
+from app.utils.fieldsets import METRIC_PILLARS
+from app.utils.validation import compile_entry_schema, validate_entries
+
+INT_METRICS = [metric for metric in ESG_METRICS if ESGData.__table__.c[metric].type.python_type is int]
+
+
+def make_entries(count, bad_ratio=0.0):
+    rng = random.Random(42)
+    start = datetime(2015, 1, 1)
+    entries = []
+    for i in range(count):
+        entry = {'company_id': i % 1000 + 1, 'date': (start + timedelta(days=i % 3650)).isoformat()}
+        for pillar, metrics in ESG_PILLARS.items():
+            entry[pillar] = {metric: (i * 7 % 1000) / 10 for metric in metrics}
+        # Integer columns arrive as JSON integers
+        for metric in INT_METRICS:
+            pillar = METRIC_PILLARS[metric]
+            entry[pillar][metric] = i % 5000
+        if rng.random() < bad_ratio:
+            # One of the usual mistakes: a string number, a missing pillar, a bad date
+            mistake = rng.randrange(3)
+            if mistake == 0:
+                entry['environmental']['co2_emissions'] = '12.5'
+            elif mistake == 1:
+                entry['governance'] = 'n/a'
+            else:
+                entry['date'] = '31/12/2020'
+        entries.append(entry)
+    return entries
+
+
+def direct_conversion(entries):
+    # The pre-schema path: stops at the first bad entry
+    rows = []
+    for entry in entries:
+        row = {'company_id': entry['company_id'], 'date': datetime.fromisoformat(entry['date'])}
+        for pillar, metrics in ESG_PILLARS.items():
+            for metric in metrics:
+                row[metric] = entry[pillar][metric]
+        rows.append(row)
+    return rows
+
+
+def timed(label, func, count, repeat=5):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<40} {best * 1000:9.1f} ms  ({best * 1000 * 10000 / count:7.1f} ms / 10k rows)")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    clean = make_entries(count)
+    dirty = make_entries(count, bad_ratio=0.01)
+    print(f"{count} ESG entries\n")
+
+    start = time.perf_counter()
+    compile_entry_schema()
+    print(f"{'compile schema (once, at import)':<40} {(time.perf_counter() - start) * 1000:9.3f} ms")
+    timed('direct conversion (clean)', lambda: direct_conversion(clean), count)
+    rows, errors = timed('validate_entries (clean)', lambda: validate_entries(clean), count)
+    assert not errors and len(rows) == count
+    rows, errors = timed('validate_entries (1% malformed)', lambda: validate_entries(dirty), count)
+    print(f"\n{len({error['index'] for error in errors})} invalid entries, {len(errors)} errors reported")
+    print(f"first: {errors[0] if errors else None}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,8 @@
 from app import create_app, db
 from app.models.company import Company
 from app.models.esg_data import ESGData
+from app.services.versioning import bump_all_versions
+from app.services.rollups import rebuild_rollups
 from datetime import datetime, timedelta
 import random
 
@@ -67,6 +69,9 @@ def seed_data():
                 )
                 db.session.add(esg_data)
         
+        db.session.flush()
+        rebuild_rollups(db.session.connection())
+        bump_all_versions()
         db.session.commit()
         print("Test data has been added successfully!")
 
@@ -0,0 +1,68 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.extensions import db
+from app.models.company import Company
+from app.models.esg_data import ESG_METRICS, ESG_PILLARS
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """App factory for one test; every app it makes shares the same database."""
+    def make(**config):
+        return create_app('testing', {
+            # A file rather than :memory: so several app instances can share it
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'esg.db'}",
+            'REPLICA_DATABASE_URL': None,
+            'REPORT_JOB_DIR': str(tmp_path / 'report_jobs'),
+            'INGEST_JOB_DIR': str(tmp_path / 'ingest_jobs'),
+            **config
+        })
+    return make
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def company(app):
+    company = Company(name='Acme', industry='Technology', country='USA')
+    db.session.add(company)
+    db.session.commit()
+    return company
+
+
+def esg_row(company_id, date, **metrics):
+    """An esg_data row as the ingest functions take it; unset metrics are None."""
+    row = {'company_id': company_id, 'date': date}
+    row.update({metric: metrics.get(metric) for metric in ESG_METRICS})
+    return row
+
+
+def esg_entry(company_id, date, **metrics):
+    """A nested API payload entry, as the batch and NDJSON endpoints take it."""
+    entry = {'company_id': company_id, 'date': date}
+    for pillar, names in ESG_PILLARS.items():
+        entry[pillar] = {metric: metrics.get(metric) for metric in names}
+    return entry
+
+
+def year(value):
+    return datetime(value, 1, 1)
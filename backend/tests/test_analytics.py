@@ -0,0 +1,87 @@
+import pytest
+
+from app.extensions import db
+from app.models.company import Company
+from app.services.ingest import bulk_insert
+from conftest import esg_row, year
+
+
+@pytest.fixture
+def industries(app):
+    companies = {
+        name: Company(name=name, industry=industry, country='USA')
+        for name, industry in (('Acme', 'Technology'), ('Initech', 'Technology'), ('Globex', 'Energy'))
+    }
+    db.session.add_all(companies.values())
+    db.session.commit()
+    return {name: company.id for name, company in companies.items()}
+
+
+def insert_rows(*rows):
+    bulk_insert(db.session.connection(), list(rows))
+    db.session.commit()
+
+
+def by_industry(response):
+    assert response.status_code == 200
+    return {entry['industry']: entry for entry in response.get_json()}
+
+
+def test_industry_averages_group_every_row(client, industries):
+    insert_rows(
+        esg_row(industries['Acme'], year(2020), co2_emissions=10, employee_count=100),
+        esg_row(industries['Acme'], year(2021), co2_emissions=20, employee_count=100),
+        esg_row(industries['Initech'], year(2021), co2_emissions=60, employee_count=400),
+        esg_row(industries['Globex'], year(2021), co2_emissions=5, employee_count=50),
+    )
+
+    result = by_industry(client.get('/api/analytics/industries'))
+
+    technology = result['Technology']
+    assert (technology['company_count'], technology['record_count']) == (2, 3)
+    assert technology['environmental']['co2_emissions'] == pytest.approx(30)
+    assert technology['social']['employee_count'] == pytest.approx(200)
+    assert result['Energy']['environmental']['co2_emissions'] == pytest.approx(5)
+
+
+def test_industry_averages_skip_missing_values_instead_of_counting_zero(client, industries):
+    # The old client-side math summed missing values as 0 and averaged 10 / 2 = 5
+    insert_rows(
+        esg_row(industries['Acme'], year(2021), co2_emissions=10),
+        esg_row(industries['Initech'], year(2021), co2_emissions=None, water_usage=4),
+    )
+
+    technology = by_industry(client.get('/api/analytics/industries'))['Technology']
+
+    assert technology['record_count'] == 2
+    assert technology['environmental']['co2_emissions'] == pytest.approx(10)
+    assert technology['environmental']['water_usage'] == pytest.approx(4)
+    assert technology['environmental']['energy_consumption'] is None
+
+
+def test_industry_averages_latest_only_uses_each_companys_newest_row(client, industries):
+    insert_rows(
+        esg_row(industries['Acme'], year(2020), co2_emissions=100),
+        esg_row(industries['Acme'], year(2021), co2_emissions=10),
+        esg_row(industries['Initech'], year(2019), co2_emissions=30),
+    )
+
+    technology = by_industry(client.get('/api/analytics/industries?latest=true'))['Technology']
+
+    assert technology['record_count'] == 2
+    assert technology['environmental']['co2_emissions'] == pytest.approx(20)
+
+
+def test_industry_averages_filter_by_date_range(client, industries):
+    insert_rows(
+        esg_row(industries['Acme'], year(2019), co2_emissions=1),
+        esg_row(industries['Acme'], year(2020), co2_emissions=2),
+        esg_row(industries['Acme'], year(2021), co2_emissions=3),
+    )
+
+    result = by_industry(client.get('/api/analytics/industries?start=2020-01-01&end=2020-12-31'))
+    latest = by_industry(client.get('/api/analytics/industries?end=2020-12-31&latest=true'))
+
+    assert result['Technology']['environmental']['co2_emissions'] == pytest.approx(2)
+    assert latest['Technology']['environmental']['co2_emissions'] == pytest.approx(2)
+    assert client.get('/api/analytics/industries?start=yesterday').status_code == 400
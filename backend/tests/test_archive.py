@@ -0,0 +1,146 @@
+import json
+
+from sqlalchemy import insert, select
+
+from app.extensions import db
+from app.models.esg_data import ESGData
+from app.models.esg_data_archive import esg_data_archive
+from app.services.archive import archive_year
+from app.services.ingest import bulk_insert, bulk_upsert
+from app.services.rollups import rebuild_rollups
+from conftest import esg_entry, esg_row, year
+
+
+def insert_rows(*rows):
+    bulk_insert(db.session.connection(), list(rows))
+    db.session.commit()
+
+
+def archive(value):
+    archive_year(db.session.connection(), value)
+    db.session.commit()
+
+
+def archived():
+    return db.session.execute(
+        select(esg_data_archive.c.id, esg_data_archive.c.date, esg_data_archive.c.co2_emissions)
+        .order_by(esg_data_archive.c.date)
+    ).all()
+
+
+def hot():
+    return db.session.execute(
+        select(ESGData.id, ESGData.date, ESGData.co2_emissions).order_by(ESGData.date)
+    ).all()
+
+
+def test_archived_ids_are_not_reused(company):
+    # 2018 has the highest id when it is archived, then 2019 is inserted
+    insert_rows(esg_row(company.id, year(2025), co2_emissions=9), esg_row(company.id, year(2018), co2_emissions=2))
+    archive(2018)
+    insert_rows(esg_row(company.id, year(2019), co2_emissions=3))
+    archive(2019)
+
+    ids = [row.id for row in archived()]
+    assert len(ids) == 2
+    assert len(set(ids)) == 2
+
+
+def test_upsert_of_archived_key_keeps_other_archived_rows(company):
+    # 2018 has the highest id when it is archived, then 2019 is inserted
+    insert_rows(esg_row(company.id, year(2025), co2_emissions=9), esg_row(company.id, year(2018), co2_emissions=2))
+    archive(2018)
+    insert_rows(esg_row(company.id, year(2019), co2_emissions=3))
+    archive(2019)
+
+    counts = bulk_upsert(db.session.connection(), [esg_row(company.id, year(2018), co2_emissions=20)])
+    db.session.commit()
+
+    assert counts == {'inserted': 0, 'updated': 1, 'unchanged': 0}
+    assert [(row.date, row.co2_emissions) for row in archived()] == [(year(2019), 3)]
+    assert [(row.date, row.co2_emissions) for row in hot()] == [(year(2018), 20), (year(2025), 9)]
+
+
+def test_unarchive_matches_on_key_not_id(company):
+    # Databases archived before ids stopped being reused can hold an id twice
+    insert_rows(esg_row(company.id, year(2020), co2_emissions=5))
+    db.session.execute(insert(esg_data_archive), [
+        dict(esg_row(company.id, year(2018), co2_emissions=2), id=99),
+        dict(esg_row(company.id, year(2019), co2_emissions=3), id=99),
+    ])
+    db.session.commit()
+
+    bulk_upsert(db.session.connection(), [esg_row(company.id, year(2018), co2_emissions=20)])
+    db.session.commit()
+
+    assert [(row.date, row.co2_emissions) for row in archived()] == [(year(2019), 3)]
+
+
+def test_insert_mode_rejects_archived_keys(company):
+    insert_rows(esg_row(company.id, year(2018), co2_emissions=2), esg_row(company.id, year(2020)))
+    archive(2018)
+
+    try:
+        bulk_insert(db.session.connection(), [esg_row(company.id, year(2018), co2_emissions=7)])
+    except ValueError as e:
+        assert 'archive' in str(e)
+    else:
+        raise AssertionError('archived key was inserted again')
+    finally:
+        db.session.rollback()
+
+
+def test_history_reads_every_hot_and_archived_row(client, company):
+    insert_rows(esg_row(company.id, year(2018), co2_emissions=2), esg_row(company.id, year(2020), co2_emissions=4))
+    # Shares an id with a hot row, as in a database archived before the fix
+    hot_id = hot()[0].id
+    db.session.execute(insert(esg_data_archive), [dict(esg_row(company.id, year(2016), co2_emissions=1), id=hot_id)])
+    db.session.commit()
+
+    for url in ('/api/esg-data', f'/api/esg-data/company/{company.id}'):
+        rows = client.get(url).get_json()
+        assert sorted(row['environmental']['co2_emissions'] for row in rows) == [1, 2, 4]
+    rows = client.get('/api/esg-data?fields=co2_emissions').get_json()
+    assert sorted(row['environmental']['co2_emissions'] for row in rows) == [1, 2, 4]
+    page = client.get('/api/esg-data?limit=10').get_json()
+    assert len(page['data']) == 3
+
+
+def by_date(rows):
+    return sorted(rows, key=lambda row: row['date'])
+
+
+def test_archiving_keeps_reads_and_rollups(client, company):
+    insert_rows(*[esg_row(company.id, year(value), co2_emissions=value) for value in (2016, 2017, 2018, 2024)])
+    before = by_date(client.get('/api/esg-data').get_json())
+    rollups_before = client.get('/api/analytics/rollups/company').get_json()
+
+    for value in (2016, 2017, 2018):
+        archive(value)
+    assert len(archived()) == 3
+
+    assert by_date(client.get('/api/esg-data').get_json()) == before
+    rebuild_rollups(db.session.connection())
+    db.session.commit()
+    assert client.get('/api/analytics/rollups/company').get_json() == rollups_before
+
+
+def test_dates_with_an_offset_are_compared_with_the_archive_as_utc(client, company):
+    insert_rows(*[esg_row(company.id, year(value), co2_emissions=value) for value in (2016, 2017, 2024)])
+    archive(2016)
+    archive(2017)
+
+    series = client.get(f'/api/esg-data/company/{company.id}/series',
+                        query_string={'fields': 'co2_emissions', 'points': 10, 'start': '2016-06-01T00:00:00+00:00'})
+    assert series.status_code == 200
+    assert [value for _, value in series.get_json()['series']['co2_emissions']] == [2017, 2024]
+
+    # 2017-01-01 00:00 UTC, written in another zone, is the archived row's key
+    entry = esg_entry(company.id, '2016-12-31T19:00:00-05:00', co2_emissions=1)
+    response = client.post('/api/esg-data/batch?mode=upsert', json={'esg_data': [entry]})
+    assert response.get_json() == {'inserted': 0, 'unchanged': 0, 'updated': 1}
+    ingest = client.post('/api/esg-data/ingest?mode=upsert', content_type='application/x-ndjson',
+                         data=json.dumps(dict(entry, date='2016-01-01T01:00:00+01:00')))
+    assert ingest.get_json()['errors'] == []
+    assert archived() == []
+    assert {date: co2 for _, date, co2 in hot()} == {year(2016): 1, year(2017): 1, year(2024): 2024}
@@ -0,0 +1,116 @@
+import time
+
+from app.services.cache import ReadThroughCache, TTLCache, company_cache
+from app.services.versioning import COMPANIES, versioned_key
+
+
+def company_names(response):
+    return sorted(company['name'] for company in response.get_json())
+
+
+def test_ttl_cache_evicts_least_recently_used_within_byte_budget():
+    cache = TTLCache(max_entries=10, ttl=60, max_bytes=10)
+    cache.set('a', b'1234')
+    cache.set('b', b'1234')
+    cache.get('a')
+    cache.set('c', b'1234')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1234'
+    assert cache.size == 8
+    assert cache.evictions == 1
+    # Larger than the whole budget: never stored
+    cache.set('d', b'x' * 11)
+    assert cache.get('d') is None
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(ttl=0.01)
+    cache.set('a', b'1')
+    time.sleep(0.02)
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_read_through_cache_loads_once_and_skips_none():
+    cache = ReadThroughCache(TTLCache())
+    calls = []
+
+    def load():
+        calls.append(1)
+        return b'payload'
+
+    assert cache.get_or_load('key', load) == b'payload'
+    assert cache.get_or_load('key', load) == b'payload'
+    assert len(calls) == 1
+    assert cache.get_or_load('missing', lambda: None) is None
+    assert cache.get('missing') is None
+    assert cache.stats()['hits'] == 1
+
+
+def test_write_on_one_worker_retires_cached_payloads_on_another(make_app):
+    worker_a, worker_b = make_app().test_client(), make_app().test_client()
+    worker_a.post('/api/companies', json={'name': 'Acme'})
+    assert company_names(worker_a.get('/api/companies')) == ['Acme']
+    stale = worker_b.get('/api/companies')
+    assert company_names(stale) == ['Acme']
+
+    worker_a.post('/api/companies', json={'name': 'Globex'})
+
+    fresh = worker_b.get('/api/companies')
+    assert company_names(fresh) == ['Acme', 'Globex']
+    assert fresh.headers['ETag'] != stale.headers['ETag']
+    revalidated = worker_b.get('/api/companies', headers={'If-None-Match': stale.headers['ETag']})
+    assert revalidated.status_code == 200
+    assert company_names(revalidated) == ['Acme', 'Globex']
+    assert worker_b.get('/api/companies', headers={'If-None-Match': fresh.headers['ETag']}).status_code == 304
+
+
+def test_load_finishing_after_a_write_is_not_served(make_app):
+    app_a, app_b = make_app(), make_app()
+    worker_a, worker_b = app_a.test_client(), app_b.test_client()
+    worker_a.post('/api/companies', json={'name': 'Acme'})
+    stale_body = worker_b.get('/api/companies').get_data()
+
+    # Worker B starts a load, worker A writes, then B's load stores the old body
+    with app_b.test_request_context():
+        key = versioned_key(COMPANIES)
+    worker_a.post('/api/companies', json={'name': 'Globex'})
+    with app_b.test_request_context():
+        company_cache().set(key, stale_body)
+
+    assert company_names(worker_b.get('/api/companies')) == ['Acme', 'Globex']
+
+
+def test_company_payload_follows_batch_update(make_app):
+    worker_a, worker_b = make_app().test_client(), make_app().test_client()
+    company_id = worker_a.post('/api/companies', json={'name': 'Acme', 'description': 'old'}).get_json()['id']
+    assert worker_b.get(f'/api/companies/{company_id}').get_json()['description'] == 'old'
+
+    worker_a.put('/api/companies/batch-update', json={'updates': [{'id': company_id, 'description': 'new'}]})
+
+    assert worker_b.get(f'/api/companies/{company_id}').get_json()['description'] == 'new'
+
+
+def test_batch_update_bumps_only_companies_it_changes(client):
+    acme = client.post('/api/companies', json={'name': 'Acme', 'description': 'old'}).get_json()['id']
+    globex = client.post('/api/companies', json={'name': 'Globex', 'description': 'same'}).get_json()['id']
+    etags = {company_id: client.get(f'/api/companies/{company_id}').headers['ETag'] for company_id in (acme, globex)}
+    listing = client.get('/api/companies').headers['ETag']
+
+    def revalidate(url, etag):
+        return client.get(url, headers={'If-None-Match': etag}).status_code
+
+    unchanged = client.put('/api/companies/batch-update', json={'updates': [{'id': globex, 'description': 'same'},
+                                                                          {'id': 999, 'description': 'x'}]})
+    assert unchanged.status_code == 200
+    assert [company['id'] for company in unchanged.get_json()] == [globex]
+    assert revalidate('/api/companies', listing) == 304
+    assert revalidate(f'/api/companies/{globex}', etags[globex]) == 304
+
+    client.put('/api/companies/batch-update', json={'updates': [{'id': acme, 'description': 'new'},
+                                                                {'id': globex, 'description': 'same'}]})
+    assert revalidate('/api/companies', listing) == 200
+    assert revalidate(f'/api/companies/{acme}', etags[acme]) == 200
+    assert revalidate(f'/api/companies/{globex}', etags[globex]) == 304
+    assert client.get(f'/api/companies/{acme}').get_json()['description'] == 'new'
@@ -0,0 +1,67 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import text
+
+from app import create_app
+from app.extensions import db
+import config
+from config import ProductionConfig, TestingConfig, database_url, engine_options, get_config
+
+
+def test_database_url_pins_the_postgres_driver(monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', 'postgres://user:secret@db/esg')
+    assert database_url(None) == 'postgresql+psycopg2://user:secret@db/esg'
+    monkeypatch.setenv('DATABASE_URL', 'postgresql://db/esg')
+    assert database_url(None) == 'postgresql+psycopg2://db/esg'
+    monkeypatch.setenv('DATABASE_URL', 'sqlite:///esg.db')
+    assert database_url(None) == 'sqlite:///esg.db'
+    monkeypatch.delenv('DATABASE_URL')
+    assert database_url('sqlite://') == 'sqlite://'
+
+
+def test_profile_comes_from_esg_env(monkeypatch):
+    monkeypatch.setenv('ESG_ENV', 'testing')
+    assert get_config() is TestingConfig
+    assert get_config('production') is ProductionConfig
+    monkeypatch.setenv('ESG_ENV', 'staging')
+    with pytest.raises(ValueError, match='staging'):
+        get_config()
+
+
+def test_only_server_databases_get_a_pool():
+    config = {'DB_POOL_SIZE': 10, 'DB_MAX_OVERFLOW': 20, 'DB_POOL_TIMEOUT': 30, 'DB_POOL_RECYCLE': 1800}
+
+    assert engine_options('sqlite:///esg.db', config) == {}
+    options = engine_options('postgresql+psycopg2://db/esg', config)
+    assert (options['pool_size'], options['max_overflow'], options['pool_pre_ping']) == (10, 20, True)
+
+
+def test_production_requires_a_database_url(monkeypatch):
+    monkeypatch.setattr(ProductionConfig, 'SQLALCHEMY_DATABASE_URI', None)
+    with pytest.raises(RuntimeError, match='DATABASE_URL'):
+        create_app('production')
+
+
+def test_sqlite_connections_get_the_configured_pragmas(app):
+    with db.engine.connect() as connection:
+        assert connection.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert connection.execute(text('PRAGMA busy_timeout')).scalar() == app.config['SQLITE_PRAGMAS']['busy_timeout']
+
+
+def test_dotenv_beside_config_is_read_at_import(tmp_path):
+    shutil.copy(config.__file__, tmp_path / 'config.py')
+    (tmp_path / '.env').write_text('DATABASE_URL=postgres://db/from_dotenv\nDB_POOL_SIZE=3\n')
+    env = {name: value for name, value in os.environ.items() if name not in ('DATABASE_URL', 'DB_POOL_SIZE')}
+    env['PYTHONPATH'] = str(tmp_path)
+
+    # Run from elsewhere: the file is found next to config.py, not in the working directory
+    result = subprocess.run(
+        [sys.executable, '-c', 'import config; print(config.Config.SQLALCHEMY_DATABASE_URI, config.Config.DB_POOL_SIZE)'],
+        cwd=os.path.dirname(str(tmp_path)), env=env, capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.split() == ['postgresql+psycopg2://db/from_dotenv', '3']
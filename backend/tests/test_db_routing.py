@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.extensions import db
+from app.utils.db_routing import READ_YOUR_WRITES_COOKIE, READ_YOUR_WRITES_HEADER, REPLICA_BIND
+from conftest import esg_entry
+
+
+@pytest.fixture
+def replica_app(make_app, tmp_path):
+    # No app context held open: each request gets its own session, as in production
+    return make_app(REPLICA_DATABASE_URL=f"sqlite:///{tmp_path / 'replica.db'}")
+
+
+def sync_replica(app):
+    result = app.test_cli_runner().invoke(args=['copy-replica'])
+    assert result.exit_code == 0, result.output
+
+
+def write_row(client, company_id):
+    response = client.post('/api/esg-data/batch', json={'esg_data': [esg_entry(company_id, '2020-01-01')]})
+    assert response.status_code == 201
+
+
+def test_reads_go_to_the_replica_until_it_catches_up(replica_app):
+    writer = replica_app.test_client()
+    company_id = writer.post('/api/companies', json={'name': 'Acme'}).get_json()['id']
+    sync_replica(replica_app)
+    write_row(writer, company_id)
+
+    reader = replica_app.test_client()
+    lagging = reader.get('/api/esg-data')
+    assert lagging.headers['X-DB-Route'] == REPLICA_BIND
+    assert lagging.get_json() == []
+
+    sync_replica(replica_app)
+    assert len(reader.get('/api/esg-data').get_json()) == 1
+
+
+def test_writers_read_their_own_writes_from_the_primary(replica_app):
+    writer = replica_app.test_client()
+    company_id = writer.post('/api/companies', json={'name': 'Acme'}).get_json()['id']
+    sync_replica(replica_app)
+
+    write_row(writer, company_id)
+    own = writer.get(f'/api/esg-data/company/{company_id}')
+    asked = replica_app.test_client().get('/api/esg-data', headers={READ_YOUR_WRITES_HEADER: 'true'})
+
+    assert own.headers['X-DB-Route'] == 'primary'
+    assert len(own.get_json()) == 1
+    assert asked.headers['X-DB-Route'] == 'primary'
+    assert len(asked.get_json()) == 1
+
+
+def test_write_endpoints_never_touch_the_replica(replica_app):
+    writer = replica_app.test_client()
+    sync_replica(replica_app)
+
+    response = writer.post('/api/companies', json={'name': 'Acme'})
+
+    assert response.status_code == 201
+    assert response.headers['X-DB-Route'] == 'primary'
+    with replica_app.app_context(), db.engines[REPLICA_BIND].connect() as replica:
+        assert replica.execute(text('SELECT COUNT(*) FROM company')).scalar() == 0
+        # query_only guards the local replica file against stray writes
+        with pytest.raises(OperationalError):
+            replica.execute(text("INSERT INTO company (name) VALUES ('Globex')"))
+
+
+def test_only_requests_that_wrote_pin_the_client_to_the_primary(replica_app):
+    client = replica_app.test_client()
+    company_id = client.post('/api/companies', json={'name': 'Acme'}).get_json()['id']
+    assert client.get_cookie(READ_YOUR_WRITES_COOKIE) is not None
+    client.delete_cookie(READ_YOUR_WRITES_COOKIE)
+    write_row(client, company_id)
+    assert client.get_cookie(READ_YOUR_WRITES_COOKIE) is not None
+    sync_replica(replica_app)
+
+    reader = replica_app.test_client()
+    scores = reader.post('/api/scores', json={'company_ids': [company_id]})
+    history = reader.post('/reports/history', json={'company_ids': [company_id]})
+
+    assert scores.status_code == history.status_code == 200
+    assert scores.headers['X-DB-Route'] == history.headers['X-DB-Route'] == REPLICA_BIND
+    assert reader.get_cookie(READ_YOUR_WRITES_COOKIE) is None
+    assert reader.get('/api/esg-data').headers['X-DB-Route'] == REPLICA_BIND
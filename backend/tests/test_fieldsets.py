@@ -0,0 +1,61 @@
+import pytest
+
+from app.extensions import db
+from app.models.esg_data import ESG_PILLARS
+from app.services.ingest import bulk_insert
+from app.utils.fieldsets import parse_fieldset
+from conftest import esg_row, year
+
+
+@pytest.fixture
+def stored(company):
+    bulk_insert(db.session.connection(), [
+        esg_row(company.id, year(2020), co2_emissions=1, water_usage=2, employee_count=30, data_breaches=0)
+    ])
+    db.session.commit()
+    return company
+
+
+def test_parse_fieldset_keeps_payload_order_and_merges_pillars():
+    selected = parse_fieldset('data_breaches, water_usage,co2_emissions', 'social')
+
+    assert list(selected) == ['environmental', 'social', 'governance']
+    assert selected['environmental'] == ('co2_emissions', 'water_usage')
+    assert selected['social'] == ESG_PILLARS['social']
+    assert selected['governance'] == ('data_breaches',)
+    assert parse_fieldset(None, None) is None
+    assert parse_fieldset(' , ', '') is None
+
+
+def test_parse_fieldset_rejects_unknown_names():
+    with pytest.raises(ValueError, match='Unknown field'):
+        parse_fieldset('co2', None)
+    with pytest.raises(ValueError, match='Unknown pillar'):
+        parse_fieldset(None, 'economic')
+
+
+def test_sparse_payload_has_only_the_requested_metrics(client, stored):
+    rows = client.get('/api/esg-data?fields=co2_emissions,employee_count').get_json()
+
+    assert rows == [{
+        'id': rows[0]['id'],
+        'company_id': stored.id,
+        'date': '2020-01-01T00:00:00',
+        'environmental': {'co2_emissions': 1},
+        'social': {'employee_count': 30},
+    }]
+
+
+def test_pillar_payload_matches_the_full_payload(client, stored):
+    full = client.get(f'/api/esg-data/company/{stored.id}').get_json()[0]
+    governance = client.get(f'/api/esg-data/company/{stored.id}?pillars=governance').get_json()[0]
+
+    assert set(governance) == {'id', 'company_id', 'date', 'governance'}
+    assert governance['governance'] == full['governance']
+    assert {key: full[key] for key in ('id', 'company_id', 'date')} == \
+        {key: governance[key] for key in ('id', 'company_id', 'date')}
+
+
+def test_unknown_fields_are_rejected_with_400(client, stored):
+    assert client.get('/api/esg-data?fields=co2').status_code == 400
+    assert client.get(f'/api/esg-data/company/{stored.id}?pillars=economic').status_code == 400
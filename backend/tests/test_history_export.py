@@ -0,0 +1,111 @@
+import io
+from datetime import datetime
+
+import openpyxl
+import xlsxwriter
+
+from app.extensions import db
+from app.models.company import Company
+from app.models.esg_data import ESG_PILLARS
+from app.services import history_export
+from app.services.archive import archive_year
+from app.services.history_export import write_history_workbook
+from app.services.ingest import bulk_insert
+from conftest import esg_row, year
+
+
+def history(company, other):
+    bulk_insert(db.session.connection(), [
+        esg_row(company.id, year(2019), co2_emissions=1, employee_count=10, data_breaches=0),
+        esg_row(company.id, year(2024), co2_emissions=3),
+        esg_row(company.id, year(2022), co2_emissions=2),
+        esg_row(other.id, year(2023), co2_emissions=7),
+    ])
+    db.session.commit()
+    # 2019 is only readable through the archive from here on
+    archive_year(db.session.connection(), 2019)
+    db.session.commit()
+
+
+def other_company():
+    other = Company(name='Globex', industry='Energy', country='DE')
+    db.session.add(other)
+    db.session.commit()
+    return other
+
+
+def sheet_rows(workbook, title):
+    return [tuple(cell.value for cell in row) for row in workbook[title].iter_rows()]
+
+
+def test_history_has_one_sheet_per_pillar_with_archived_years(company):
+    other = other_company()
+    history(company, other)
+    output = io.BytesIO()
+
+    count = write_history_workbook(output, [company.id, other.id])
+
+    assert count == 4
+    workbook = openpyxl.load_workbook(output)
+    assert workbook.sheetnames == [pillar.capitalize() for pillar in ESG_PILLARS]
+    environmental = sheet_rows(workbook, 'Environmental')
+    assert environmental[0] == ('Company ID', 'Company', 'Date') + ESG_PILLARS['environmental']
+    assert [row[:4] for row in environmental[1:]] == [
+        (company.id, 'Acme', datetime(2019, 1, 1), 1),
+        (company.id, 'Acme', datetime(2022, 1, 1), 2),
+        (company.id, 'Acme', datetime(2024, 1, 1), 3),
+        (other.id, 'Globex', datetime(2023, 1, 1), 7),
+    ]
+    social = sheet_rows(workbook, 'Social')
+    assert social[1][3:] == (10,) + (None,) * (len(ESG_PILLARS['social']) - 1)
+    assert sheet_rows(workbook, 'Governance')[1][3 + ESG_PILLARS['governance'].index('data_breaches')] == 0
+
+
+def test_history_is_written_in_constant_memory_mode(company, monkeypatch):
+    bulk_insert(db.session.connection(), [esg_row(company.id, year(2015 + i), co2_emissions=i) for i in range(5)])
+    db.session.commit()
+    options = []
+
+    class RecordingWorkbook(xlsxwriter.Workbook):
+        def __init__(self, filename, workbook_options=None):
+            options.append(workbook_options)
+            super().__init__(filename, workbook_options)
+
+    monkeypatch.setattr(history_export.xlsxwriter, 'Workbook', RecordingWorkbook)
+    # Three rows per sheet: a header and two data rows
+    monkeypatch.setattr(history_export, 'MAX_SHEET_ROWS', 3)
+    output = io.BytesIO()
+
+    assert write_history_workbook(output, [company.id], start=year(2016)) == 4
+
+    assert options == [{'constant_memory': True}]
+    workbook = openpyxl.load_workbook(output)
+    titles = [pillar.capitalize() for pillar in ESG_PILLARS]
+    assert workbook.sheetnames == titles + [f'{title} (2)' for title in titles]
+    values = [row[3] for title in ('Environmental', 'Environmental (2)') for row in sheet_rows(workbook, title)[1:]]
+    assert values == [1, 2, 3, 4]
+
+
+def test_history_endpoint_streams_a_workbook(client, company):
+    history(company, other_company())
+
+    response = client.post('/reports/history', json={'company_ids': [company.id], 'start': '2020-01-01'})
+
+    assert response.status_code == 200
+    assert int(response.headers['Content-Length']) == len(response.data)
+    assert response.headers['Content-Disposition'].startswith('attachment; filename=ESG_History_')
+    dates = [row[2] for row in sheet_rows(openpyxl.load_workbook(io.BytesIO(response.data)), 'Social')[1:]]
+    assert dates == [datetime(2022, 1, 1), datetime(2024, 1, 1)]
+    assert client.post('/reports/history', json={'company_ids': []}).status_code == 400
+    assert client.post('/reports/history', json={'company_ids': [1], 'start': 'soon'}).status_code == 400
+
+
+def test_export_command_writes_the_workbook(app, company, tmp_path):
+    history(company, other_company())
+    path = tmp_path / 'history.xlsx'
+
+    result = app.test_cli_runner().invoke(args=['export-esg-history', str(path), '--company-id', str(company.id)])
+
+    assert result.exit_code == 0, result.output
+    assert result.output == f'3 ESG rows written to {path}.\n'
+    assert len(sheet_rows(openpyxl.load_workbook(path), 'Environmental')) == 4
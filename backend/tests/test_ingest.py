@@ -0,0 +1,136 @@
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.esg_data import ESGData
+from app.models.esg_rollup import esg_rollup
+from app.services.archive import archive_year
+from app.services.ingest import bulk_insert, bulk_upsert, upsert_chunk
+from conftest import esg_entry, esg_row, year
+
+
+def stored():
+    return dict(db.session.execute(select(ESGData.date, ESGData.co2_emissions)).all())
+
+
+def entry(company_id, date, co2_emissions):
+    return esg_entry(company_id, date, co2_emissions=co2_emissions)
+
+
+def test_upsert_counts_inserts_updates_and_unchanged_rows(company):
+    connection = db.session.connection()
+    first = upsert_chunk(connection, [esg_row(company.id, year(2020), co2_emissions=1),
+                                      esg_row(company.id, year(2021), co2_emissions=2)])
+    second = upsert_chunk(connection, [
+        esg_row(company.id, year(2020), co2_emissions=1),
+        esg_row(company.id, year(2021), co2_emissions=5),
+        esg_row(company.id, year(2022), co2_emissions=3),
+    ])
+    db.session.commit()
+
+    assert first == {'inserted': 2, 'updated': 0, 'unchanged': 0}
+    assert second == {'inserted': 1, 'updated': 1, 'unchanged': 1}
+    assert stored() == {year(2020): 1, year(2021): 5, year(2022): 3}
+
+
+def test_upsert_applies_repeated_keys_in_order(company):
+    counts = upsert_chunk(db.session.connection(), [
+        esg_row(company.id, year(2020), co2_emissions=1),
+        esg_row(company.id, year(2020), co2_emissions=2),
+        esg_row(company.id, year(2020), co2_emissions=2),
+    ])
+    db.session.commit()
+
+    assert counts == {'inserted': 1, 'updated': 1, 'unchanged': 1}
+    assert stored() == {year(2020): 2}
+
+
+def test_bulk_upsert_totals_chunks_and_keeps_rollups_exact(company):
+    rows = [esg_row(company.id, year(2020 + i % 3), co2_emissions=i) for i in range(7)]
+    counts = bulk_upsert(db.session.connection(), rows, chunk_size=2)
+    db.session.commit()
+
+    assert counts == {'inserted': 3, 'updated': 4, 'unchanged': 0}
+    assert stored() == {year(2020): 6, year(2021): 4, year(2022): 5}
+    rollups = db.session.execute(
+        select(esg_rollup.c.year, esg_rollup.c.row_count, esg_rollup.c.co2_emissions_sum)
+        .where(esg_rollup.c.dimension == 'company')
+    ).all()
+    assert sorted(rollups) == [(2020, 1, 6), (2021, 1, 4), (2022, 1, 5)]
+
+
+def test_batch_endpoint_upsert_reports_counts(client, company):
+    body = {'esg_data': [entry(company.id, '2020-01-01', 1), entry(company.id, '2021-01-01', 2)]}
+    assert client.post('/api/esg-data/batch?mode=upsert', json=body).get_json() == \
+        {'inserted': 2, 'updated': 0, 'unchanged': 0}
+    body['esg_data'][1]['environmental']['co2_emissions'] = 3
+    assert client.post('/api/esg-data/batch?mode=upsert', json=body).get_json() == \
+        {'inserted': 0, 'updated': 1, 'unchanged': 1}
+
+
+def test_batch_endpoint_rejects_duplicates_with_409_without_echoing_sql(client, company):
+    body = {'esg_data': [entry(company.id, '2020-01-01', 1)]}
+    assert client.post('/api/esg-data/batch', json=body).status_code == 201
+
+    response = client.post('/api/esg-data/batch', json=body)
+
+    assert response.status_code == 409
+    error = response.get_json()['error']
+    assert 'UNIQUE' in error
+    assert 'INSERT' not in error and 'co2_emissions' not in error
+    assert stored() == {year(2020): 1}
+
+
+def test_batch_endpoint_rejects_archived_keys_with_409(client, company):
+    bulk_insert(db.session.connection(), [esg_row(company.id, year(2018), co2_emissions=1),
+                                          esg_row(company.id, year(2024), co2_emissions=2)])
+    archive_year(db.session.connection(), 2018)
+    db.session.commit()
+
+    response = client.post('/api/esg-data/batch', json={'esg_data': [entry(company.id, '2018-01-01', 5)]})
+
+    assert response.status_code == 409
+    assert 'archive' in response.get_json()['error']
+
+
+def test_bulk_insert_returns_ids_in_input_order_across_chunks(company):
+    rows = [esg_row(company.id, year(2010 + i), co2_emissions=i) for i in range(5)]
+
+    result = bulk_insert(db.session.connection(), rows, chunk_size=2)
+    db.session.commit()
+
+    assert result['inserted'] == 5
+    by_id = dict(db.session.execute(select(ESGData.id, ESGData.co2_emissions)).all())
+    assert [by_id[row_id] for row_id in result['ids']] == [0, 1, 2, 3, 4]
+
+
+def test_bulk_insert_keeps_snapshot_and_rollups_in_step(client, company):
+    bulk_insert(db.session.connection(), [esg_row(company.id, year(2020), co2_emissions=1),
+                                          esg_row(company.id, year(2021), co2_emissions=2)], chunk_size=1)
+    db.session.commit()
+
+    assert client.get(f'/api/scores?company_ids={company.id}&latest=true').get_json()[0]['date'] == \
+        '2021-01-01T00:00:00'
+    rollups = db.session.execute(
+        select(esg_rollup.c.year, esg_rollup.c.co2_emissions_sum).where(esg_rollup.c.dimension == 'industry')
+    ).all()
+    assert sorted(rollups) == [(2020, 1), (2021, 2)]
+
+
+def test_batch_endpoint_return_modes(client, company):
+    def body(first_year):
+        return {'esg_data': [entry(company.id, f'{first_year + i}-01-01', i) for i in range(3)]}
+
+    rows = client.post('/api/esg-data/batch?chunk_size=2', json=body(2000))
+    ids = client.post('/api/esg-data/batch?return=ids', json=body(2010))
+    count = client.post('/api/esg-data/batch?return=count', json=body(2020))
+
+    assert rows.status_code == 201
+    assert [row['environmental']['co2_emissions'] for row in rows.get_json()] == [0, 1, 2]
+    assert ids.get_json()['inserted'] == 3 and len(ids.get_json()['ids']) == 3
+    assert count.get_json() == {'inserted': 3}
+    assert client.post('/api/esg-data/batch?return=all', json=body(2030)).status_code == 400
+    assert client.post('/api/esg-data/batch?chunk_size=0', json=body(2030)).status_code == 400
+    assert len(stored()) == 9
+    # The echoed rows are what a later read returns
+    saved = {row['id']: row for row in client.get(f'/api/esg-data/company/{company.id}').get_json()}
+    assert rows.get_json() == [saved[row['id']] for row in rows.get_json()]
@@ -0,0 +1,146 @@
+import io
+import json
+from datetime import datetime
+
+import openpyxl
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.esg_data import ESGData, ESG_METRICS, ESG_PILLARS
+from app.services.report_render import XLSX_MIMETYPE
+
+CSV_HEADER = ','.join(('company_id', 'date') + ESG_METRICS)
+
+
+def csv_line(company_id, date, co2_emissions=''):
+    metrics = [str(co2_emissions)] + [''] * (len(ESG_METRICS) - 1)
+    return ','.join([str(company_id), date] + metrics)
+
+
+def ndjson_line(company_id, date, co2_emissions=None):
+    entry = {'company_id': company_id, 'date': date}
+    entry.update({pillar: dict.fromkeys(metrics) for pillar, metrics in ESG_PILLARS.items()})
+    entry['environmental']['co2_emissions'] = co2_emissions
+    return json.dumps(entry)
+
+
+def stored():
+    return dict(db.session.execute(select(ESGData.date, ESGData.co2_emissions)).all())
+
+
+def ingest(client, body, mimetype, **params):
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return client.post('/api/esg-data/ingest', data=body, content_type=mimetype, query_string=params)
+
+
+def test_csv_upload_is_inserted_in_chunks(client, company):
+    lines = [CSV_HEADER] + [csv_line(company.id, f'{2015 + i}-01-01', i) for i in range(5)]
+
+    response = ingest(client, '\n'.join(lines) + '\n', 'text/csv', chunk_size=2)
+
+    assert response.status_code == 201
+    report = response.get_json()
+    assert (report['inserted'], report['failed'], report['chunks']) == (5, 0, 3)
+    assert sorted(stored().values()) == [0, 1, 2, 3, 4]
+
+
+def test_ndjson_upload_skips_blank_lines(client, company):
+    body = '\n'.join([ndjson_line(company.id, '2020-01-01', 1), '', ndjson_line(company.id, '2021-01-01', 2)])
+
+    response = ingest(client, body, 'application/x-ndjson')
+
+    assert response.status_code == 201
+    assert response.get_json()['inserted'] == 2
+    assert sorted(stored().values()) == [1, 2]
+
+
+def test_malformed_lines_are_reported_and_the_rest_kept(client, company):
+    body = '\n'.join([
+        ndjson_line(company.id, '2020-01-01', 1),
+        '{not json',
+        ndjson_line(company.id, 'yesterday', 2),
+        ndjson_line(999, '2021-01-01', 3),
+        ndjson_line(company.id, '2022-01-01', 4),
+    ])
+
+    report = ingest(client, body, 'application/x-ndjson').get_json()
+
+    assert report['inserted'] == 2
+    assert [error['line'] for error in report['errors']] == [2, 3, 4]
+    assert 'date' in report['errors'][1]['error']
+    assert 'Unknown company_id 999' in report['errors'][2]['error']
+
+
+def test_bad_csv_header_rejects_the_upload(client, company):
+    unknown = ingest(client, f'{CSV_HEADER},carbon\n{csv_line(company.id, "2020-01-01", 5)},1\n', 'text/csv')
+    missing = ingest(client, 'company_id,date,co2_emissions\n1,2020-01-01,5\n', 'text/csv')
+
+    assert unknown.status_code == 400
+    assert unknown.get_json()['errors'] == [{'line': 1, 'error': 'Unknown CSV columns: carbon'}]
+    assert missing.status_code == 400
+    assert missing.get_json()['errors'][0]['error'].startswith('Missing CSV columns: board_diversity,')
+    assert stored() == {}
+
+
+def test_csv_values_go_through_the_entry_schema(client, company):
+    employee_count = ESG_METRICS.index('employee_count') + 2
+    truncated = csv_line(company.id, '2021-01-01').split(',')
+    truncated[employee_count] = '12.7'
+    body = '\n'.join([
+        CSV_HEADER,
+        csv_line(company.id, '2020-01-01', '1.5'),
+        ','.join(truncated),
+        csv_line(company.id, '2022-01-01', 'lots'),
+        csv_line('acme', '2023-01-01', 1),
+    ])
+
+    report = ingest(client, body, 'text/csv').get_json()
+
+    assert report['inserted'] == 1
+    assert report['errors'] == [
+        {'line': 3, 'error': 'social.employee_count: expected an integer, got 12.7'},
+        {'line': 4, 'error': 'environmental.co2_emissions: expected a number, got str'},
+        {'line': 5, 'error': 'company_id: required integer'},
+    ]
+    assert stored() == {datetime(2020, 1, 1): 1.5}
+
+
+def test_xlsx_rows_go_through_the_entry_schema(client, company):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(['Company ID', 'Date'] + [metric.replace('_', ' ').title() for metric in ESG_METRICS])
+    blanks = [None] * (len(ESG_METRICS) - 1)
+    sheet.append([company.id, datetime(2020, 1, 1), 3.5] + blanks)
+    sheet.append([company.id, datetime(2021, 1, 1), 'n/a'] + blanks)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    report = ingest(client, buffer.getvalue(), XLSX_MIMETYPE).get_json()
+
+    assert report['inserted'] == 1
+    assert report['errors'] == [{'line': 3, 'error': 'environmental.co2_emissions: expected a number, got str'}]
+    assert stored() == {datetime(2020, 1, 1): 3.5}
+
+
+def test_invalid_utf8_is_a_line_error_not_a_500(client, company):
+    lines = [CSV_HEADER, csv_line(company.id, '2020-01-01', 1), csv_line(company.id, '2021-01-01', 2),
+             csv_line(company.id, '2022-01-01', 3)]
+    body = '\n'.join(lines).encode('utf-8').replace(b',2021-01-01,', b',2021-01-01\xff,')
+
+    csv_report = ingest(client, body, 'text/csv').get_json()
+    ndjson_body = (ndjson_line(company.id, '2023-01-01', 4) + '\n').encode('utf-8') + b'{"company_id": \xe9}\n'
+    ndjson_report = ingest(client, ndjson_body, 'application/x-ndjson').get_json()
+
+    assert csv_report['inserted'] == 2
+    assert [error['line'] for error in csv_report['errors']] == [3]
+    assert 'date is not valid UTF-8 (byte 0xff' in csv_report['errors'][0]['error']
+    assert ndjson_report['inserted'] == 1
+    assert ndjson_report['errors'][0]['line'] == 2
+    assert 'not valid UTF-8 (byte 0xe9' in ndjson_report['errors'][0]['error']
+    assert sorted(stored().values()) == [1, 3, 4]
+
+
+def test_unknown_format_is_415(client):
+    assert ingest(client, 'x', 'text/plain').status_code == 415
+    assert ingest(client, 'x', 'text/csv', mode='replace').status_code == 400
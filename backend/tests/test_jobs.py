@@ -0,0 +1,83 @@
+import io
+import json
+import os
+import time
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.esg_data import ESGData
+from app.models.ingest_job import IngestJob
+from app.services.jobs import create_ingest_job, run_ingest_job
+from app.services.ingest import bulk_insert
+from conftest import esg_entry, esg_row, year
+
+
+def ndjson(*entries):
+    return ''.join(json.dumps(entry) + '\n' for entry in entries).encode('utf-8')
+
+
+def stored():
+    return dict(db.session.execute(select(ESGData.date, ESGData.co2_emissions)).all())
+
+
+def wait_for(client, job_id, statuses=(IngestJob.SUCCEEDED, IngestJob.FAILED), timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        # The test client shares this session; drop what it has cached
+        db.session.rollback()
+        job = client.get(f'/api/jobs/{job_id}').get_json()
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f'job {job_id} did not finish')
+
+
+def test_background_ingest_is_polled_to_completion(client, company):
+    body = ndjson(*[esg_entry(company.id, f'{2015 + i}-01-01', co2_emissions=i) for i in range(5)])
+
+    response = client.post('/api/esg-data/ingest?background=true&chunk_size=2', data=body,
+                           content_type='application/x-ndjson')
+
+    assert response.status_code == 202
+    job = response.get_json()
+    assert response.headers['Location'] == f"/api/jobs/{job['id']}"
+    assert (job['status'], job['total_lines']) == (IngestJob.QUEUED, 5)
+    job = wait_for(client, job['id'])
+    assert job['status'] == IngestJob.SUCCEEDED
+    assert (job['inserted'], job['chunks'], job['progress']) == (5, 3, 1.0)
+    assert sorted(stored().values()) == [0, 1, 2, 3, 4]
+
+
+def test_resume_skips_lines_already_committed(company):
+    body = ndjson(*[esg_entry(company.id, f'{2015 + i}-01-01', co2_emissions=i) for i in range(4)])
+    job = create_ingest_job(io.BytesIO(body), 'ndjson', 'insert', 2)
+    # A worker committed the first chunk, then its process died
+    bulk_insert(db.session.connection(), [esg_row(company.id, year(2015 + i), co2_emissions=i) for i in range(2)])
+    job.status, job.committed_line, job.inserted, job.chunks = IngestJob.RUNNING, 2, 2, 1
+    db.session.commit()
+
+    assert run_ingest_job(job.id) is None
+    job = run_ingest_job(job.id, resume_running=True)
+
+    assert job.status == IngestJob.SUCCEEDED
+    assert (job.inserted, job.failed, job.chunks, job.committed_line) == (4, 0, 2, 4)
+    assert sorted(stored().values()) == [0, 1, 2, 3]
+    assert not os.path.exists(job.source_path)
+
+
+def test_failed_job_keeps_its_spool_and_can_be_resumed(client, company):
+    job = create_ingest_job(io.BytesIO(ndjson(esg_entry(company.id, '2020-01-01', co2_emissions=1))),
+                            'ndjson', 'insert', 10)
+    os.rename(job.source_path, job.source_path + '.moved')
+
+    job = run_ingest_job(job.id)
+    assert job.status == IngestJob.FAILED and job.error
+
+    os.rename(job.source_path + '.moved', job.source_path)
+    response = client.post(f'/api/jobs/{job.id}/resume')
+    assert response.status_code == 202
+    # Still failed until a worker claims it
+    assert wait_for(client, job.id, [IngestJob.SUCCEEDED])['inserted'] == 1
+    assert client.post(f'/api/jobs/{job.id}/resume').status_code == 409
+    assert client.get('/api/jobs/missing').status_code == 404
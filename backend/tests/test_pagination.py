@@ -0,0 +1,97 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.services.ingest import bulk_insert
+from app.utils.pagination import encode_cursor
+from conftest import esg_row
+
+
+def insert_days(company_id, count):
+    start = datetime(2020, 1, 1)
+    bulk_insert(db.session.connection(), [
+        esg_row(company_id, start + timedelta(days=i), co2_emissions=float(i)) for i in range(count)
+    ])
+    db.session.commit()
+
+
+def emissions(rows):
+    return [row['environmental']['co2_emissions'] for row in rows]
+
+
+def test_keyset_pages_cover_every_row_once_in_order(client, company):
+    insert_days(company.id, 7)
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        url = '/api/esg-data?limit=3' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(url).get_json()
+        seen.extend(emissions(page['data']))
+        pages += 1
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert seen == [float(i) for i in range(7)]
+
+
+def test_keyset_page_breaks_date_ties_by_id(client, company):
+    other = client.post('/api/companies', json={'name': 'Globex'}).get_json()['id']
+    date = datetime(2020, 1, 1)
+    bulk_insert(db.session.connection(), [esg_row(company.id, date, co2_emissions=1),
+                                          esg_row(other, date, co2_emissions=2)])
+    db.session.commit()
+
+    first = client.get('/api/esg-data?limit=1').get_json()
+    second = client.get(f"/api/esg-data?limit=1&cursor={first['next_cursor']}").get_json()
+
+    assert emissions(first['data']) + emissions(second['data']) == [1, 2]
+    assert second['next_cursor'] is None
+
+
+def test_last_full_page_has_no_next_cursor(client, company):
+    insert_days(company.id, 3)
+
+    page = client.get('/api/esg-data?limit=3').get_json()
+
+    assert len(page['data']) == 3
+    assert page['next_cursor'] is None
+
+
+def test_tampered_or_invalid_cursors_are_rejected(client, company):
+    insert_days(company.id, 2)
+    valid = encode_cursor(datetime(2020, 1, 1), 1)
+
+    wrong_shape = base64.urlsafe_b64encode(b'["2020-01-01", "one"]').decode('ascii')
+    for cursor in ('not-a-cursor', valid[:-4], wrong_shape):
+        assert client.get(f'/api/esg-data?cursor={cursor}').status_code == 400
+    for limit in ('0', '-1', 'ten'):
+        assert client.get(f'/api/esg-data?limit={limit}').status_code == 400
+    assert client.get(f'/api/esg-data?cursor={valid}').status_code == 200
+
+
+def test_stream_ndjson_emits_one_row_per_line(client, company):
+    insert_days(company.id, 5)
+
+    response = client.get('/api/esg-data?stream=ndjson&fields=co2_emissions')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert emissions(rows) == [float(i) for i in range(5)]
+    assert set(rows[0]) == {'id', 'company_id', 'date', 'environmental'}
+
+
+def test_stream_json_matches_unstreamed_payload(client, company):
+    insert_days(company.id, 4)
+
+    streamed = client.get('/api/esg-data?stream=json').get_json()
+
+    assert sorted(streamed, key=lambda row: row['id']) == \
+        sorted(client.get('/api/esg-data').get_json(), key=lambda row: row['id'])
+    assert client.get('/api/esg-data?stream=xml').status_code == 400
@@ -0,0 +1,92 @@
+import io
+import json
+import zipfile
+
+from app.extensions import db
+from app.services.ingest import bulk_insert
+from app.services.report_jobs import ReportPool
+from app.services.report_render import render_report
+from app.utils.zipstream import iter_zip
+from conftest import esg_row, year
+
+SECTIONS = {'environmental': True}
+
+
+def add_company(client, name):
+    company = dict(name=name, industry='Energy', country='NO', environmental_highlight='Cut emissions')
+    company_id = client.post('/api/companies', json=company).get_json()['id']
+    bulk_insert(db.session.connection(), [esg_row(company_id, year(2024), co2_emissions=company_id)])
+    db.session.commit()
+    return company_id
+
+
+def bundle(response):
+    return zipfile.ZipFile(io.BytesIO(response.data))
+
+
+def render_in_process(self, tasks):
+    # Same contract as ReportPool.render_unordered, without worker processes;
+    # the company named Broken fails to render
+    for tag, args in tasks:
+        if args[0].name == 'Broken':
+            yield tag, None, ValueError('cannot render Broken')
+        else:
+            yield tag, render_report(*args), None
+
+
+def test_iter_zip_yields_each_member_as_it_is_written():
+    chunks = list(iter_zip((f'{i}.txt', b'x' * 10) for i in range(3)))
+
+    # One chunk per member, then the central directory
+    assert len(chunks) == 4
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+    assert archive.namelist() == ['0.txt', '1.txt', '2.txt']
+    assert archive.read('2.txt') == b'x' * 10
+
+
+def test_bundle_renders_on_the_pool_and_lists_missing_companies(make_app):
+    app = make_app(REPORT_JOB_WORKERS=1)
+    client = app.test_client()
+    with app.app_context():
+        first, second = add_company(client, 'Acme Oil'), add_company(client, 'Fjord Wind')
+
+    response = client.post('/reports/batch', json={'company_ids': [first, second, 999], 'sections': SECTIONS})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/zip'
+    assert response.headers['Content-Disposition'].startswith('attachment; filename=ESG_Reports_')
+    archive = bundle(response)
+    assert sorted(archive.namelist()) == [f'{first}_Acme_Oil.pdf', f'{second}_Fjord_Wind.pdf', 'errors.json']
+    assert archive.read(f'{first}_Acme_Oil.pdf').startswith(b'%PDF')
+    assert json.loads(archive.read('errors.json')) == [{'company_id': 999, 'error': 'No company or ESG data found'}]
+
+
+def test_failed_renders_go_to_errors_json_and_cached_reports_skip_the_pool(client, monkeypatch):
+    monkeypatch.setattr(ReportPool, 'render_unordered', render_in_process)
+    good = add_company(client, 'Good')
+    broken = add_company(client, 'Broken')
+
+    first = bundle(client.post('/reports/batch', json={'industry': 'Energy', 'format': 'xlsx', 'sections': SECTIONS}))
+    monkeypatch.setattr(ReportPool, 'render_unordered', lambda self, tasks: iter(()))
+    second = bundle(client.post('/reports/batch', json={'industry': 'Energy', 'format': 'xlsx', 'sections': SECTIONS}))
+
+    assert first.namelist() == [f'{good}_Good.xlsx', 'errors.json']
+    assert json.loads(first.read('errors.json')) == [{'company_id': broken, 'error': 'cannot render Broken'}]
+    # The rendered report comes from the cache; the failed one was not cached and went back to the pool
+    assert second.namelist() == [f'{good}_Good.xlsx']
+    assert second.read(f'{good}_Good.xlsx') == first.read(f'{good}_Good.xlsx')
+
+
+def test_bundle_requests_are_validated(make_app):
+    app = make_app(REPORT_BUNDLE_MAX_COMPANIES=1)
+    client = app.test_client()
+    with app.app_context():
+        add_company(client, 'One')
+        add_company(client, 'Two')
+
+    assert client.post('/reports/batch', json={}).status_code == 400
+    assert client.post('/reports/batch', json={'company_ids': ['1']}).status_code == 400
+    assert client.post('/reports/batch', json={'country': 'SE'}).status_code == 404
+    too_many = client.post('/reports/batch', json={'industry': 'Energy'})
+    assert too_many.status_code == 400
+    assert too_many.get_json()['error'] == '2 companies match; a bundle holds at most 1'
@@ -0,0 +1,73 @@
+import io
+import time
+from datetime import date
+
+import openpyxl
+
+from app.extensions import db
+from app.models.esg_data import ESG_METRICS
+from app.services.cache import report_cache, report_cache_key
+from app.services.ingest import bulk_insert
+from app.services.report_render import render_report
+from app.services.snapshots import get_latest_esg_data
+from app.services.versioning import bump_versions, company_key
+from conftest import esg_row, year
+
+DAY = date(2026, 3, 14)
+
+
+def latest(company):
+    company.description = 'Makes everything'
+    for pillar in ('environmental', 'social', 'governance'):
+        setattr(company, f'{pillar}_highlight', f'Good {pillar} record')
+    bulk_insert(db.session.connection(), [esg_row(company.id, year(2024), **{metric: 1 for metric in ESG_METRICS})])
+    db.session.commit()
+    return get_latest_esg_data(company.id)
+
+
+def test_report_cache_key_covers_what_the_output_depends_on(company):
+    esg_data = latest(company)
+
+    def key(sections=None, fmt='pdf', report_date=DAY):
+        return report_cache_key(company, esg_data, sections or {'overview': True, 'social': True}, fmt,
+                                report_date=report_date)
+
+    assert key() == key({'social': True, 'overview': True, 'governance': False})
+    assert key() != key({'overview': True})
+    assert key() != key(fmt='xlsx')
+    assert key() != key(report_date=date(2026, 3, 15))
+
+    before = key()
+    bump_versions([company_key(company.id)])
+    db.session.commit()
+    assert key() != before
+
+
+def test_rendered_reports_only_carry_the_report_date(company):
+    esg_data = latest(company)
+    sections = {'environmental': True, 'social': True}
+
+    for fmt in ('pdf', 'xlsx'):
+        first = render_report(company, esg_data, sections, fmt, report_date=DAY)
+        time.sleep(1.1)
+        assert render_report(company, esg_data, sections, fmt, report_date=DAY) == first
+
+    workbook = openpyxl.load_workbook(io.BytesIO(render_report(company, esg_data, sections, 'xlsx', report_date=DAY)))
+    header = [cell.value for cell in workbook.active[1]]
+    assert workbook.active[2][header.index('Report Date')].value == f'{DAY.isoformat()} 00:00:00'
+    assert workbook.properties.created.date() == DAY
+    pdf = render_report(company, esg_data, sections, 'pdf', report_date=DAY)
+    assert f"/CreationDate (D:{DAY.strftime('%Y%m%d')}000000)".encode('ascii') in pdf
+
+
+def test_generate_serves_repeat_requests_from_the_cache(client, company):
+    latest(company)
+    payload = {'company_id': company.id, 'format': 'xlsx', 'sections': {'overview': True}}
+
+    first = client.post('/reports/generate', json=payload)
+    second = client.post('/reports/generate', json=payload)
+
+    assert first.status_code == second.status_code == 200
+    assert first.data == second.data
+    stats = report_cache().stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
@@ -0,0 +1,72 @@
+import os
+import time
+
+from app.extensions import db
+from app.models.report_job import ReportJob
+from app.services.ingest import bulk_insert
+from app.services.report_jobs import mark_running, report_pool
+from conftest import esg_row, year
+
+
+def queued_job(company, tmp_path):
+    job = ReportJob(id='job1', company_id=company.id, format='pdf', sections={},
+                    file_path=str(tmp_path / 'job1.pdf'), download_name='report.pdf')
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def test_worker_marks_queued_job_running(app, company, tmp_path):
+    job = queued_job(company, tmp_path)
+
+    mark_running(db.engine.url.render_as_string(hide_password=False), job.id)
+
+    db.session.expire_all()
+    job = db.session.get(ReportJob, 'job1')
+    assert job.status == ReportJob.RUNNING
+    assert job.started_at is not None
+
+
+def test_mark_running_leaves_finished_jobs_alone(app, company, tmp_path):
+    job = queued_job(company, tmp_path)
+    job.status = ReportJob.SUCCEEDED
+    db.session.commit()
+
+    mark_running(db.engine.url.render_as_string(hide_password=False), job.id)
+
+    db.session.expire_all()
+    assert db.session.get(ReportJob, 'job1').status == ReportJob.SUCCEEDED
+
+
+def test_pool_size_is_fixed_per_process_not_per_cpu(make_app, monkeypatch):
+    # Every web worker process gets its own pool, so the default must not scale with the host
+    monkeypatch.setattr(os, 'cpu_count', lambda: 64)
+
+    with make_app().app_context():
+        assert report_pool().max_workers == 2
+    with make_app(REPORT_JOB_WORKERS=1).app_context():
+        assert report_pool().max_workers == 1
+
+
+def test_background_report_goes_through_the_pool(make_app):
+    app = make_app(REPORT_JOB_WORKERS=1)
+    client = app.test_client()
+    company_id = client.post('/api/companies', json={'name': 'Acme'}).get_json()['id']
+    with app.app_context():
+        bulk_insert(db.session.connection(), [esg_row(company_id, year(2024), co2_emissions=1)])
+        db.session.commit()
+
+    response = client.post('/reports/generate?background=1', json={'company_id': company_id, 'format': 'pdf'})
+    assert response.status_code == 202
+    job = response.get_json()
+    assert job['status'] == ReportJob.QUEUED
+
+    deadline = time.monotonic() + 60
+    while job['status'] in (ReportJob.QUEUED, ReportJob.RUNNING) and time.monotonic() < deadline:
+        time.sleep(0.1)
+        job = client.get(f"/reports/jobs/{job['id']}").get_json()
+
+    assert job['status'] == ReportJob.SUCCEEDED, job
+    # Set by the worker when it picked the job up
+    assert job['started_at'] is not None
+    assert client.get(job['file_url']).data.startswith(b'%PDF')
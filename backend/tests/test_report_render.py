@@ -0,0 +1,74 @@
+import builtins
+import io
+import os
+import tempfile
+from datetime import date
+from types import SimpleNamespace
+
+from app.extensions import db
+from app.models.esg_data import ESG_METRICS
+from app.services.ingest import bulk_insert
+from app.services.report_render import COMPANY_FIELDS, render_report
+from conftest import esg_row, year
+
+ALL_SECTIONS = {section: True for section in ('overview', 'environmental', 'social', 'governance', 'risks')}
+
+
+def record_file_writes(monkeypatch):
+    """Names of temp files created and files opened for writing from here on."""
+    written = []
+    open_ = builtins.open
+
+    def recording_open(file, mode='r', *args, **kwargs):
+        if any(flag in mode for flag in 'wax+'):
+            written.append(file)
+        return open_(file, mode, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, 'open', recording_open)
+    monkeypatch.setattr(io, 'open', recording_open)
+    for name in ('mkstemp', 'mkdtemp', 'TemporaryFile', 'NamedTemporaryFile', 'SpooledTemporaryFile'):
+        def recording(*args, _create=getattr(tempfile, name), _name=name, **kwargs):
+            written.append(_name)
+            return _create(*args, **kwargs)
+        monkeypatch.setattr(tempfile, name, recording)
+    return written
+
+
+def company(**fields):
+    values = dict.fromkeys(COMPANY_FIELDS, '')
+    values.update(id=1, name='Acme', **fields)
+    return SimpleNamespace(**values)
+
+
+def test_reports_render_metrics_that_were_not_reported():
+    esg_data = SimpleNamespace(**dict.fromkeys(ESG_METRICS))
+
+    for fmt in ('pdf', 'xlsx'):
+        assert render_report(company(), esg_data, ALL_SECTIONS, fmt, report_date=date(2026, 3, 14))
+
+
+def test_reports_render_without_touching_disk(monkeypatch):
+    esg_data = SimpleNamespace(**dict.fromkeys(ESG_METRICS, 1))
+    written = record_file_writes(monkeypatch)
+
+    pdf = render_report(company(), esg_data, ALL_SECTIONS, 'pdf', report_date=date(2026, 3, 14))
+    xlsx = render_report(company(), esg_data, ALL_SECTIONS, 'xlsx', report_date=date(2026, 3, 14))
+
+    assert pdf.startswith(b'%PDF') and xlsx.startswith(b'PK')
+    assert written == []
+
+
+def test_generate_streams_the_report_from_memory(app, client, company, monkeypatch):
+    company.environmental_highlight = 'Cut emissions'
+    bulk_insert(db.session.connection(), [esg_row(company.id, year(2024), co2_emissions=5)])
+    db.session.commit()
+    written = record_file_writes(monkeypatch)
+
+    for fmt in ('pdf', 'xlsx'):
+        response = client.post('/reports/generate', json={'company_id': company.id, 'format': fmt,
+                                                          'sections': {'environmental': True}})
+        assert response.status_code == 200
+        assert response.headers['Content-Disposition'].endswith(f'.{fmt}')
+
+    assert written == []
+    assert not os.path.exists(os.path.join(app.root_path, 'temp'))
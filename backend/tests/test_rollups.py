@@ -0,0 +1,69 @@
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.esg_data import ESGData
+from app.models.esg_rollup import esg_rollup
+from app.services.ingest import bulk_insert
+from app.services.rollups import rebuild_rollups
+from app.services.versioning import ESG_DATA, current_versions
+from conftest import esg_row, year
+
+
+def rollups():
+    return sorted(db.session.execute(select(esg_rollup)).all())
+
+
+def assert_rollups_exact():
+    maintained = rollups()
+    rebuild_rollups(db.session.connection())
+    assert rollups() == maintained
+
+
+def test_orm_inserts_updates_and_deletes_maintain_rollups(client, company):
+    bulk_insert(db.session.connection(), [esg_row(company.id, year(2020), co2_emissions=1)])
+    db.session.add(ESGData(company_id=company.id, date=year(2021), co2_emissions=2, employee_count=10))
+    # Unset date, as in run.py add_test_data
+    db.session.add(ESGData(company_id=company.id, board_diversity=35.5))
+    db.session.commit()
+    assert_rollups_exact()
+
+    # Expired by the commit, so the old value is not in attribute history
+    row = ESGData.query.filter_by(date=year(2021)).one()
+    db.session.commit()
+    row.co2_emissions = 7
+    row.date = year(2019)
+    db.session.commit()
+    assert_rollups_exact()
+
+    db.session.delete(ESGData.query.filter_by(date=year(2020)).one())
+    db.session.commit()
+    assert_rollups_exact()
+
+    company_years = client.get(f'/api/analytics/rollups/company?key={company.id}').get_json()
+    assert [entry['year'] for entry in company_years][:1] == [2019]
+    assert company_years[0]['environmental']['co2_emissions'] == {'avg': 7, 'sum': 7, 'count': 1}
+    assert company_years[0]['social']['training_hours'] == {'avg': None, 'sum': None, 'count': 0}
+
+
+def test_orm_writes_bump_versions(client, company):
+    before = client.get(f'/api/esg-data/company/{company.id}')
+
+    db.session.add(ESGData(company_id=company.id, date=year(2021), co2_emissions=2))
+    db.session.commit()
+
+    assert current_versions([ESG_DATA])[ESG_DATA].version == 1
+    after = client.get(f'/api/esg-data/company/{company.id}', headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert len(after.get_json()) == 1
+
+
+def test_unchanged_orm_objects_leave_rollups_alone(company):
+    db.session.add(ESGData(company_id=company.id, date=year(2021), co2_emissions=2))
+    db.session.commit()
+    before = rollups()
+
+    row = ESGData.query.one()
+    row.co2_emissions = 2
+    db.session.commit()
+
+    assert rollups() == before
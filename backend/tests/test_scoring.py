@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from app.extensions import db
+from app.models.company import Company
+from app.services.ingest import bulk_insert
+from app.services.scoring import compute_scores
+from conftest import esg_row, year
+
+
+def scored(renewable=0, co2=0, diversity=0, incidents=0, board_diversity=0, violations=0):
+    """The per-row formula the dashboards used, for comparison."""
+    environmental = renewable * 0.4 + (100 - co2 / 20) * 0.6
+    social = diversity * 0.5 + (100 - incidents * 10) * 0.5
+    governance = board_diversity * 0.4 + (100 - violations * 20) * 0.6
+    return environmental, social, governance, (environmental + social + governance) / 3
+
+
+def test_compute_scores_matches_the_per_row_formula():
+    rows = [(50, 200, 40, 2, 30, 1), (80, 1000, 60, 0, 45, 0)]
+
+    scores = compute_scores(np.array(rows, dtype=float))
+
+    for i, row in enumerate(rows):
+        expected = scored(*row)
+        actual = tuple(scores[name][i] for name in ('environmental', 'social', 'governance', 'total'))
+        assert actual == pytest.approx(expected)
+
+
+def test_compute_scores_counts_missing_metrics_as_zero():
+    scores = compute_scores(np.array([[np.nan] * 6], dtype=float))
+
+    assert scores['total'][0] == pytest.approx(scored()[3])
+
+
+def test_scores_endpoint_filters_companies_and_latest_rows(client, company):
+    other = Company(name='Globex', industry='Energy', country='USA')
+    db.session.add(other)
+    db.session.commit()
+    bulk_insert(db.session.connection(), [
+        esg_row(company.id, year(2020), renewable_energy_percent=10, co2_emissions=100),
+        esg_row(company.id, year(2021), renewable_energy_percent=50, co2_emissions=200),
+        esg_row(other.id, year(2021), renewable_energy_percent=90),
+    ])
+    db.session.commit()
+
+    every_row = client.get('/api/scores').get_json()
+    latest = client.get(f'/api/scores?company_ids={company.id}&latest=true').get_json()
+    posted = client.post('/api/scores', json={'company_ids': [company.id], 'latest': True}).get_json()
+
+    assert len(every_row) == 3
+    assert [(row['company_id'], row['date']) for row in latest] == [(company.id, '2021-01-01T00:00:00')]
+    assert latest[0]['environmental'] == pytest.approx(scored(renewable=50, co2=200)[0])
+    assert posted == latest
+    assert client.get('/api/scores?company_ids=a,b').status_code == 400
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.services.timeseries import downsample, lttb
+from app.services.ingest import bulk_insert
+from app.extensions import db
+from conftest import esg_row
+
+
+def test_lttb_keeps_endpoints_and_threshold():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50)
+
+    indices = lttb(x, y, 50)
+
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_keeps_spikes():
+    y = np.zeros(500)
+    y[123] = 100
+    y[377] = -100
+
+    indices = lttb(np.arange(500, dtype=float), y, 10)
+
+    assert 123 in indices and 377 in indices
+
+
+def test_lttb_returns_short_series_unchanged():
+    assert list(lttb(np.arange(5, dtype=float), np.arange(5, dtype=float), 10)) == [0, 1, 2, 3, 4]
+
+
+def test_lttb_rejects_thresholds_below_three():
+    with pytest.raises(ValueError):
+        lttb(np.arange(10, dtype=float), np.arange(10, dtype=float), 2)
+
+
+def test_downsample_skips_missing_values_per_metric():
+    start = datetime(2020, 1, 1)
+    series = [
+        {'date': start + timedelta(days=i),
+         'environmental': {'co2_emissions': float(i), 'water_usage': None if i % 2 else float(i)}}
+        for i in range(100)
+    ]
+
+    result = downsample(series, {'environmental': ('co2_emissions', 'water_usage')}, 10)
+
+    assert len(result['co2_emissions']) == 10
+    assert result['co2_emissions'][0] == (start, 0.0)
+    assert result['co2_emissions'][-1] == (start + timedelta(days=99), 99.0)
+    assert len(result['water_usage']) == 10
+    assert all(value is not None for _, value in result['water_usage'])
+
+
+def test_series_endpoint_downsamples_to_points(client, company):
+    start = datetime(2020, 1, 1)
+    bulk_insert(db.session.connection(), [
+        esg_row(company.id, start + timedelta(days=i), co2_emissions=float(i % 17)) for i in range(200)
+    ])
+    db.session.commit()
+
+    body = client.get(f'/api/esg-data/company/{company.id}/series?fields=co2_emissions&points=20').get_json()
+
+    points = body['series']['co2_emissions']
+    assert len(points) == 20
+    assert points[0][1] == 0 and points[-1][1] == 199 % 17
+    assert client.get(f'/api/esg-data/company/{company.id}/series?points=2').status_code == 400
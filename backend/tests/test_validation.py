@@ -0,0 +1,93 @@
+from datetime import datetime
+
+from app.utils.validation import ENTRY_SCHEMA, validate_entries
+from conftest import esg_entry
+
+
+def test_valid_entry_is_flattened_and_coerced():
+    entry = esg_entry(1, '2024-03-31', co2_emissions=12, employee_count=250.0)
+    row, errors = ENTRY_SCHEMA.validate(dict(entry, id=7))
+
+    assert errors == []
+    assert row['company_id'] == 1
+    assert row['date'] == datetime(2024, 3, 31)
+    assert row['co2_emissions'] == 12
+    assert row['employee_count'] == 250 and type(row['employee_count']) is int
+    assert row['water_usage'] is None
+    assert 'id' not in row
+
+
+def test_every_problem_in_an_entry_is_reported_by_field():
+    row, errors = ENTRY_SCHEMA.validate({
+        'company_id': '1',
+        'date': 'yesterday',
+        'environmental': {'co2_emissions': 'a lot', 'sunshine': 1},
+        'social': {'employee_count': 2.5},
+        'governance': [],
+        'extra': True,
+    })
+
+    assert row is None
+    fields = dict(errors)
+    assert fields['company_id'] == 'required integer'
+    assert 'invalid ISO date' in fields['date']
+    assert fields['environmental.co2_emissions'] == 'expected a number, got str'
+    assert fields['environmental.sunshine'] == 'unknown field'
+    assert 'expected an integer' in fields['social.employee_count']
+    assert fields['governance'] == 'expected an object'
+    assert fields['extra'] == 'unknown field'
+
+
+def test_missing_pillars_and_metrics_are_required_but_null_is_accepted():
+    entry = esg_entry(1, '2024-01-01')
+    del entry['social']
+    del entry['environmental']['water_usage']
+
+    row, errors = ENTRY_SCHEMA.validate(entry)
+
+    assert row is None
+    assert errors == [('environmental.water_usage', 'required, may be null'), ('social', 'required object')]
+
+
+def test_dates_with_an_offset_are_stored_as_utc():
+    late_evening, _ = ENTRY_SCHEMA.validate(esg_entry(1, '2024-03-31T23:00:00-05:00'))
+    utc, _ = ENTRY_SCHEMA.validate(esg_entry(1, '2024-03-31T12:00:00+00:00'))
+
+    assert late_evening['date'] == datetime(2024, 4, 1, 4, 0)
+    assert late_evening['date'].tzinfo is None
+    assert utc['date'] == datetime(2024, 3, 31, 12, 0)
+
+
+def test_booleans_are_not_numbers():
+    _, errors = ENTRY_SCHEMA.validate(esg_entry(1, '2024-01-01', data_breaches=True))
+
+    assert [field for field, _ in errors] == ['governance.data_breaches']
+
+
+def test_batch_errors_carry_index_and_field():
+    no_company = esg_entry(None, '2024-01-01')
+    del no_company['company_id']
+    rows, errors = validate_entries([esg_entry(1, '2024-01-01'), 'not an object', no_company])
+
+    assert [(error['index'], error['field']) for error in errors] == [(1, ''), (2, 'company_id')]
+    assert len(rows) == 1
+    assert validate_entries({'esg_data': []})[1][0]['error'] == 'expected a list of entries'
+
+
+def test_batch_endpoint_rejects_the_whole_batch_with_field_errors(client, company):
+    response = client.post('/api/esg-data/batch', json={'esg_data': [
+        esg_entry(company.id, '2024-01-01'),
+        esg_entry(company.id, '2024-02-01', employee_count='many'),
+        esg_entry(999, '2024-03-01'),
+    ]})
+
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body['errors'] == [
+        {'index': 1, 'field': 'social.employee_count', 'error': "expected an integer, got 'many'"},
+    ]
+    assert client.get('/api/esg-data').get_json() == []
+
+    response = client.post('/api/esg-data/batch', json={'esg_data': [esg_entry(999, '2024-03-01')]})
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == [{'index': 0, 'field': 'company_id', 'error': 'unknown company 999'}]
@@ -0,0 +1,74 @@
+from app.extensions import db
+from app.services.ingest import bulk_insert
+from app.services.versioning import COMPANIES, bump_versions, current_versions
+from conftest import esg_row, year
+
+
+def test_bump_versions_creates_then_increments_each_key_once(app):
+    bump_versions(['a', 'b', 'a'])
+    bump_versions(['a'])
+    db.session.commit()
+
+    versions = current_versions(['a', 'b', 'c'])
+    assert {key: row.version for key, row in versions.items()} == {'a': 2, 'b': 1}
+
+
+def test_unchanged_resource_revalidates_with_304(client):
+    client.post('/api/companies', json={'name': 'Acme'})
+    first = client.get('/api/companies')
+    etag, _ = first.get_etag()
+
+    by_etag = client.get('/api/companies', headers={'If-None-Match': first.headers['ETag']})
+    by_date = client.get('/api/companies', headers={'If-Modified-Since': first.headers['Last-Modified']})
+
+    assert first.status_code == 200 and etag
+    assert by_etag.status_code == 304 and by_etag.get_data() == b''
+    assert by_etag.get_etag()[0] == etag
+    assert by_date.status_code == 304
+
+
+def test_write_changes_the_etag(client, company):
+    stale = client.get(f'/api/esg-data/company/{company.id}')
+    unrelated = client.get('/api/companies')
+
+    bulk_insert(db.session.connection(), [esg_row(company.id, year(2020), co2_emissions=1)])
+    db.session.commit()
+
+    fresh = client.get(f'/api/esg-data/company/{company.id}', headers={'If-None-Match': stale.headers['ETag']})
+    assert fresh.status_code == 200
+    assert fresh.get_etag()[0] != stale.get_etag()[0]
+    # Company payloads are versioned separately from ESG rows
+    assert client.get('/api/companies', headers={'If-None-Match': unrelated.headers['ETag']}).status_code == 304
+
+
+def test_each_query_string_gets_its_own_etag(client, company):
+    full = client.get('/api/esg-data')
+    sparse = client.get('/api/esg-data?fields=co2_emissions')
+
+    assert full.get_etag()[0] != sparse.get_etag()[0]
+    assert client.get('/api/esg-data?fields=co2_emissions',
+                      headers={'If-None-Match': full.headers['ETag']}).status_code == 200
+
+
+def test_errors_carry_no_validators(client, app):
+    bump_versions([COMPANIES])
+    db.session.commit()
+
+    response = client.get('/api/companies/999')
+
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
+
+
+def test_compressed_200_and_304_carry_the_same_validator(make_app):
+    client = make_app(COMPRESSION_MIN_SIZE=0).test_client()
+    client.post('/api/companies', json={'name': 'Acme'})
+
+    compressed = client.get('/api/companies', headers={'Accept-Encoding': 'gzip'})
+    revalidated = client.get('/api/companies', headers={'Accept-Encoding': 'gzip',
+                                                        'If-None-Match': compressed.headers['ETag']})
+
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert revalidated.status_code == 304
+    assert revalidated.headers['ETag'] == compressed.headers['ETag']
+    assert compressed.get_etag()[1]
@@ -1,4 +1,4 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import {
   ScatterChart,
   Scatter,
@@ -8,48 +8,31 @@ import {
   Tooltip,
   ResponsiveContainer,
 } from 'recharts';
-import { ESGData, Company } from '../../types';
+import { api } from '../../services/api';
+import { ESGScore, Company } from '../../types';
 
 interface ESGBreakdownProps {
-  data: ESGData[];
   companies: Company[];
 }
 
-const ESGBreakdown: React.FC<ESGBreakdownProps> = ({ data, companies }) => {
-  const calculateESGScore = (esgData: ESGData) => {
-    const environmental = (
-      (esgData.environmental.renewable_energy_percent || 0) * 0.4 +
-      (100 - (esgData.environmental.co2_emissions || 0) / 20) * 0.6
-    );
-    
-    const social = (
-      (esgData.social.diversity_ratio || 0) * 0.5 +
-      (100 - (esgData.social.safety_incidents || 0) * 10) * 0.5
-    );
-    
-    const governance = (
-      (esgData.governance.board_diversity || 0) * 0.4 +
-      (100 - (esgData.governance.ethics_violations || 0) * 20) * 0.6
-    );
+const ESGBreakdown: React.FC<ESGBreakdownProps> = ({ companies }) => {
+  const [scores, setScores] = useState<ESGScore[]>([]);
+  const companyIds = companies.map(c => c.id).join(',');
 
-    return {
-      environmental,
-      social,
-      governance,
-      total: (environmental + social + governance) / 3
-    };
-  };
+  useEffect(() => {
+    if (!companyIds) return;
+    api.scores.get({ company_ids: companyIds.split(',').map(Number) })
+      .then(response => setScores(response.data))
+      .catch(err => console.error('Error fetching ESG scores:', err));
+  }, [companyIds]);
 
-  const scatterData = data.map(d => {
-    const company = companies.find(c => c.id === d.company_id);
-    const scores = calculateESGScore(d);
-    return {
-      name: company?.name,
-      environmental: scores.environmental,
-      social: scores.social,
-      total: scores.total,
-    };
-  });
+  const companyNames = new Map(companies.map(c => [c.id, c.name]));
+  const scatterData = scores.map(score => ({
+    name: companyNames.get(score.company_id),
+    environmental: score.environmental,
+    social: score.social,
+    total: score.total,
+  }));
 
   return (
     <div style={{ width: '100%', height: 400 }}>
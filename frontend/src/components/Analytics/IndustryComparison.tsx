@@ -1,4 +1,4 @@
-import React, { useMemo } from 'react';
+import React, { useEffect, useState } from 'react';
 import {
   BarChart,
   Bar,
@@ -10,11 +10,11 @@ import {
   ResponsiveContainer,
   TooltipProps,
 } from 'recharts';
-import { ESGData, Company } from '../../types';
+import { api } from '../../services/api';
+import { IndustryAverage } from '../../types';
 
 interface IndustryComparisonProps {
-  data: ESGData[];
-  companies: Company[];
+  latest?: boolean;
 }
 
 // Interface pour le tooltip personnalisé
@@ -49,42 +49,21 @@ const CustomTooltip: React.FC<CustomTooltipProps> = ({ active, payload, label })
   );
 };
 
-const IndustryComparison: React.FC<IndustryComparisonProps> = ({ data, companies }) => {
-  const industryAverages = useMemo(() => {
-    const industries: { [key: string]: any } = {};
+const IndustryComparison: React.FC<IndustryComparisonProps> = ({ latest = false }) => {
+  const [industries, setIndustries] = useState<IndustryAverage[]>([]);
 
-    data.forEach(esgData => {
-      const company = companies.find(c => c.id === esgData.company_id);
-      if (!company) return;
+  useEffect(() => {
+    api.analytics.getIndustries({ latest })
+      .then(response => setIndustries(response.data))
+      .catch(err => console.error('Error fetching industry averages:', err));
+  }, [latest]);
 
-      if (!industries[company.industry]) {
-        industries[company.industry] = {
-          environmental: [],
-          social: [],
-          governance: [],
-          count: 0
-        };
-      }
-
-      industries[company.industry].environmental.push(
-        esgData.environmental.renewable_energy_percent || 0
-      );
-      industries[company.industry].social.push(
-        esgData.social.diversity_ratio || 0
-      );
-      industries[company.industry].governance.push(
-        esgData.governance.board_diversity || 0
-      );
-      industries[company.industry].count++;
-    });
-
-    return Object.entries(industries).map(([industry, scores]) => ({
-      industry,
-      environmental: scores.environmental.reduce((a: number, b: number) => a + b, 0) / scores.count,
-      social: scores.social.reduce((a: number, b: number) => a + b, 0) / scores.count,
-      governance: scores.governance.reduce((a: number, b: number) => a + b, 0) / scores.count,
-    }));
-  }, [data, companies]);
+  const industryAverages = industries.map(entry => ({
+    industry: entry.industry,
+    environmental: entry.environmental.renewable_energy_percent || 0,
+    social: entry.social.diversity_ratio || 0,
+    governance: entry.governance.board_diversity || 0,
+  }));
 
   return (
     <div style={{ width: '100%', height: 400 }}>
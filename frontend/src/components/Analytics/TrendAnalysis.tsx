@@ -10,10 +10,20 @@ import {
   ResponsiveContainer,
   TooltipProps,
 } from 'recharts';
-import { ESGData } from '../../types';
+import { ESGMetrics } from '../../types';
+
+type PillarAverages<P extends keyof ESGMetrics> = Partial<Record<keyof ESGMetrics[P], number | null>>;
+
+// One point per year; a metric is null when no row in that year reported it
+export interface TrendPoint {
+  year: number;
+  environmental: PillarAverages<'environmental'>;
+  social: PillarAverages<'social'>;
+  governance: PillarAverages<'governance'>;
+}
 
 interface TrendAnalysisProps {
-  data: ESGData[];
+  data: TrendPoint[];
 }
 
 // Ajout d'un type personnalisé pour les données du tooltip
@@ -49,10 +59,10 @@ const CustomTooltip: React.FC<CustomTooltipProps> = ({ active, payload, label })
 };
 
 const TrendAnalysis: React.FC<TrendAnalysisProps> = ({ data }) => {
-  const trendData = data
-    .sort((a, b) => new Date(a.date).getTime() - new Date(b.date).getTime())
+  const trendData = [...data]
+    .sort((a, b) => a.year - b.year)
     .map(d => ({
-      date: new Date(d.date).toLocaleDateString(),
+      date: String(d.year),
       environmental: (
         (d.environmental.renewable_energy_percent || 0) * 0.4 +
         (100 - (d.environmental.co2_emissions || 0) / 20) * 0.6
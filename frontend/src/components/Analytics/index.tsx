@@ -9,14 +9,44 @@ import {
   TextField,
 } from '@mui/material';
 import IndustryComparison from './IndustryComparison';
-import TrendAnalysis from './TrendAnalysis';
+import TrendAnalysis, { TrendPoint } from './TrendAnalysis';
 import ESGBreakdown from './ESGBreakdown';
 import { api } from '../../services/api';
-import { Company, ESGData } from '../../types';
+import { Company, ESGMetrics, ESGRollup, RollupMetric } from '../../types';
+
+// Merge the rollups of one year into per-metric averages: the sum of the
+// industries' sums over the sum of their non-null counts
+const mergePillar = (rollups: ESGRollup[], pillar: keyof ESGMetrics) => {
+  const totals: Record<string, { sum: number; count: number }> = {};
+  rollups.forEach(rollup => {
+    Object.entries(rollup[pillar] as Record<string, RollupMetric>).forEach(([metric, { sum, count }]) => {
+      const total = totals[metric] || (totals[metric] = { sum: 0, count: 0 });
+      total.sum += sum || 0;
+      total.count += count;
+    });
+  });
+  const averages: Record<string, number | null> = {};
+  Object.entries(totals).forEach(([metric, { sum, count }]) => {
+    averages[metric] = count ? sum / count : null;
+  });
+  return averages;
+};
+
+const yearlyTrend = (rollups: ESGRollup[]): TrendPoint[] => {
+  const byYear = new Map<number, ESGRollup[]>();
+  rollups.forEach(rollup => byYear.set(rollup.year, [...(byYear.get(rollup.year) || []), rollup]));
+  return Array.from(byYear.entries()).map(([year, yearRollups]) => ({
+    year,
+    environmental: mergePillar(yearRollups, 'environmental') as TrendPoint['environmental'],
+    social: mergePillar(yearRollups, 'social') as TrendPoint['social'],
+    governance: mergePillar(yearRollups, 'governance') as TrendPoint['governance'],
+  }));
+};
 
 const Analytics = () => {
   const [companies, setCompanies] = useState<Company[]>([]);
-  const [esgData, setEsgData] = useState<ESGData[]>([]);
+  // Yearly industry rollups aggregated in SQL, not every ESG row
+  const [rollups, setRollups] = useState<ESGRollup[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [selectedIndustry, setSelectedIndustry] = useState<string>('all');
@@ -24,13 +54,13 @@ const Analytics = () => {
   const fetchData = async () => {
     try {
       setLoading(true);
-      const [companiesResponse, esgDataResponse] = await Promise.all([
+      const [companiesResponse, rollupsResponse] = await Promise.all([
         api.companies.getAll(),
-        api.esgData.getAll(),
+        api.analytics.getRollups('industry'),
       ]);
 
       setCompanies(companiesResponse.data);
-      setEsgData(esgDataResponse.data);
+      setRollups(rollupsResponse.data);
     } catch (err) {
       setError('Failed to fetch data');
       console.error('Error fetching data:', err);
@@ -45,12 +75,13 @@ const Analytics = () => {
 
   const industries = ['all', ...Array.from(new Set(companies.map(c => c.industry)))];
 
-  const filteredData = selectedIndustry === 'all'
-    ? esgData
-    : esgData.filter(d => {
-        const company = companies.find(c => c.id === d.company_id);
-        return company?.industry === selectedIndustry;
-      });
+  const filteredCompanies = selectedIndustry === 'all'
+    ? companies
+    : companies.filter(c => c.industry === selectedIndustry);
+
+  const trendData = yearlyTrend(selectedIndustry === 'all'
+    ? rollups
+    : rollups.filter(rollup => rollup.key === selectedIndustry));
 
   return (
     <Box>
@@ -81,7 +112,7 @@ const Analytics = () => {
               <Typography variant="h6" gutterBottom>
                 ESG Score Distribution
               </Typography>
-              <ESGBreakdown data={filteredData} companies={companies} />
+              <ESGBreakdown companies={filteredCompanies} />
             </CardContent>
           </Card>
         </Grid>
@@ -93,7 +124,7 @@ const Analytics = () => {
               <Typography variant="h6" gutterBottom>
                 Industry Comparison
               </Typography>
-              <IndustryComparison data={esgData} companies={companies} />
+              <IndustryComparison />
             </CardContent>
           </Card>
         </Grid>
@@ -105,7 +136,7 @@ const Analytics = () => {
               <Typography variant="h6" gutterBottom>
                 Trend Analysis
               </Typography>
-              <TrendAnalysis data={filteredData} />
+              <TrendAnalysis data={trendData} />
             </CardContent>
           </Card>
         </Grid>
@@ -21,7 +21,7 @@ import {
 } from '@mui/icons-material';
 import { motion } from 'framer-motion';
 import { api } from '../../services/api';
-import { ESGData } from '../../types';
+import { ESGScore } from '../../types';
 
 interface ESGScoreCardProps {
   companyId: number;
@@ -29,7 +29,7 @@ interface ESGScoreCardProps {
 
 const ESGScoreCard: React.FC<ESGScoreCardProps> = ({ companyId }) => {
   const theme = useTheme();
-  const [data, setData] = useState<ESGData[]>([]);
+  const [data, setData] = useState<ESGScore[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -38,7 +38,7 @@ const ESGScoreCard: React.FC<ESGScoreCardProps> = ({ companyId }) => {
       if (!companyId) return;
       
       try {
-        const response = await api.esgData.getByCompanyId(companyId);
+        const response = await api.scores.get({ company_ids: [companyId] });
         setData(response.data);
       } catch (err) {
         setError('Failed to load ESG scores');
@@ -51,24 +51,11 @@ const ESGScoreCard: React.FC<ESGScoreCardProps> = ({ companyId }) => {
     fetchData();
   }, [companyId]);
 
-  const calculateESGScore = (esgData: ESGData) => {
-    const environmental = Math.round(
-      (esgData.environmental.renewable_energy_percent || 0) * 0.4 +
-      (100 - (esgData.environmental.co2_emissions || 0) / 20) * 0.6
-    );
-    
-    const social = Math.round(
-      (esgData.social.diversity_ratio || 0) * 0.5 +
-      (100 - (esgData.social.safety_incidents || 0) * 10) * 0.5
-    );
-    
-    const governance = Math.round(
-      (esgData.governance.board_diversity || 0) * 0.4 +
-      (100 - (esgData.governance.ethics_violations || 0) * 20) * 0.6
-    );
-
-    return { environmental, social, governance };
-  };
+  const roundScores = (score: ESGScore) => ({
+    environmental: Math.round(score.environmental),
+    social: Math.round(score.social),
+    governance: Math.round(score.governance),
+  });
 
   if (loading) return <CircularProgress />;
   if (error) return <Alert severity="error">{error}</Alert>;
@@ -77,8 +64,8 @@ const ESGScoreCard: React.FC<ESGScoreCardProps> = ({ companyId }) => {
   const latestData = data[data.length - 1];
   const previousData = data[data.length - 2];
 
-  const currentScores = calculateESGScore(latestData);
-  const previousScores = previousData ? calculateESGScore(previousData) : null;
+  const currentScores = roundScores(latestData);
+  const previousScores = previousData ? roundScores(previousData) : null;
 
   const scoreCards = [
     {
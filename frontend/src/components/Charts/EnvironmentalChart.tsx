@@ -20,7 +20,9 @@ const EnvironmentalChart: React.FC<EnvironmentalChartProps> = ({ companyId }) =>
       if (!companyId) return;
       
       try {
-        const response = await api.esgData.getByCompanyId(companyId);
+        const response = await api.esgData.getByCompanyId(companyId, {
+          fields: 'co2_emissions,energy_consumption,renewable_energy_percent',
+        });
         // Sort data by date
         const sortedData = response.data.sort((a, b) => 
           new Date(a.date).getTime() - new Date(b.date).getTime()
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { Company, ESGData } from '../types';
+import { Company, ESGData, ESGRollup, ESGScore, IndustryAverage } from '../types';
 import { ReportConfig, ReportTemplate, AutomatedSchedule } from '../types/reports';
 
 const axiosInstance = axios.create({
@@ -18,7 +18,34 @@ export const api = {
   },
   esgData: {
     getAll: () => axiosInstance.get<ESGData[]>('/api/esg-data'),
-    getByCompanyId: (id: number) => axiosInstance.get<ESGData[]>(`/api/esg-data/company/${id}`),
+    getPage: (cursor?: string | null, limit?: number) =>
+      axiosInstance.get<{ data: ESGData[]; next_cursor: string | null }>('/api/esg-data', {
+        params: { cursor: cursor || undefined, limit },
+      }),
+    getByCompanyId: (id: number, params?: { fields?: string; pillars?: string }) =>
+      axiosInstance.get<ESGData[]>(`/api/esg-data/company/${id}`, { params }),
+    getSeries: (id: number, params?: {
+      bucket?: 'month' | 'quarter' | 'year';
+      agg?: 'avg' | 'min' | 'max' | 'sum';
+      fields?: string;
+      pillars?: string;
+      start?: string;
+      end?: string;
+    }) => axiosInstance.get<ESGData[]>(`/api/esg-data/company/${id}/series`, { params }),
+  },
+  analytics: {
+    getIndustries: (params?: { start?: string; end?: string; latest?: boolean }) =>
+      axiosInstance.get<IndustryAverage[]>('/api/analytics/industries', { params }),
+    getRollups: (dimension: ESGRollup['dimension'], params?: {
+      key?: string;
+      year?: number;
+      start_year?: number;
+      end_year?: number;
+    }) => axiosInstance.get<ESGRollup[]>(`/api/analytics/rollups/${dimension}`, { params }),
+  },
+  scores: {
+    get: (params?: { company_ids?: number[]; start?: string; end?: string; latest?: boolean }) =>
+      axiosInstance.post<ESGScore[]>('/api/scores', params || {}),
   },
   reports: {
     generate: (config: ReportConfig) => axiosInstance.post('/reports/generate', {
@@ -44,4 +44,35 @@ export interface ChartData {
   environmental: ESGMetrics['environmental'];
   social: ESGMetrics['social'];
   governance: ESGMetrics['governance'];
-} 
\ No newline at end of file
+} 
+export interface IndustryAverage extends ESGMetrics {
+  industry: string;
+  company_count: number;
+  record_count: number;
+}
+
+export interface RollupMetric {
+  avg: number | null;
+  sum: number | null;
+  count: number;
+}
+
+export interface ESGRollup {
+  dimension: 'company' | 'industry' | 'country';
+  key: string | null;
+  year: number;
+  record_count: number;
+  environmental: Record<keyof ESGMetrics['environmental'], RollupMetric>;
+  social: Record<keyof ESGMetrics['social'], RollupMetric>;
+  governance: Record<keyof ESGMetrics['governance'], RollupMetric>;
+}
+
+export interface ESGScore {
+  esg_data_id: number;
+  company_id: number;
+  date: string;
+  environmental: number;
+  social: number;
+  governance: number;
+  total: number;
+}